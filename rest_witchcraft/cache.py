@@ -0,0 +1,125 @@
+"""Process wide caches used by serializers and views."""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from itertools import chain
+
+import sqlalchemy as sa
+from sqlalchemy import event, orm
+
+
+class LRUCache:
+    """Thread safe cache bounded to ``maxsize`` least recently used
+    entries."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, loader, timeout=None):
+        """Returns cached value for the key, calling ``loader`` to build it
+        when missing or older than ``timeout`` seconds."""
+        with self._lock:
+            if key in self._entries:
+                created, value = self._entries[key]
+                if timeout is None or time.monotonic() - created < timeout:
+                    self._entries.move_to_end(key)
+                    return value
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ReferenceTableCache:
+    """Versioned in-memory cache of representations of small, rarely changing
+    reference table rows keyed by their primary keys.
+
+    Each table has a version which is bumped whenever a session flushes,
+    commits or rolls back changes to that table within the process, which
+    invalidates every cached representation of its rows. Changes done by
+    other processes or by bulk ``Query.update()``/``Query.delete()`` are not
+    tracked.
+    """
+
+    session_info_key = "rest_witchcraft_reference_tables"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = defaultdict(int)
+        self._entries = {}
+
+    def get(self, key, table, loader):
+        """Returns cached mapping of primary keys to representations for the
+        key, calling ``loader`` to build it when missing or stale."""
+        version = self._versions[table]
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] != version:
+            entry = (version, loader())
+            with self._lock:
+                self._entries[key] = entry
+
+        return entry[1]
+
+    def invalidate(self, *tables):
+        """Bumps versions of given tables."""
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._entries.clear()
+
+    def after_flush(self, session, flush_context):
+        if not self._versions:
+            return
+
+        tables = {
+            table
+            for instance in chain(session.new, session.dirty, session.deleted)
+            for table in sa.inspect(instance).mapper.tables
+            if table in self._versions
+        }
+        if tables:
+            session.info.setdefault(self.session_info_key, set()).update(tables)
+            self.invalidate(*tables)
+
+    def after_transaction_end(self, session, *args):
+        # rows loaded by other sessions between the flush and the end of the transaction
+        # could have been cached from either side of the transaction
+        tables = session.info.pop(self.session_info_key, None)
+        if tables:
+            self.invalidate(*tables)
+
+
+reference_tables = ReferenceTableCache()
+expand_plans = LRUCache(maxsize=1024)
+lookup_plans = LRUCache(maxsize=1024)
+filter_plans = LRUCache(maxsize=1024)
+filter_serializers = LRUCache(maxsize=256)
+ordering_plans = LRUCache(maxsize=1024)
+query_serializers = LRUCache(maxsize=256)
+query_validations = LRUCache(maxsize=4096)
+search_plans = LRUCache(maxsize=1024)
+counts = LRUCache(maxsize=1024)
+
+event.listen(orm.Session, "after_flush", reference_tables.after_flush)
+event.listen(orm.Session, "after_commit", reference_tables.after_transaction_end)
+event.listen(orm.Session, "after_rollback", reference_tables.after_transaction_end)
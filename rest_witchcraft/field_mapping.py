@@ -11,7 +11,7 @@ from rest_framework import fields
 
 from rest_enumfield import EnumField
 
-from .fields import CharMappingField
+from .fields import CharMappingField, LargeBinaryField
 
 
 def get_detail_view_name(model):
@@ -65,6 +65,9 @@ def get_field_type(column):
     if isinstance(column.type, sqltypes.Enum) and not column.type.enum_class:
         return fields.ChoiceField
 
+    if isinstance(column.type, sqltypes.LargeBinary):
+        return LargeBinaryField
+
     if isinstance(column.type, postgresql.ARRAY):
         child_field = SERIALIZER_FIELD_MAPPING.get(column.type.item_type.__class__) or SERIALIZER_FIELD_MAPPING.get(
             column.type.item_type.python_type
@@ -94,3 +97,21 @@ def get_field_type(column):
     for typ in column.type.python_type.mro():
         if typ in SERIALIZER_FIELD_MAPPING:
             return SERIALIZER_FIELD_MAPPING.get(typ)
+
+
+def get_column_field(column_info, **kwargs):
+    """Returns field instance validating values of the column or ``None``
+    when the field type could not be determined."""
+    field_class = get_field_type(column_info.column)
+    if field_class is None:
+        return None
+
+    for key in ("choices", "max_digits", "decimal_places"):
+        if key in column_info.field_kwargs:
+            kwargs.setdefault(key, column_info.field_kwargs[key])
+
+    if issubclass(field_class, fields.DecimalField):
+        kwargs.setdefault("max_digits", None)
+        kwargs.setdefault("decimal_places", None)
+
+    return field_class(**kwargs)
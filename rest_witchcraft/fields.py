@@ -1,13 +1,91 @@
 """Some SQLAlchemy specific field types."""
+import base64
+import copy
+import re
+import uuid
+from urllib import parse
 
+import sqlalchemy as sa
+from sqlalchemy import func, orm, select, tuple_
+from sqlalchemy.orm.attributes import instance_state
+from sqlalchemy.orm.interfaces import MANYTOONE
+
+from django.core.exceptions import ImproperlyConfigured
 from django.db.models.constants import LOOKUP_SEP
+from django.urls import NoReverseMatch, Resolver404, get_script_prefix, get_urlconf, resolve
+from django.utils.encoding import uri_to_iri
+from django.utils.translation import gettext_lazy as _
 
 from django_sorcery.db import meta
 
 from rest_framework import fields, relations
+from rest_framework.exceptions import ValidationError
+from rest_framework.reverse import reverse
+
+from .utils import get_foreign_key, get_render_cache
+
+
+SAFE_URL_VALUE = re.compile(r"[-a-zA-Z0-9_]+")
+
+
+class UrlTemplateMixin:
+    """Reverses URLs by resolving the view once into a URL template and
+    substituting values into it.
+
+    Templates are built by reversing the view with sentinel values
+    therefore they respect script prefix, format suffix, versioning and
+    absolute URLs of the request. Only non negative integers and plain
+    strings which do not need escaping are substituted, anything else or
+    routes which do not accept such values fall back to ``reverse()``.
+    """
+
+    #: random tokens per value type formatted with position of the value which
+    #: therefore neither contain each other nor occur anywhere else in URLs
+    url_template_sentinels = {
+        int: "{}{{:03d}}".format(uuid.uuid4().int),
+        str: "{}{{:03d}}".format(uuid.uuid4().hex),
+    }
+
+    def reverse_url(self, view_name, kwargs, request=None, format=None):
+        values = list(kwargs.values())
+        template = None
+        if all(type(value) is int and value >= 0 for value in values):
+            template = self.get_url_template(view_name, tuple(kwargs), request, format, int)
+        elif all(isinstance(value, str) and SAFE_URL_VALUE.fullmatch(value) for value in values):
+            template = self.get_url_template(view_name, tuple(kwargs), request, format, str)
+
+        if template is None:
+            return self.reverse(view_name, kwargs=kwargs, request=request, format=format)
+
+        return template.format(*values)
+
+    def get_url_template(self, view_name, names, request, format, value_type):
+        """Returns cached URL template for the view or ``None`` when view
+        cannot be templated."""
+        templates = self.__dict__.setdefault("_url_templates", {})
+        key = (view_name, names, format, value_type, get_script_prefix(), get_urlconf())
+        cached = templates.get(key)
+        if cached is not None and cached[0] is request:
+            return cached[1]
+
+        sentinels = [self.url_template_sentinels[value_type].format(i) for i in range(len(names))]
+        try:
+            template = self.reverse(view_name, kwargs=dict(zip(names, sentinels)), request=request, format=format)
+        except NoReverseMatch:
+            template = None
+        else:
+            template = template.replace("{", "{{").replace("}", "}}")
+            for i, sentinel in enumerate(sentinels):
+                if template.count(sentinel) != 1:
+                    template = None
+                    break
+                template = template.replace(sentinel, "{%d}" % i)
+
+        templates[key] = (request, template)
+        return template
 
 
-class HyperlinkedIdentityField(relations.HyperlinkedIdentityField):
+class HyperlinkedIdentityField(UrlTemplateMixin, relations.HyperlinkedIdentityField):
     def get_url(self, obj, view_name, request, format):
         info = meta.model_info(obj.__class__)
 
@@ -20,7 +98,7 @@ class HyperlinkedIdentityField(relations.HyperlinkedIdentityField):
         else:
             kwargs = {k: getattr(obj, k) for k in info.primary_keys}
 
-        return self.reverse(view_name, kwargs=kwargs, request=request, format=format)
+        return self.reverse_url(view_name, kwargs, request=request, format=format)
 
 
 class UriField(HyperlinkedIdentityField):
@@ -32,6 +110,338 @@ class UriField(HyperlinkedIdentityField):
         return super().get_url(obj, view_name, None, format)
 
 
+class PrimaryKeyRelatedField(relations.RelatedField):
+    """Represents a relationship of a model serializer by the primary key of
+    the related model.
+
+    Many to one relationships are rendered straight from the local foreign
+    key columns without loading the related instance. With ``many=True``
+    related primary keys are queried without loading related instances
+    unless the collection is already loaded, and all primary keys given on
+    writes are validated with a single ``IN`` query:
+
+    .. code::
+
+        class OwnerSerializer(ModelSerializer):
+            vehicles = PrimaryKeyRelatedField(many=True)
+
+    Composite primary keys are represented as lists of their values.
+    """
+
+    default_error_messages = {
+        "required": _("This field is required."),
+        "does_not_exist": _('Invalid pk "{pk_value}" - object does not exist.'),
+        "incorrect_type": _("Incorrect type. Expected pk value, received {data_type}."),
+    }
+
+    def __init__(self, **kwargs):
+        self.pk_field = kwargs.pop("pk_field", None)
+        super().__init__(**kwargs)
+
+    def __deepcopy__(self, memo=None):
+        """Same as in DRF except queryset is treated as immutable."""
+        args = [copy.deepcopy(item) for item in self._args]
+        kwargs = {
+            key: (copy.deepcopy(value) if (key not in ("validators", "queryset")) else value)
+            for key, value in self._kwargs.items()
+        }
+        return self.__class__(*args, **kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        field = super().many_init(*args, **kwargs)
+        # ManyPrimaryKeyRelatedField adds no state of its own so swapping the class is enough
+        field.__class__ = ManyPrimaryKeyRelatedField
+        return field
+
+    @property
+    def relation_info(self):
+        field = self.parent if isinstance(self.parent, relations.ManyRelatedField) else self
+        return meta.model_info(field.parent.model).relationships[field.source]
+
+    def get_queryset(self):
+        if self.queryset is not None:
+            return self.queryset
+
+        field = self.parent if isinstance(self.parent, relations.ManyRelatedField) else self
+        return field.parent.session.query(self.relation_info.related_model)
+
+    def get_attribute(self, instance):
+        relation_info = self.relation_info
+        if relation_info.direction != MANYTOONE or self.source in instance.__dict__:
+            related = super().get_attribute(instance)
+            return None if related is None else meta.model_info(related.__class__).get_key(related)
+
+        return get_foreign_key(instance, relation_info)
+
+    def loads_relationship(self, instance):
+        """Returns whether rendering the instance lazy loads the
+        relationship, which many to one relationships do not."""
+        return self.relation_info.direction != MANYTOONE and self.source not in instance.__dict__
+
+    def get_related_keys(self, instance):
+        """Returns primary keys of the related collection of the
+        instance."""
+        relation_info = self.relation_info
+        state = sa.inspect(instance)
+        if relation_info.name in instance.__dict__ or not state.persistent:
+            info = meta.model_info(relation_info.related_model)
+            return [info.get_key(i) for i in getattr(instance, relation_info.name)]
+
+        query = state.session.query(*relation_info.related_mapper.primary_key).filter(
+            orm.with_parent(instance, relation_info.attribute)
+        )
+        if relation_info.relationship.order_by:
+            query = query.order_by(*relation_info.relationship.order_by)
+        return [tuple(row) for row in query]
+
+    def to_representation(self, value):
+        if not isinstance(value, tuple):
+            # model instances are represented when rendering choices
+            value = meta.model_info(value.__class__).get_key(value)
+
+        if len(value) > 1:
+            return value
+        if self.pk_field is not None:
+            return self.pk_field.to_representation(value[0])
+        return value[0]
+
+    def to_internal_value(self, data):
+        return self.get_objects([data])[0]
+
+    def to_key(self, data):
+        """Returns the primary key tuple for the given representation."""
+        columns = self.relation_info.related_mapper.primary_key
+        if len(columns) == 1:
+            if self.pk_field is not None:
+                return (self.pk_field.to_internal_value(data),)
+            values = [data]
+        elif isinstance(data, (list, tuple)) and len(data) == len(columns):
+            values = data
+        else:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        try:
+            return tuple(self.to_key_value(column, value) for column, value in zip(columns, values))
+        except ValidationError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+    def to_key_value(self, column, value):
+        """Validates the value of the primary key column with the serializer
+        field of the column type."""
+        field = self.get_key_fields().get(column)
+        return value if field is None else field.to_internal_value(value)
+
+    def get_key_fields(self):
+        """Returns serializer fields of primary key columns of the related
+        model by column."""
+        if "_key_fields" not in self.__dict__:
+            # field mapping depends on fields module
+            from .field_mapping import get_column_field
+
+            info = meta.model_info(self.relation_info.related_model)
+            self._key_fields = {
+                column_info.column: get_column_field(column_info) for column_info in info.primary_keys.values()
+            }
+        return self._key_fields
+
+    def get_objects(self, data):
+        """Returns related instances for all given primary keys loaded with a
+        single query."""
+        keys = [self.to_key(item) for item in data]
+        if not keys:
+            return []
+
+        columns = list(self.relation_info.related_mapper.primary_key)
+        if len(columns) == 1:
+            criterion = columns[0].in_({key[0] for key in keys})
+        else:
+            criterion = tuple_(*columns).in_(set(keys))
+
+        info = meta.model_info(self.relation_info.related_model)
+        objects = {info.get_key(instance): instance for instance in self.get_queryset().filter(criterion)}
+
+        for item, key in zip(data, keys):
+            if key not in objects:
+                self.fail("does_not_exist", pk_value=item)
+
+        return [objects[key] for key in keys]
+
+
+class HyperlinkedRelatedField(UrlTemplateMixin, PrimaryKeyRelatedField):
+    """Represents a relationship of a model serializer by the URL of the
+    related model detail view.
+
+    Same as :py:class:`PrimaryKeyRelatedField` the URL is built from the local
+    foreign key columns so rendering many to one relationships issues no
+    queries. The view name defaults to the detail view name of the related
+    model. URLs of models with a single primary key use ``lookup_url_kwarg``
+    while composite primary keys are passed by their names the same way as
+    in :py:class:`HyperlinkedIdentityField`:
+
+    .. code::
+
+        class VehicleSerializer(ModelSerializer):
+            owner = HyperlinkedRelatedField()
+            options = HyperlinkedRelatedField(many=True, view_name="option-detail")
+    """
+
+    default_error_messages = {
+        "required": _("This field is required."),
+        "no_match": _("Invalid hyperlink - No URL match."),
+        "incorrect_match": _("Invalid hyperlink - Incorrect URL match."),
+        "does_not_exist": _("Invalid hyperlink - Object does not exist."),
+        "incorrect_type": _("Incorrect type. Expected URL string, received {data_type}."),
+    }
+
+    def __init__(self, view_name=None, **kwargs):
+        self.view_name = view_name
+        self.lookup_url_kwarg = kwargs.pop("lookup_url_kwarg", "pk")
+        self.format = kwargs.pop("format", None)
+        self.reverse = reverse
+        super().__init__(**kwargs)
+
+    def get_view_name(self):
+        if self.view_name is not None:
+            return self.view_name
+
+        # field mapping depends on fields module
+        from .field_mapping import get_detail_view_name
+
+        return get_detail_view_name(self.relation_info.related_model)
+
+    def get_url_kwargs(self, key):
+        names = list(meta.model_info(self.relation_info.related_model).primary_keys)
+        if len(names) == 1:
+            return {self.lookup_url_kwarg: key[0]}
+        return dict(zip(names, key))
+
+    def to_representation(self, value):
+        if not isinstance(value, tuple):
+            # model instances are represented when rendering choices
+            value = meta.model_info(value.__class__).get_key(value)
+
+        request = self.context.get("request")
+        format = self.context.get("format")
+        if format and self.format and self.format != format:
+            format = self.format
+
+        view_name = self.get_view_name()
+        try:
+            url = self.reverse_url(view_name, self.get_url_kwargs(value), request=request, format=format)
+        except NoReverseMatch:
+            raise ImproperlyConfigured(
+                "Could not resolve URL for hyperlinked relationship using view name '{}'. "
+                "You may have failed to include the related model in your API, or incorrectly "
+                "configured the `lookup_url_kwarg` attribute on this field.".format(view_name)
+            )
+
+        return relations.Hyperlink(url, value)
+
+    def to_key(self, data):
+        """Resolves the URL and returns the primary key tuple from its
+        kwargs."""
+        try:
+            http_prefix = data.startswith(("http:", "https:"))
+        except AttributeError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        if http_prefix:
+            # If needed convert absolute URLs to relative path
+            data = parse.urlparse(data).path
+            prefix = get_script_prefix()
+            if data.startswith(prefix):
+                start = len(prefix)
+                data = "/" + data[start:]
+
+        try:
+            match = resolve(uri_to_iri(parse.unquote(data)))
+        except Resolver404:
+            self.fail("no_match")
+
+        request = self.context.get("request")
+        view_name = self.get_view_name()
+        try:
+            expected_view_name = request.versioning_scheme.get_versioned_viewname(view_name, request)
+        except AttributeError:
+            expected_view_name = view_name
+
+        if match.view_name != expected_view_name:
+            self.fail("incorrect_match")
+
+        names = list(meta.model_info(self.relation_info.related_model).primary_keys)
+        if len(names) == 1:
+            return super().to_key(match.kwargs.get(self.lookup_url_kwarg))
+        return super().to_key([match.kwargs.get(name) for name in names])
+
+
+class ManyPrimaryKeyRelatedField(relations.ManyRelatedField):
+    """Same as DRF ``ManyRelatedField`` except related primary keys are
+    queried without loading related instances, for all instances of a list
+    at once, and are validated with a single query."""
+
+    def get_attribute(self, instance):
+        # keys of the whole list are loaded by ModelSerializer.prefetch
+        keys = get_render_cache(self, "related_keys").get((self, instance_state(instance)))
+        if keys is not None:
+            return keys
+        return self.child_relation.get_related_keys(instance)
+
+    def loads_relationship(self, instance):
+        return False
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        return self.child_relation.get_objects(data)
+
+
+class LargeBinaryField(UrlTemplateMixin, fields.Field):
+    """Represents a large binary column by the URL which streams its content
+    instead of rendering the content itself, see
+    :py:class:`rest_witchcraft.mixins.LargeBinaryMixin`.
+
+    The view name defaults to the ``binary`` action of the model viewset.
+    The column is never accessed therefore model serializers defer it in
+    view querysets. When the view cannot be reversed, e.g. the viewset does
+    not use the mixin, the content is rendered inline base64 encoded
+    instead which loads the deferred column.
+    """
+
+    def __init__(self, view_name=None, **kwargs):
+        self.view_name = view_name
+        self.lookup_url_kwarg = kwargs.pop("lookup_url_kwarg", "pk")
+        self.reverse = reverse
+        for key in ("required", "default", "validators", "max_length"):
+            kwargs.pop(key, None)
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_view_name(self):
+        return self.view_name or "{}-binary".format(self.parent.model.__name__.lower())
+
+    def get_attribute(self, instance):
+        return instance
+
+    def to_representation(self, value):
+        info = meta.model_info(value.__class__)
+        key = info.get_key(value)
+        if key is None:
+            return None
+
+        names = list(info.primary_keys)
+        kwargs = {self.lookup_url_kwarg: key[0]} if len(names) == 1 else dict(zip(names, key))
+        kwargs["binary_field"] = self.field_name
+        try:
+            return self.reverse_url(self.get_view_name(), kwargs, request=self.context.get("request"))
+        except NoReverseMatch:
+            content = getattr(value, self.field_name if self.source == "*" else self.source)
+            return None if content is None else base64.b64encode(content).decode("ascii")
+
+
 class CharMappingField(fields.DictField):
     """Used for Postgresql HSTORE columns for storing key-value pairs."""
 
@@ -79,3 +489,75 @@ class SkippableField(fields.Field):
 
     def get_attribute(self, instance):
         raise fields.SkipField
+
+
+class AggregateField(fields.ReadOnlyField):
+    """Read only field which renders an aggregate over a relationship computed
+    in SQL instead of loading the related collection.
+
+    For example:
+
+    .. code::
+
+        class OwnerSerializer(ModelSerializer):
+            vehicle_count = AggregateField("vehicles", func.count)
+            last_purchase = AggregateField("vehicles", func.max, column="created_at")
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = "__all__"
+
+    The aggregate is compiled into a correlated scalar subquery. ``ModelSerializer``
+    loads all aggregate fields for a list of instances with a single query before
+    rendering them, and the same expression can be used by ordering backends.
+    """
+
+    def __init__(self, relationship, function=func.count, column=None, **kwargs):
+        self.relationship = relationship
+        self.function = function
+        self.column = column
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return get_render_cache(self, "aggregate_values").get((self, instance_state(instance)))
+
+    def get_expression(self, model):
+        """Returns the correlated scalar subquery which computes the aggregate
+        for the given model."""
+        info = meta.model_info(model)
+        relation = info.relationships[self.relationship]
+        target_info = meta.model_info(relation.related_model)
+
+        # aggregating over the primary key by default is what makes func.count count related rows
+        column = getattr(relation.related_model, self.column or next(iter(target_info.primary_keys)))
+
+        query = select([self.function(column)]).where(relation.relationship.primaryjoin)
+        if relation.relationship.secondary is not None:
+            query = query.where(relation.relationship.secondaryjoin)
+
+        query = query.correlate(relation.parent_table)
+        return query.scalar_subquery() if hasattr(query, "scalar_subquery") else query.as_scalar()
+
+
+class HasMoreField(fields.ReadOnlyField):
+    """Read only field which renders whether a nested collection rendered with
+    a ``limit`` has more items than were rendered.
+
+    For example:
+
+    .. code::
+
+        class OwnerSerializer(ModelSerializer):
+            vehicles = VehicleSerializer(many=True, limit=5, order_by=["-created_at"])
+            has_more_vehicles = HasMoreField("vehicles")
+    """
+
+    def __init__(self, collection, **kwargs):
+        self.collection = collection
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        has_more = get_render_cache(self, "collection_has_more")
+        return has_more.get((self.parent, self.collection, instance_state(instance)), False)
@@ -1,25 +1,78 @@
 """Provides generic filtering backends that can be used to filter the results
 returned by list views."""
+import logging
+import re
+from collections import OrderedDict, namedtuple
 
-from sqlalchemy import func, or_
+import sqlalchemy as sa
+from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint, and_, func, or_, orm
 from sqlalchemy.sql import operators
 
+from django.db.models.constants import LOOKUP_SEP
 from django.template import loader
 from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy
 
+from django_sorcery.db import meta
+
+from rest_framework import fields, serializers
 from rest_framework.compat import coreapi, coreschema
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import BaseFilterBackend
 from rest_framework.settings import api_settings
 
+from .cache import filter_plans, filter_serializers, ordering_plans, search_plans
+from .field_mapping import get_column_field
+from .fields import AggregateField
+
+
+logger = logging.getLogger(__name__)
+
+SearchTerm = namedtuple("SearchTerm", ["relations", "model", "attr", "lookup", "parse"])
+OrderingTerm = namedtuple("OrderingTerm", ["path", "attr", "descending"])
+FilterTerm = namedtuple("FilterTerm", ["param", "attr", "lookup"])
+FilterGroup = namedtuple("FilterGroup", ["relations", "model", "terms"])
+
+
+def escape_like(value, escape="/"):
+    """Escapes ``LIKE`` wildcards in the value."""
+    return value.replace(escape, escape * 2).replace("%", escape + "%").replace("_", escape + "_")
+
+
+def get_related_criterion(relations, criterion):
+    """Wraps criterion of the last related model into correlated ``EXISTS``
+    subqueries following given relationship infos."""
+    for relation in reversed(relations):
+        attribute = relation.attribute
+        criterion = attribute.any(criterion) if relation.uselist else attribute.has(criterion)
+    return criterion
+
 
 class SearchFilter(BaseFilterBackend):
+    """Filters results matching every search term in any of ``search_fields``
+    of the view.
+
+    Text fields are matched with the lookup of the field prefix, ``^`` and ``=``
+    compare ``lower()`` of the column with a lowercased term so that ``lower()``
+    functional indexes, with ``text_pattern_ops`` for prefixes, can be used.
+    Numeric, enum and other typed columns only match terms parseable by their
+    serializer field type, by equality. Search plans are compiled once per model
+    and search fields.
+
+    Search fields can follow relationships, e.g. ``owner__first_name``, which are
+    matched with correlated ``EXISTS`` subqueries so that each result is returned
+    once, fields of the same relationship path sharing one subquery per term.
+
+    Matching of a field can be customized by overriding ``get_term_criterion``.
+    Overriding ``get_expression`` is still honored but bypasses search plans.
+    """
+
     search_param = api_settings.SEARCH_PARAM
     template = "rest_framework/filters/search.html"
     lookup_prefixes = {
-        "": lambda c, x: operators.ilike_op(c, "%{}%".format(x)),  # icontains
-        "^": lambda c, x: c.ilike(x.replace("%", "%%") + "%"),  # istartswith
-        "=": lambda c, x: func.lower(c) == func.lower(x),  # iequals
+        "": lambda c, x: c.ilike("%{}%".format(escape_like(x)), escape="/"),  # icontains
+        "^": lambda c, x: func.lower(c).like(escape_like(x.lower()) + "%", escape="/"),  # istartswith
+        "=": lambda c, x: func.lower(c) == x.lower(),  # iequals
         "@": operators.eq,  # equals
     }
     search_title = gettext_lazy("Search")
@@ -78,19 +131,570 @@ class SearchFilter(BaseFilterBackend):
 
         model = view.get_model()
 
-        expressions = []
-        for field in search_fields:
-            for term in search_terms:
-                expr = self.get_expression(model, field, term)
-                if expr is not None:
-                    expressions.append(expr)
+        clauses = []
+        for term in search_terms:
+            expressions = self.get_term_expressions(model, search_fields, term)
+            clauses.append(or_(*expressions) if expressions else sa.false())
+
+        return queryset.filter(and_(*clauses))
+
+    def get_term_expressions(self, model, search_fields, term):
+        """Returns expressions of which any has to match the term.
+
+        Subclasses overriding :py:meth:`get_expression` have it called for each
+        of the search fields instead of the cached search plan being used.
+        """
+        if type(self).get_expression is not SearchFilter.get_expression:
+            expressions = (self.get_expression(model, field, term) for field in search_fields)
+            return [expression for expression in expressions if expression is not None]
+
+        plan = search_plans.get(
+            (type(self), model, tuple(search_fields)), lambda: self.get_search_plan(model, search_fields)
+        )
+
+        groups = OrderedDict()
+        for search_term in plan:
+            criterion = self.get_term_criterion(search_term, term)
+            if criterion is not None:
+                groups.setdefault(search_term.relations, []).append(criterion)
+
+        return [get_related_criterion(relations, or_(*criteria)) for relations, criteria in groups.items()]
 
-        return queryset.filter(or_(*expressions))
+    def get_search_plan(self, model, search_fields):
+        """Returns :py:class:`SearchTerm` tuples of the search fields."""
+        return tuple(self.get_search_term(model, field) for field in search_fields)
+
+    def get_search_term(self, model, field):
+        prefix = field[0] if field[0] in self.lookup_prefixes else ""
+        *path, attr = (field[1:] if prefix else field).split(LOOKUP_SEP)
+
+        relations = []
+        for name in path:
+            relation = meta.model_info(model).relationships.get(name)
+            assert relation is not None, "Cannot search {} by '{}', '{}' is not a relationship".format(
+                model.__name__, field, name
+            )
+            relations.append(relation)
+            model = relation.related_model
+
+        info = meta.model_info(model)
+        column_info = info.primary_keys.get(attr) or info.properties.get(attr)
+        serializer_field = get_column_field(column_info) if column_info is not None else None
+
+        if serializer_field is None or isinstance(serializer_field, fields.CharField):
+            return SearchTerm(tuple(relations), model, attr, self.lookup_prefixes[prefix], None)
+        return SearchTerm(tuple(relations), model, attr, operators.eq, serializer_field.to_internal_value)
+
+    def get_term_criterion(self, search_term, term):
+        """Returns criterion of the related model of the search term matching
+        the term or ``None`` when the term cannot match the field."""
+        if search_term.parse is not None:
+            try:
+                term = search_term.parse(term)
+            except ValidationError:
+                return None
+        return search_term.lookup(getattr(search_term.model, search_term.attr), term)
 
     def get_expression(self, model, field, term):
-        op = self.lookup_prefixes[""]
-        if field[0] in self.lookup_prefixes:
-            op = self.lookup_prefixes[field[0]]
-            field = field[1:]
+        """Returns expression of the search field matching the term or
+        ``None`` when the term cannot match the field."""
+        search_term = self.get_search_term(model, field)
+        criterion = self.get_term_criterion(search_term, term)
+        return get_related_criterion(search_term.relations, criterion) if criterion is not None else None
+
+
+class OrderingFilter(BaseFilterBackend):
+    """Orders results by the comma separated ``ordering`` query parameter,
+    falling back to ``ordering`` of the view.
+
+    Only fields listed in ``ordering_fields`` of the view are allowed, which
+    defaults to column attributes of the model. Fields can follow many-to-one
+    relationships, e.g. ``owner__last_name``, each relationship path being outer
+    joined once, or name an :py:class:`rest_witchcraft.fields.AggregateField` of
+    the serializer. Primary keys of the model are always appended in the direction
+    of the last ordering so that the order is deterministic.
+
+    With ``warn_unindexed`` an ordering whose leading column is not the leading
+    column of any index in the table metadata is logged once.
+    """
+
+    ordering_param = api_settings.ORDERING_PARAM
+    ordering_title = gettext_lazy("Ordering")
+    ordering_description = gettext_lazy("Which field to use when ordering the results.")
+    template = "rest_framework/filters/ordering.html"
+    warn_unindexed = False
+
+    def get_schema_fields(self, view):
+        assert coreapi is not None, "coreapi must be installed to use `get_schema_fields()`"
+        assert coreschema is not None, "coreschema must be installed to use `get_schema_fields()`"
+        return [
+            coreapi.Field(
+                name=self.ordering_param,
+                required=False,
+                location="query",
+                schema=coreschema.String(
+                    title=force_str(self.ordering_title), description=force_str(self.ordering_description)
+                ),
+            )
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        fields = self.get_valid_fields(view)
+        return [
+            {
+                "name": self.ordering_param,
+                "required": False,
+                "in": "query",
+                "description": force_str(self.ordering_description),
+                "schema": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": [p + f for f in fields for p in ("", "-")]},
+                },
+                "style": "form",
+                "explode": False,
+            }
+        ]
+
+    def get_valid_fields(self, view):
+        """Returns names of fields results can be ordered by."""
+        fields = getattr(view, "ordering_fields", None)
+        if fields is None or fields == "__all__":
+            info = meta.model_info(view.get_model())
+            return list(info.primary_keys) + list(info.properties)
+        return list(fields)
+
+    def get_default_ordering(self, view):
+        ordering = getattr(view, "ordering", None)
+        if isinstance(ordering, str):
+            return [ordering]
+        return list(ordering or [])
+
+    def get_ordering(self, request, queryset, view):
+        """Returns requested ordering limited to valid fields or the default
+        ordering of the view."""
+        params = request.query_params.get(self.ordering_param)
+        if params:
+            valid = set(self.get_valid_fields(view))
+            ordering = [term for term in (param.strip() for param in params.split(",")) if term.lstrip("-") in valid]
+            if ordering:
+                return ordering
+        return self.get_default_ordering(view)
+
+    def to_html(self, request, queryset, view):
+        current = self.get_ordering(request, queryset, view)
+        options = []
+        for field in self.get_valid_fields(view):
+            label = field.replace("__", " ").replace("_", " ")
+            options.append((field, "{} - ascending".format(label)))
+            options.append(("-" + field, "{} - descending".format(label)))
+
+        context = {
+            "request": request,
+            "current": current[0] if current else None,
+            "param": self.ordering_param,
+            "options": options,
+        }
+        template = loader.get_template(self.template)
+        return template.render(context)
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        model = view.get_model()
+
+        info = meta.model_info(model)
+        columns = set(info.primary_keys) | set(info.properties)
+        aggregates = {}
+        if any(LOOKUP_SEP not in field and field.lstrip("-") not in columns for field in ordering):
+            aggregates = self.get_aggregates(view)
+
+        plan = ordering_plans.get(
+            (model, tuple(ordering), tuple(sorted(aggregates)), self.warn_unindexed),
+            lambda: self.get_plan(model, ordering, aggregates),
+        )
+        if ordering:
+            queryset = queryset.order_by(None)
+
+        aliases = {(): (model, model)}
+        clauses = []
+        for term in plan:
+            if not term.path and term.attr in aggregates:
+                column = aggregates[term.attr].get_expression(model)
+            else:
+                queryset = self.join_path(queryset, aliases, term.path)
+                column = getattr(aliases[term.path][0], term.attr)
+            clauses.append(column.desc() if term.descending else column.asc())
+
+        return queryset.order_by(*clauses)
+
+    def get_aggregates(self, view):
+        """Returns aggregate fields of the serializer by name."""
+        serializer = view.get_serializer()
+        return {name: field for name, field in serializer.fields.items() if isinstance(field, AggregateField)}
+
+    def join_path(self, queryset, aliases, path):
+        """Outer joins each relationship of the path once, recording joined
+        ``(alias, model)`` pairs by path."""
+        for i in range(1, len(path) + 1):
+            if path[:i] not in aliases:
+                parent, parent_model = aliases[path[: i - 1]]
+                related_model = meta.model_info(parent_model).relationships[path[i - 1]].related_model
+                alias = orm.aliased(related_model)
+                queryset = queryset.outerjoin(alias, getattr(parent, path[i - 1]))
+                aliases[path[:i]] = (alias, related_model)
+        return queryset
+
+    def get_plan(self, model, ordering, aggregates):
+        """Resolves ordering fields into :py:class:`OrderingTerm` tuples ending
+        with primary keys of the model."""
+        plan = []
+        for field in ordering:
+            *path, attr = field.lstrip("-").split(LOOKUP_SEP)
+            if not path and attr in aggregates:
+                plan.append(OrderingTerm((), attr, field.startswith("-")))
+                continue
+
+            target = model
+            for name in path:
+                relation = meta.model_info(target).relationships.get(name)
+                assert (
+                    relation is not None and not relation.uselist
+                ), "Cannot order {} by '{}', only many-to-one relationships can be followed".format(
+                    model.__name__, field
+                )
+                target = relation.related_model
+
+            info = meta.model_info(target)
+            assert (
+                attr in info.primary_keys or attr in info.properties
+            ), "Cannot order {} by '{}', only column attributes are supported".format(model.__name__, field)
+            plan.append(OrderingTerm(tuple(path), attr, field.startswith("-")))
+
+        if self.warn_unindexed and plan:
+            self.check_index(model, plan[0])
+
+        descending = plan[-1].descending if plan else False
+        ordered = {term.attr for term in plan if not term.path}
+        plan.extend(
+            OrderingTerm((), attr, descending) for attr in meta.model_info(model).primary_keys if attr not in ordered
+        )
+        return tuple(plan)
+
+    def check_index(self, model, term):
+        """Logs a warning when the column of the term does not lead any index
+        of its table, aggregates are not checked."""
+        target = model
+        for name in term.path:
+            target = meta.model_info(target).relationships[name].related_model
+
+        info = meta.model_info(target)
+        field = info.primary_keys.get(term.attr) or info.properties.get(term.attr)
+        if field is None:
+            return
+
+        column = field.column
+        indexes = [index.columns for index in column.table.indexes] + [
+            constraint.columns
+            for constraint in column.table.constraints
+            if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+        ]
+        if not any(list(columns)[:1] == [column] for columns in indexes):
+            logger.warning(
+                "Ordering %s by '%s' is not supported by any index of table %s",
+                model.__name__,
+                LOOKUP_SEP.join(term.path + (term.attr,)),
+                column.table.name,
+            )
+
+
+class FullTextSearchFilter(SearchFilter):
+    """Full text search using PostgreSQL ``tsvector`` or SQLite FTS5, falling
+    back to :py:class:`SearchFilter` on other databases.
+
+    ``search_fields`` of the view can be a mapping of fields to PostgreSQL weights
+    ``"A"`` to ``"D"`` (``"D"`` by default), ranked with ``search_weights``:
+
+    .. code::
+
+        class DocumentViewSet(ModelViewSet):
+            search_fields = {"title": "A", "body": "B"}
+
+    On PostgreSQL the search string is parsed with ``websearch_to_tsquery`` and
+    matched against ``search_vector`` column of the view when set, e.g. a
+    generated ``tsvector`` column, or the weighted ``to_tsvector`` of the fields
+    using ``search_config``, which a GIN expression index can serve when it
+    declares the same expression::
+
+        CREATE INDEX ON documents USING GIN ((
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(body, '')), 'B')
+        ))
+
+    Such vectors can only be built of column attributes of the model, searching
+    fields which follow relationships needs a ``search_vector`` column.
+
+    On SQLite terms are matched against FTS5 table ``search_fts_table`` of the
+    view, ``<table>_fts`` by default, whose rowid is the integer primary key and
+    whose columns are the search fields in the same order.
+
+    Results are ordered by rank and primary keys in the filtered query itself so
+    that ``LIMIT`` of pagination applies to the ranked query.
+    """
+
+    search_config = "english"
+    search_weights = {"A": 1.0, "B": 0.4, "C": 0.2, "D": 0.1}
+
+    def get_weighted_fields(self, view, request):
+        """Returns ``(field, weight)`` pairs of search fields."""
+        fields = self.get_search_fields(view, request) or ()
+        if not isinstance(fields, dict):
+            fields = dict.fromkeys(fields, "D")
+
+        for weight in fields.values():
+            assert weight in self.search_weights, "Unknown search weight '{}'".format(weight)
+        return [(field.lstrip("".join(self.lookup_prefixes)), weight) for field, weight in fields.items()]
+
+    def filter_queryset(self, request, queryset, view):
+        fields = self.get_weighted_fields(view, request)
+        terms = self.get_search_terms(request)
+
+        if not fields or not terms:
+            return queryset
+
+        dialect = queryset.session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return self.filter_postgresql(queryset, view, fields, terms)
+        if dialect == "sqlite":
+            return self.filter_sqlite(queryset, view, fields, terms)
+        return super().filter_queryset(request, queryset, view)
+
+    def get_search_vector(self, view, fields):
+        """Returns ``search_vector`` column of the view or weighted
+        ``tsvector`` of the fields."""
+        model = view.get_model()
+        vector = getattr(view, "search_vector", None)
+        if vector is not None:
+            return getattr(model, vector)
+
+        info = meta.model_info(model)
+        config = self.get_search_config(view)
+        for field, weight in fields:
+            assert field in info.primary_keys or field in info.properties, (
+                "Cannot build search vector of {} from '{}', only column attributes are supported, "
+                "set search_vector of the view instead".format(model.__name__, field)
+            )
+            document = func.to_tsvector(config, func.coalesce(getattr(model, field), sa.literal_column("''")))
+            document = func.setweight(document, sa.literal_column("'{}'".format(weight)))
+            vector = document if vector is None else vector.op("||")(document)
+        return vector
+
+    def get_search_config(self, view):
+        # rendered as a literal so that the expression matches expression indexes
+        config = getattr(view, "search_config", None) or self.search_config
+        assert re.match(r"^\w+$", config), "Invalid search config '{}'".format(config)
+        return sa.literal_column("'{}'".format(config))
+
+    def filter_postgresql(self, queryset, view, fields, terms):
+        model = view.get_model()
+        vector = self.get_search_vector(view, fields)
+        query = func.websearch_to_tsquery(self.get_search_config(view), " ".join(terms))
+        weights = "{{{}}}".format(",".join(str(self.search_weights[w]) for w in ("D", "C", "B", "A")))
+
+        rank = func.ts_rank(sa.literal_column("'{}'".format(weights)), vector, query)
+        pks = [getattr(model, attr) for attr in meta.model_info(model).primary_keys]
+        return queryset.filter(vector.op("@@")(query)).order_by(None).order_by(rank.desc(), *pks)
+
+    def filter_sqlite(self, queryset, view, fields, terms):
+        model = view.get_model()
+        info = meta.model_info(model)
+        assert len(info.primary_keys) == 1, "FTS5 search of {} requires a single integer primary key".format(
+            model.__name__
+        )
+
+        name = getattr(view, "search_fts_table", None) or "{}_fts".format(sa.inspect(model).local_table.name)
+        fts = sa.table(name, sa.column("rowid"))
+        pk = getattr(model, next(iter(info.primary_keys)))
+
+        match = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        rank = func.bm25(sa.literal_column(name), *[self.search_weights[weight] for _, weight in fields])
+        return (
+            queryset.join(fts, fts.c.rowid == pk)
+            .filter(sa.literal_column(name).op("MATCH")(match))
+            .order_by(None)
+            .order_by(rank, pk)
+        )
+
+
+class CommaSeparatedListField(fields.ListField):
+    """List field which also splits comma separated values."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        return super().to_internal_value([value for item in data for value in str(item).split(",") if value])
+
+
+class FieldLookupFilter(BaseFilterBackend):
+    """Filters results by django style field lookups declared in
+    ``filterset_fields`` of the view, mapping field paths to allowed lookups:
+
+    .. code::
+
+        class VehicleViewSet(ModelViewSet):
+            filterset_fields = {
+                "id": ["exact", "in"],
+                "created_at": ["gte", "lt"],
+                "owner__last_name": ["istartswith"],
+            }
+
+    which allows ``?id__in=1,2&created_at__gte=2020-01-01&owner__last_name__istartswith=sm``.
+    The ``exact`` lookup is also available without its suffix. Fields can follow
+    relationships, which are filtered with ``EXISTS`` subqueries so that results are
+    not duplicated, terms of the same relationship path share one subquery.
+
+    Parameters are validated by a serializer generated once per view from the
+    column types, invalid values respond with 400. Expressions are planned once
+    per parameter signature.
+    """
+
+    lookups = {
+        "exact": operators.eq,
+        "iexact": lambda c, v: func.lower(c) == func.lower(v),
+        "contains": lambda c, v: c.contains(v, autoescape=True),
+        "icontains": lambda c, v: func.lower(c).contains(v.lower(), autoescape=True),
+        "startswith": lambda c, v: c.startswith(v, autoescape=True),
+        "istartswith": lambda c, v: func.lower(c).startswith(v.lower(), autoescape=True),
+        "endswith": lambda c, v: c.endswith(v, autoescape=True),
+        "iendswith": lambda c, v: func.lower(c).endswith(v.lower(), autoescape=True),
+        "gt": operators.gt,
+        "gte": operators.ge,
+        "lt": operators.lt,
+        "lte": operators.le,
+        "in": lambda c, v: c.in_(v),
+        "isnull": lambda c, v: c.is_(None) if v else c.isnot(None),
+    }
+    text_lookups = {"contains", "icontains", "startswith", "istartswith", "endswith", "iendswith"}
+
+    def get_filterset_fields(self, view):
+        fields = getattr(view, "filterset_fields", None) or {}
+        if not isinstance(fields, dict):
+            fields = {field: ["exact"] for field in fields}
+        return tuple((field, tuple(lookups)) for field, lookups in fields.items())
+
+    def get_filter_serializer_class(self, view):
+        """Returns serializer class of declared lookups, built once per model
+        and ``filterset_fields``."""
+        model = view.get_model()
+        filterset_fields = self.get_filterset_fields(view)
+        return filter_serializers.get(
+            (model, filterset_fields), lambda: self.build_filter_serializer_class(model, filterset_fields)
+        )
+
+    def build_filter_serializer_class(self, model, filterset_fields):
+        attrs = {}
+        for field, lookups in filterset_fields:
+            column_info = self.resolve_path(model, field)[-1]
+            for lookup in lookups:
+                assert lookup in self.lookups, "Unknown lookup '{}' for {}.{}".format(lookup, model.__name__, field)
+                attrs[self.get_param(field, lookup)] = self.build_field(column_info, lookup)
+        return type("{}FilterSerializer".format(model.__name__), (serializers.Serializer,), attrs)
+
+    def build_field(self, column_info, lookup):
+        """Returns serializer field validating values of the lookup."""
+        if lookup == "isnull":
+            return fields.BooleanField(required=False)
+        if lookup in self.text_lookups:
+            return fields.CharField(required=False)
+
+        field = get_column_field(column_info) if lookup == "in" else get_column_field(column_info, required=False)
+        assert field is not None, "Could not figure out type for attribute '{}'".format(column_info.name)
+
+        if lookup == "in":
+            return CommaSeparatedListField(child=field, required=False)
+        return field
+
+    def get_param(self, field, lookup):
+        return field if lookup == "exact" else LOOKUP_SEP.join([field, lookup])
+
+    def resolve_path(self, model, field):
+        """Returns relationship infos followed by column info of the field."""
+        *path, attr = field.split(LOOKUP_SEP)
+        infos = []
+        for name in path:
+            relation = meta.model_info(model).relationships.get(name)
+            assert relation is not None, "Cannot filter {} by '{}', '{}' is not a relationship".format(
+                model.__name__, field, name
+            )
+            infos.append(relation)
+            model = relation.related_model
+
+        info = meta.model_info(model)
+        column_info = info.primary_keys.get(attr) or info.properties.get(attr)
+        assert column_info is not None, "Cannot filter {} by '{}', only column attributes are supported".format(
+            model.__name__, field
+        )
+        return infos + [column_info]
+
+    def get_plan(self, model, filterset_fields, params):
+        """Returns :py:class:`FilterGroup` tuples of given parameters grouped
+        by relationship path."""
+        groups = {}
+        for field, lookups in filterset_fields:
+            *relations, column_info = self.resolve_path(model, field)
+            for lookup in lookups:
+                param = self.get_param(field, lookup)
+                if param in params:
+                    target = relations[-1].related_model if relations else model
+                    key = tuple(relation.name for relation in relations)
+                    group = groups.setdefault(key, FilterGroup(tuple(relations), target, []))
+                    group.terms.append(FilterTerm(param, column_info.property.key, self.lookups[lookup]))
+        return tuple(group._replace(terms=tuple(group.terms)) for group in groups.values())
+
+    def filter_queryset(self, request, queryset, view):
+        filterset_fields = self.get_filterset_fields(view)
+        if not filterset_fields:
+            return queryset
+
+        serializer = self.get_filter_serializer_class(view)(data=request.query_params, partial=True)
+        if not serializer.is_valid():
+            raise ValidationError(serializer.errors)
+
+        values = serializer.validated_data
+        if not values:
+            return queryset
+
+        model = view.get_model()
+        params = tuple(sorted(values))
+        plan = filter_plans.get(
+            (model, filterset_fields, params), lambda: self.get_plan(model, filterset_fields, params)
+        )
+
+        for group in plan:
+            criterion = and_(
+                *[term.lookup(getattr(group.model, term.attr), values[term.param]) for term in group.terms]
+            )
+            queryset = queryset.filter(get_related_criterion(group.relations, criterion))
+
+        return queryset
+
+    def get_schema_fields(self, view):
+        assert coreapi is not None, "coreapi must be installed to use `get_schema_fields()`"
+        assert coreschema is not None, "coreschema must be installed to use `get_schema_fields()`"
+        return [
+            coreapi.Field(name=name, required=False, location="query", schema=coreschema.String(title=name))
+            for name in self.get_filter_serializer_class(view)().fields
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        # openapi schemas are only available since DRF 3.10
+        from rest_framework.schemas.openapi import AutoSchema
 
-        return op(getattr(model, field), term)
+        schema = AutoSchema()
+        # map_field is private before DRF 3.12
+        map_field = getattr(schema, "map_field", None) or schema._map_field
+        parameters = []
+        for name, field in self.get_filter_serializer_class(view)().fields.items():
+            parameter = {"name": name, "required": False, "in": "query", "schema": map_field(field)}
+            if isinstance(field, fields.ListField):
+                parameter.update({"style": "form", "explode": False})
+            parameters.append(parameter)
+        return parameters
@@ -1,16 +1,43 @@
+import logging
+from collections import Counter, namedtuple
 from contextlib import suppress
 
+from sqlalchemy import orm
 from sqlalchemy.exc import InvalidRequestError
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.http import Http404
 
 from django_sorcery.db.meta import model_info
 
 from rest_framework import generics
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import lookup_plans
+from .utils import get_query_model
+
+
+logger = logging.getLogger(__name__)
+
+Lookup = namedtuple("Lookup", ["url_kwarg", "to_python"])
+LookupPlan = namedtuple("LookupPlan", ["model", "lookups"])
 
 
 class GenericAPIView(generics.GenericAPIView):
-    """Base class for sqlalchemy specific views."""
+    """Base class for sqlalchemy specific views.
+
+    ``strict_loading`` guards against relationships being lazy loaded while
+    serializing, it defaults to ``REST_WITCHCRAFT_STRICT_LOADING`` setting:
+
+    :``"raise"``: ``raiseload("*")`` is applied on top of any eagerloads for safe requests
+        so any lazy load raises :py:class:`rest_witchcraft.serializers.StrictLoadingError`
+        naming the serializer field and model attribute. Useful in tests.
+    :``"warn"``: lazy loads are counted per serializer field and logged when the response
+        is finalized. Useful in production.
+    """
+
+    strict_loading = None
 
     @classmethod
     def get_model(cls):
@@ -18,7 +45,7 @@ class GenericAPIView(generics.GenericAPIView):
         model = None
 
         with suppress(AttributeError, InvalidRequestError):
-            model = cls.queryset._only_full_mapper_zero("get").class_
+            model = get_query_model(cls.queryset)
 
         if model:
             return model
@@ -33,35 +60,132 @@ class GenericAPIView(generics.GenericAPIView):
 
         return model
 
+    def get_strict_loading(self):
+        """Returns the strict loading mode for the view."""
+        if self.strict_loading is not None:
+            return self.strict_loading
+
+        return getattr(settings, "REST_WITCHCRAFT_STRICT_LOADING", None)
+
+    def get_memoized(self, key, loader):
+        """Returns value memoized for the current request, calling ``loader``
+        to compute it when missing.
+
+        Nothing is memoized for views without a request.
+        """
+        request = getattr(self, "request", None)
+        if request is None:
+            return loader()
+
+        memo = self.__dict__.get("_memo")
+        if memo is None or memo[0] is not request:
+            memo = self._memo = (request, {})
+
+        if key not in memo[1]:
+            memo[1][key] = loader()
+        return memo[1][key]
+
+    def clear_memoized(self):
+        """Drops values memoized for the current request."""
+        self.__dict__.pop("_memo", None)
+
+    def get_queryset(self):
+        """Same as in DRF but lets the serializer class prepare the queryset
+        for what it renders and applies ``raiseload("*")`` in strict loading
+        mode.
+
+        Only safe requests are guarded since updates and deletes
+        legitimately load relationships to compute changes and cascades.
+        The queryset is memoized for the request.
+        """
+        return self.get_memoized("queryset", self._get_queryset)
+
+    def _get_queryset(self):
+        queryset = super().get_queryset()
+
+        prepare_queryset = getattr(self.get_serializer_class(), "prepare_queryset", None)
+        if prepare_queryset is not None:
+            queryset = prepare_queryset(queryset)
+
+        request = getattr(self, "request", None)
+        if self.get_strict_loading() == "raise" and request is not None and request.method in SAFE_METHODS:
+            queryset = queryset.options(orm.raiseload("*", sql_only=True))
+
+        return queryset
+
+    def initial(self, request, *args, **kwargs):
+        self.lazy_loads = Counter() if self.get_strict_loading() == "warn" else None
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "lazy_loads", None) is not None:
+            context["lazy_loads"] = self.lazy_loads
+        return context
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        lazy_loads = getattr(self, "lazy_loads", None)
+        if lazy_loads:
+            logger.warning(
+                "%s lazy loaded relationships while serializing %s %s: %s",
+                self.__class__.__name__,
+                request.method,
+                request.path,
+                ", ".join("{} ({})".format(path, count) for path, count in lazy_loads.most_common()),
+            )
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_session(self):
         """Returns the session."""
-        queryset = self.get_queryset()
-        return queryset.session
+        return self.get_memoized("session", lambda: self.get_queryset().session)
+
+    def get_lookup_plan(self):
+        """Returns the lookup plan of the view which is computed once per
+        view class and lookup configuration."""
+        return lookup_plans.get(
+            (self.__class__, self.lookup_field, self.lookup_url_kwarg),
+            lambda: self._build_lookup_plan(self.get_model()),
+        )
+
+    def _build_lookup_plan(self, model):
+        info = model_info(model)
+        lookups = []
+
+        for attr, column in info.primary_keys.items():
+            url_kwarg = attr
+            # we want to honor DRF lookup_field and lookup_url_kwarg API
+            # but only if they are defined and there is single primary key.
+            # When there are multiple, all bets are off so we restrict url kwargs
+            # to model column names
+            if len(info.primary_keys) == 1 and self.lookup_field == attr:
+                url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            lookups.append(Lookup(url_kwarg, column.to_python))
+
+        return LookupPlan(model, tuple(lookups))
 
     def get_object(self):
         """Returns the object the view is displaying.
 
         We ignore the `lookup_field` and `lookup_url_kwarg` values only
-        when tere are multiple primary keys
+        when tere are multiple primary keys. Url kwargs are coerced to
+        primary key column types so malformed ones are rejected without
+        querying the database.
         """
         queryset = self.get_queryset()
-        model = self.get_model()
-        info = model_info(model)
-        kwargs = self.kwargs.copy()
-
-        # we want to honor DRF lookup_field and lookup_url_kwarg API
-        # but only if they are defined and there is single primary key.
-        # When there are multiple, all bets are off so we restrict url kwargs
-        # to model column names
-        if len(info.primary_keys) == 1:
-            lookup_field = self.lookup_field
-            lookup_url_kwarg = self.lookup_url_kwarg or lookup_field
+        plan = self.get_lookup_plan()
 
-            kwargs[lookup_field] = kwargs.pop(lookup_url_kwarg)
+        try:
+            pks = tuple(lookup.to_python(self.kwargs[lookup.url_kwarg]) for lookup in plan.lookups)
+        except (KeyError, DjangoValidationError):
+            pks = None
 
-        obj = queryset.get(info.primary_keys_from_dict(kwargs))
+        # identity map is checked first before querying the database
+        obj = None
+        if pks is not None and None not in pks:
+            obj = queryset.get(pks[0] if len(pks) == 1 else pks)
 
         if not obj:
-            raise Http404("No %s matches the given query." % model.__name__)
+            raise Http404("No %s matches the given query." % plan.model.__name__)
 
         return obj
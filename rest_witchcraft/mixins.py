@@ -1,18 +1,37 @@
 import collections
+from copy import deepcopy
+from functools import partial
 from itertools import chain
 
 import six
 
-from sqlalchemy import orm
+import sqlalchemy as sa
+from sqlalchemy import func, orm
 
 from django.db.models.constants import LOOKUP_SEP
+from django.http import Http404, StreamingHttpResponse
 
 from django_sorcery.db import meta
 
-from rest_framework import mixins
+from rest_framework import mixins, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 
+from .cache import expand_plans, query_serializers, query_validations
+from .fields import LargeBinaryField
+from .utils import get_query_model
 
-ToLoadField = collections.namedtuple("ToLoadField", ["field", "direction"])
+
+ToLoadField = collections.namedtuple("ToLoadField", ["field", "direction", "strategy"])
+
+EXPAND_STRATEGIES = {
+    "joined": "joinedload",
+    "selectin": "selectinload",
+    "subquery": "subqueryload",
+    "immediate": "immediateload",
+    "contains_eager": "contains_eager",
+}
 
 
 class DestroyModelMixin(mixins.DestroyModelMixin):
@@ -21,6 +40,122 @@ class DestroyModelMixin(mixins.DestroyModelMixin):
     def perform_destroy(self, instance):
         session = self.get_session()
         session.delete(instance)
+        getattr(self, "clear_memoized", lambda: None)()
+
+
+class CreateModelMixin(mixins.CreateModelMixin):
+    """Creates a model instance."""
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        getattr(self, "clear_memoized", lambda: None)()
+
+
+class UpdateModelMixin(mixins.UpdateModelMixin):
+    """Updates a model instance."""
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        getattr(self, "clear_memoized", lambda: None)()
+
+
+class LargeBinaryMixin:
+    """Adds ``binary`` detail action which streams content of large binary
+    columns rendered by :py:class:`rest_witchcraft.fields.LargeBinaryField`.
+
+    ``GET`` streams the content in ``binary_chunk_size`` chunks, each read
+    with ``substring()`` SQL function, and ``PUT`` streams the request body
+    into the column by appending chunks to it with SQL concatenation so
+    the whole content never sits in memory.
+
+    Chunks are read in a single transaction at ``binary_isolation_level``
+    so that content updated while it is being streamed is not torn. SQLite
+    only isolates it when the driver is configured to begin transactions
+    before ``SELECT`` statements, which ``pysqlite`` does not by default.
+    """
+
+    #: Size of chunks read and written by ``binary`` action. Each written chunk
+    #: is appended with ``UPDATE ... SET col = col || chunk`` which on PostgreSQL
+    #: rewrites the whole value every time so writing is quadratic in the
+    #: content size, larger chunks mean fewer rewrites.
+    binary_chunk_size = 1024 * 1024
+    binary_content_type = "application/octet-stream"
+    #: Isolation level of the transaction content is read in, SQLite only has serializable transactions.
+    binary_isolation_level = "REPEATABLE READ"
+
+    @action(detail=True, methods=["get", "put"], url_path=r"binary/(?P<binary_field>[^/.]+)", url_name="binary")
+    def binary(self, request, binary_field, *args, **kwargs):
+        field = self.get_serializer().fields.get(binary_field)
+        if not isinstance(field, LargeBinaryField):
+            raise Http404("No binary field {}.".format(binary_field))
+
+        instance = self.get_object()
+        session = self.get_session()
+        mapper = sa.inspect(instance).mapper
+        column = mapper.get_property(field.source).columns[0]
+        criterion = sa.and_(
+            *[pk == getattr(instance, mapper.get_property_by_column(pk).key) for pk in column.table.primary_key]
+        )
+
+        if request.method == "PUT":
+            self.write_binary(session, column, criterion, request.stream)
+            session.expire(instance, [field.source])
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        chunks = self.read_binary(session, column, criterion)
+        length = next(chunks)
+        if length is None:
+            chunks.close()
+            raise Http404("Binary field {} is empty.".format(binary_field))
+
+        response = StreamingHttpResponse(chunks, content_type=self.binary_content_type)
+        response["Content-Length"] = str(length)
+        return response
+
+    def get_binary_bind(self, session, column):
+        """Returns engine content of the column is read from at
+        ``binary_isolation_level``."""
+        engine = session.get_bind(clause=column.table)
+        if engine.dialect.name == "sqlite":
+            return engine
+        return engine.execution_options(isolation_level=self.binary_isolation_level)
+
+    def read_binary(self, session, column, criterion):
+        """Yields length of content of the column followed by its chunks.
+
+        Content is read on a connection of its own, since the response is
+        only streamed after the request session has been committed and
+        removed, within a single transaction so that the length and all
+        chunks are read from the same snapshot.
+        """
+        engine = self.get_binary_bind(session, column)
+        substring = func.substring if engine.dialect.name == "postgresql" else func.substr
+
+        with engine.connect() as connection, connection.begin():
+            length = connection.execute(sa.select([func.length(column)]).where(criterion)).scalar()
+            yield length
+
+            for start in range(1, (length or 0) + 1, self.binary_chunk_size):
+                query = sa.select([substring(column, start, self.binary_chunk_size, type_=column.type)])
+                yield connection.execute(query.where(criterion)).scalar()
+
+    def write_binary(self, session, column, criterion, stream):
+        """Writes the stream to the column in chunks."""
+        session.execute(column.table.update().where(criterion).values({column: b""}))
+        if stream is None:
+            return
+
+        for chunk in iter(partial(stream.read, self.binary_chunk_size), b""):
+            value = self.concat_binary(session, column, sa.literal(chunk, type_=column.type))
+            session.execute(column.table.update().where(criterion).values({column: value}))
+
+    def concat_binary(self, session, column, value):
+        """Returns SQL expression appending the value to the column."""
+        if session.get_bind().dialect.name == "mysql":  # pragma: nocover
+            return func.concat(column, value)
+
+        # sqlite concatenates blobs into text so it has to be cast back
+        return sa.cast(column.op("||")(value), column.type)
 
 
 class QuerySerializerMixin:
@@ -32,6 +167,10 @@ class QuerySerializerMixin:
 
     In addition query serializer will be included in serializer context
     for standard viewset serializers. That
+
+    Query serializers with ``cache_validation`` set, which generated expandable query
+    serializers do, have validation results cached per distinct set of query parameters.
+    Such serializers should therefore not depend on the context or order of values.
     """
 
     query_serializer_class = None
@@ -45,10 +184,29 @@ class QuerySerializerMixin:
         self._query_serializer = value
 
     def get_query_serializer_class(self):
-        return (
-            self.query_serializer_class
-            or getattr(self.get_serializer_class()(), "get_query_serializer_class", lambda: None)()
+        if self.query_serializer_class is not None:
+            return self.query_serializer_class
+
+        serializer_class = self.get_serializer_class()
+        static, query_serializer_class = query_serializers.get(
+            (serializer_class, (), (), True), partial(self._get_static_query_serializer_class, serializer_class)
         )
+        if static:
+            return query_serializer_class
+
+        # fields may depend on the context so the serializer of the request decides
+        return self.get_serializer().get_query_serializer_class()
+
+    def _get_static_query_serializer_class(self, serializer_class):
+        """Returns whether the query serializer class only depends on the
+        serializer class along with the query serializer class if so."""
+        if not hasattr(serializer_class, "get_query_serializer_class"):
+            return True, None
+        if not getattr(serializer_class, "has_static_fields", bool)():
+            return False, None
+
+        # serializer is only instantiated to generate the query serializer the first time
+        return True, serializer_class().get_query_serializer_class()
 
     def get_query_serializer_context(self):
         return self.get_serializer_context()
@@ -60,13 +218,38 @@ class QuerySerializerMixin:
         kwargs.setdefault("context", self.get_query_serializer_context())
         kwargs.setdefault("data", dict(self.request.GET.lists()))
         self.query_serializer = serializer = serializer_class(*args, **kwargs)
+        if getattr(serializer_class, "cache_validation", False):
+            # each request gets its own copy so cached results cannot be mutated
+            serializer._validated_data, serializer._errors = deepcopy(
+                query_validations.get(self.get_query_cache_key(serializer), partial(self._validate_query, serializer))
+            )
         serializer.is_valid()
         return serializer
 
+    def get_query_cache_key(self, serializer):
+        """Cache key of validated query which only depends on query
+        serializer class and values of its fields regardless of their
+        order."""
+        data = serializer.initial_data
+        return (
+            type(serializer),
+            tuple(
+                sorted(
+                    (k, tuple(sorted(data[k])) if isinstance(data[k], (list, tuple)) else data[k])
+                    for k in serializer._declared_fields
+                    if k in data
+                )
+            ),
+        )
+
+    def _validate_query(self, serializer):
+        serializer.is_valid()
+        return deepcopy((serializer._validated_data, serializer._errors))
+
     def check_query(self):
         serializer = self.get_query_serializer()
-        if serializer is not None:
-            serializer.is_valid(raise_exception=True)
+        if serializer is not None and serializer.errors:
+            raise ValidationError(serializer.errors)
 
     def initial(self, request, *args, **kwargs):
         super().initial(request, *args, **kwargs)
@@ -79,57 +262,202 @@ class ExpandableQuerySerializerMixin(QuerySerializerMixin):
 
     The query serializer is expected to be generated by
     :py:meth:`rest_witchcraft.serializers.ExpandableModelSerializer.get_query_serializer_class`.
+
+    By default many to one relationships are ``joined`` loaded and collections are ``selectin``
+    loaded. Strategies can be overridden per expand path in ``expand_strategies`` of either
+    the viewset or ``Meta`` of the serializers, viewset taking precedence, with any of
+    ``joined``, ``selectin``, ``subquery``, ``immediate`` or ``contains_eager``. The latter
+    is useful when the relationship is already joined by filters.
+
+    Expansions requested by clients are limited when validating the query by
+    ``expand_max_depth`` of expand paths, ``expand_max_collections`` number of expanded
+    collections and ``expand_max_cost`` budget. Cost of a path is the estimated number of
+    rows it loads per root row, which for collections is taken from
+    ``expand_row_estimates`` by either expand path or related model, falling back to
+    ``expand_default_row_estimate``. Costs of all distinct expanded relationships add up,
+    including ones only expanded as a prefix of another path.
+
+    With ``expand_adaptive`` collections are ``subquery`` loaded instead once lists rendered
+    by the viewset average more than ``expand_adaptive_threshold`` rows, as ``selectin``
+    loading renders IN lists of that many primary keys.
     """
 
+    expand_strategies = {}
+    expand_max_depth = None
+    expand_max_collections = None
+    expand_max_cost = None
+    expand_row_estimates = {}
+    expand_default_row_estimate = 10
+    expand_adaptive = False
+    expand_adaptive_threshold = 500
+
+    _expand_observed_rows = {}
+
     def get_queryset(self):
+        serializer = self.query_serializer
+        if serializer is None:
+            return super().get_queryset()
+
+        get_memoized = getattr(self, "get_memoized", lambda key, loader: loader())
+        return get_memoized(("expanded_queryset", serializer), self._get_expanded_queryset)
+
+    def _get_expanded_queryset(self):
         queryset = super().get_queryset()
+        serializer = self.query_serializer
+
+        # some nested fields are loaded by serializers themselves, for example collections
+        # rendered with a limit, so eagerloading them here would load them needlessly
+        prefetched = getattr(serializer, "prefetched_paths", ())
+        values = [
+            value
+            for value in chain(*serializer.validated_data.values())
+            if not any(value == path or value.startswith(path + LOOKUP_SEP) for path in prefetched)
+        ]
+
+        return self.expand_queryset(queryset, values)
+
+    def check_query(self):
+        super().check_query()
 
         serializer = self.query_serializer
-        if serializer is None:
-            return queryset
+        if serializer is not None:
+            for query_key, values in serializer.validated_data.items():
+                self.check_expand_limits(query_key, values)
 
-        return self.expand_queryset(queryset, chain(*serializer.validated_data.values()))
+    def check_expand_limits(self, query_key, values):
+        """Rejects expansions exceeding viewset limits before any query is
+        made."""
+        root = getattr(getattr(self.get_serializer_class(), "Meta", None), "model", None)
+        errors = []
+        paths = set()
+
+        for value in dict.fromkeys(values):
+            components = value.split(LOOKUP_SEP)
+            if self.expand_max_depth is not None and len(components) > self.expand_max_depth:
+                errors.append("Expand path '{}' is deeper than {} levels allowed.".format(value, self.expand_max_depth))
+            paths.update(LOOKUP_SEP.join(components[: i + 1]) for i in range(len(components)))
+
+        # each relationship is loaded once however many expanded paths go through it
+        nodes = {"": (root, 1)}
+        collections = set()
+        cost = 0
+        for path in sorted(paths, key=lambda i: i.count(LOOKUP_SEP)):
+            parent, _, name = path.rpartition(LOOKUP_SEP)
+            if parent not in nodes:
+                continue
+
+            model, rows = nodes[parent]
+            prop = meta.model_info(model).relationships.get(name) if model is not None else None
+            if prop is None:
+                continue
+
+            if prop.direction in {orm.interfaces.ONETOMANY, orm.interfaces.MANYTOMANY}:
+                rows *= self.expand_row_estimates.get(
+                    path, self.expand_row_estimates.get(prop.related_model, self.expand_default_row_estimate)
+                )
+                collections.add(path)
+
+            nodes[path] = (prop.related_model, rows)
+            cost += rows
+
+        if self.expand_max_collections is not None and len(collections) > self.expand_max_collections:
+            errors.append("Cannot expand more than {} collections.".format(self.expand_max_collections))
+
+        if self.expand_max_cost is not None and cost > self.expand_max_cost:
+            errors.append(
+                "Expansion is too expensive, estimated {} rows per item exceed budget of {}.".format(
+                    cost, self.expand_max_cost
+                )
+            )
+
+        if errors:
+            raise ValidationError({query_key: errors})
+
+    def get_serializer(self, *args, **kwargs):
+        if self.expand_adaptive and kwargs.get("many") and args:
+            # list serializer loads all rows anyway
+            instances = list(args[0])
+            self.observe_rows(len(instances))
+            args = (instances,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+
+    def observe_rows(self, rows):
+        """Records number of rows rendered in a list as an exponential moving
+        average per viewset class."""
+        previous = self._expand_observed_rows.get(self.__class__, rows)
+        self._expand_observed_rows[self.__class__] = 0.8 * previous + 0.2 * rows
+
+    def get_expand_strategies(self):
+        """Returns loading strategies of expand paths."""
+        strategies = dict(getattr(self.query_serializer, "expand_strategies", None) or {})
+        strategies.update(self.expand_strategies)
+        return strategies
+
+    def get_expand_collection_strategy(self):
+        """Returns default loading strategy of collections."""
+        observed = self._expand_observed_rows.get(self.__class__, 0)
+        if self.expand_adaptive and observed > self.expand_adaptive_threshold:
+            return "subquery"
+        return "selectin"
 
     def expand_queryset(self, queryset, values):
+        """Eagerloads expanded relationship paths.
+
+        Loader options are built once per viewset class, root model, set of
+        paths and strategies and cached in :py:data:`rest_witchcraft.cache.expand_plans`,
+        including for paths which are not relationships.
+        """
+        model = get_query_model(queryset)
+        strategies = self.get_expand_strategies()
+        collection_strategy = self.get_expand_collection_strategy()
+
+        options = expand_plans.get(
+            (type(self), model, frozenset(values), frozenset(strategies.items()), collection_strategy),
+            lambda: self.get_expand_options(model, values, strategies, collection_strategy),
+        )
+        if options:
+            queryset = queryset.options(*options)
+
+        return queryset
+
+    def get_expand_options(self, model, values, strategies=None, collection_strategy="selectin"):
+        """Builds loader options eagerloading expanded relationship
+        paths."""
+        strategies = strategies or {}
         to_expand = []
 
         for value in values:
             to_load = []
             components = value.split(LOOKUP_SEP)
 
-            model = queryset._only_full_mapper_zero("get").class_
-            for c in components:
-                props = meta.model_info(model).relationships
+            component_model = model
+            for i, c in enumerate(components):
+                props = meta.model_info(component_model).relationships
                 try:
-                    field = getattr(model, c)
+                    field = getattr(component_model, c)
                     prop = props[c]
-                    model = prop.relationship._dependency_processor.mapper.class_
+                    component_model = prop.related_model
                 except (KeyError, AttributeError):
                     to_load = []
                     break
                 else:
-                    to_load.append(ToLoadField(field, prop.direction))
+                    strategy = strategies.get(LOOKUP_SEP.join(components[: i + 1]))
+                    if strategy is None:
+                        is_collection = prop.direction in {orm.interfaces.ONETOMANY, orm.interfaces.MANYTOMANY}
+                        strategy = collection_strategy if is_collection else "joined"
+
+                    assert strategy in EXPAND_STRATEGIES, "Unknown expand strategy '{}' for '{}'".format(
+                        strategy, value
+                    )
+                    to_load.append(ToLoadField(field, prop.direction, strategy))
 
             if to_load:
                 to_expand.append(to_load)
 
-        if to_expand:
-            queryset = queryset.options(
-                *[
-                    six.moves.reduce(
-                        lambda a, b: (
-                            a.selectinload(b.field)
-                            if b.direction in {orm.interfaces.ONETOMANY, orm.interfaces.MANYTOMANY}
-                            else a.joinedload(b.field)
-                        ),
-                        expand,
-                        orm,
-                    )
-                    for expand in to_expand
-                ]
-            )
-
-        return queryset
+        return tuple(
+            six.moves.reduce(lambda a, b: getattr(a, EXPAND_STRATEGIES[b.strategy])(b.field), expand, orm)
+            for expand in to_expand
+        )
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
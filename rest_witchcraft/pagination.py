@@ -0,0 +1,312 @@
+"""Provides pagination styles for sqlalchemy querysets."""
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+
+import sqlalchemy as sa
+from sqlalchemy import and_, func, or_, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+from django_sorcery.db import meta
+
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import counts
+from .filters import OrderingFilter
+from .utils import get_query_model
+
+
+class Explain(Executable, ClauseElement):
+    """PostgreSQL ``EXPLAIN`` of a statement with plan formatted as json."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Keyset pagination which seeks to the position of the cursor instead of
+    offsetting so that every page costs the same.
+
+    Results are ordered by the ordering of
+    :py:class:`rest_witchcraft.filters.OrderingFilter` when the view uses it or
+    ``ordering`` of the view, falling back to ``ordering`` of the pagination,
+    which are model column attribute names optionally prefixed with ``-`` for
+    descending order. Primary keys of the model are always appended in the
+    direction of the last ordering to make the order stable. Ordering columns are expected to be non nullable.
+    Orderings by relationship paths or aggregates requested from the ordering filter
+    are rejected with ``400 Bad Request`` as rows cannot be seeked by them.
+
+    Cursors encode the ordering values of the first or last row of the page
+    and are decoded with column types of the model.
+    """
+
+    ordering = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = get_query_model(queryset)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        reverse, position = self.cursor or (False, None)
+
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_criterion(position, reverse))
+
+        queryset = queryset.order_by(None).order_by(
+            *[
+                getattr(self.model, attr).desc() if descending != reverse else getattr(self.model, attr).asc()
+                for attr, descending in self.ordering
+            ]
+        )
+
+        results = list(queryset.limit(self.page_size + 1))
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_following
+        else:
+            self.has_next, self.has_previous = has_following, position is not None
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Returns ``(attribute, descending)`` pairs of ordering of results
+        ending with primary keys of the model."""
+        ordering = requested = None
+        for backend in getattr(view, "filter_backends", ()):
+            if issubclass(backend, OrderingFilter):
+                backend = backend()
+                ordering = backend.get_ordering(request, queryset, view)
+                if ordering != backend.get_default_ordering(view):
+                    requested = backend.ordering_param
+                break
+
+        ordering = ordering or getattr(view, "ordering", None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        info = meta.model_info(self.model)
+        columns = dict(info.primary_keys, **info.properties)
+
+        result = []
+        for field in ordering:
+            attr = field.lstrip("-")
+            message = "Cannot order {} by '{}', only column attributes are supported".format(self.model.__name__, attr)
+            # relationship paths and aggregates allowed by the ordering filter have no value on the
+            # row to seek by, requesting them is a client error rather than a misconfiguration
+            if requested is not None and attr not in columns:
+                raise ValidationError({requested: [message]})
+            assert attr in columns, message
+            result.append((attr, field.startswith("-")))
+
+        # primary keys follow the last direction so that seeking compares row values
+        descending = result[-1][1] if result else False
+        ordered = {attr for attr, _ in result}
+        result.extend((attr, descending) for attr in info.primary_keys if attr not in ordered)
+        return result
+
+    def get_seek_criterion(self, position, reverse):
+        """Returns criterion selecting rows after given ordering values."""
+        columns = [getattr(self.model, attr) for attr, _ in self.ordering]
+        greater = [descending == reverse for _, descending in self.ordering]
+
+        if all(greater) or not any(greater):
+            op = "__gt__" if greater[0] else "__lt__"
+            return getattr(tuple_(*columns), op)(tuple_(*position))
+
+        # mixed directions cannot be compared as a single row value
+        return or_(
+            *[
+                and_(
+                    *[columns[j] == position[j] for j in range(i)],
+                    columns[i] > position[i] if greater[i] else columns[i] < position[i],
+                )
+                for i in range(len(columns))
+            ]
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        info = meta.model_info(self.model)
+        columns = dict(info.primary_keys, **info.properties)
+
+        try:
+            encoded = encoded + "=" * (-len(encoded) % 4)
+            reverse, *values = json.loads(b64decode(encoded.encode("ascii"), altchars=b"-_", validate=True))
+            if len(values) != len(self.ordering):
+                raise ValueError(values)
+            position = tuple(columns[attr].to_python(value) for (attr, _), value in zip(self.ordering, values))
+        except (TypeError, ValueError, BinasciiError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+
+        return bool(reverse), position
+
+    def encode_cursor(self, instance, reverse):
+        values = [int(reverse)] + [getattr(instance, attr) for attr, _ in self.ordering]
+        encoded = b64encode(json.dumps(values, default=str, separators=(",", ":")).encode(), altchars=b"-_")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode("ascii").rstrip("="))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    """Limit offset pagination with selectable ``count_strategy`` which can
+    also be set on the view:
+
+    :``"exact"``: counts primary keys of the query stripped of ordering and eagerloads.
+    :``"window"``: selects ``COUNT(*) OVER ()`` along with the page itself.
+    :``"has_next"``: selects one row past the limit to know whether there is a next
+        page, leaving ``count`` out of the response.
+    :``"estimate"``: uses PostgreSQL planner row estimate of the query, falling back to
+        an exact count below ``count_estimate_threshold`` rows or on other databases.
+    :``"cached"``: caches exact counts for ``count_cache_timeout`` seconds per
+        compiled count query and its parameters.
+    """
+
+    count_strategies = ("exact", "window", "has_next", "estimate", "cached")
+    count_strategy = "exact"
+    count_estimate_threshold = 10000
+    count_cache_timeout = 10
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.count = self.has_next = None
+
+        strategy = self.get_count_strategy(view)
+        if strategy == "window":
+            return self.paginate_window(queryset)
+        if strategy == "has_next":
+            return self.paginate_has_next(queryset)
+
+        self.count = getattr(self, "get_{}_count".format(strategy))(queryset)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return list(queryset.limit(self.limit).offset(self.offset))
+
+    def get_count_strategy(self, view):
+        strategy = getattr(view, "count_strategy", None) or self.count_strategy
+        assert strategy in self.count_strategies, "Unknown count strategy '{}'".format(strategy)
+        return strategy
+
+    def paginate_window(self, queryset):
+        rows = queryset.add_columns(func.count().over()).limit(self.limit).offset(self.offset).all()
+        self.count = rows[0][-1] if rows else self.get_exact_count(queryset) if self.offset else 0
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return [row[0] for row in rows]
+
+    def paginate_has_next(self, queryset):
+        results = list(queryset.limit(self.limit + 1).offset(self.offset))
+        self.has_next = len(results) > self.limit
+        return results[: self.limit]
+
+    def get_count_query(self, queryset):
+        """Returns the query selecting only primary keys without ordering
+        and eagerloads."""
+        return queryset.with_entities(*sa.inspect(get_query_model(queryset)).primary_key).order_by(None)
+
+    def get_exact_count(self, queryset):
+        query = self.get_count_query(queryset)
+        return queryset.session.query(func.count()).select_from(query.subquery()).scalar()
+
+    def get_estimate_count(self, queryset):
+        session = queryset.session
+        if session.get_bind().dialect.name != "postgresql":
+            return self.get_exact_count(queryset)
+
+        plan = session.execute(Explain(self.get_count_query(queryset).statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < self.count_estimate_threshold:
+            return self.get_exact_count(queryset)
+        return estimate
+
+    def get_cached_count(self, queryset):
+        bind = queryset.session.get_bind()
+        compiled = self.get_count_query(queryset).statement.compile(bind=bind)
+        key = (bind, str(compiled), repr(sorted(compiled.params.items())))
+        return counts.get(key, lambda: self.get_exact_count(queryset), timeout=self.count_cache_timeout)
+
+    def get_paginated_response(self, data):
+        if self.count is not None:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("previous", self.get_previous_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        """Same as in DRF except ``count`` is left out with ``has_next`` count
+        strategy and described as approximate with ``estimate`` one.
+
+        Schemas are generated without the view therefore the count strategy
+        of the pagination class is described.
+        """
+        paginated = super().get_paginated_response_schema(schema)
+        if self.count_strategy == "has_next":
+            paginated["properties"].pop("count")
+            if "required" in paginated:
+                paginated["required"] = [i for i in paginated["required"] if i != "count"]
+        elif self.count_strategy == "estimate":
+            description = "Approximate number of results once it exceeds {}.".format(self.count_estimate_threshold)
+            paginated["properties"]["count"]["description"] = description
+        return paginated
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+
+        if not self.has_next:
+            return None
+
+        url = replace_query_param(self.request.build_absolute_uri(), self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
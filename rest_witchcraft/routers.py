@@ -1,9 +1,99 @@
+import re
+import uuid
+
 from django_sorcery.db import meta
 
 from rest_framework import routers
+from rest_framework.urlpatterns import format_suffix_patterns
+
+
+try:
+    from django.urls import path, register_converter
+except ImportError:  # pragma: no cover
+    # path converters are only available since Django 2.0
+    path = register_converter = None
+
+
+class LookupConverter:
+    """Path converter matching lookup values same as DRF default lookup
+    regex, not consuming ``.json`` style suffixes."""
+
+    regex = "[^/.]+"
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        return str(value)
+
+
+if register_converter is not None:
+    register_converter(LookupConverter, "witchcraft_lookup")
+
+#: lookup regex and path converter per python type of primary key columns
+LOOKUP_PATTERNS = {
+    int: ("[0-9]+", "int"),
+    uuid.UUID: ("[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "uuid"),
+}
+DEFAULT_LOOKUP_PATTERN = (LookupConverter.regex, "witchcraft_lookup")
+
+#: path converter per regex of named groups in ``url_path`` of extra actions
+PATH_CONVERTERS = {
+    **{regex: converter for regex, converter in LOOKUP_PATTERNS.values()},
+    DEFAULT_LOOKUP_PATTERN[0]: DEFAULT_LOOKUP_PATTERN[1],
+    "[^/]+": "str",
+    ".+": "path",
+}
+
+NAMED_GROUP = re.compile(r"\(\?P<(?P<name>\w+)>(?P<regex>[^()]+)\)")
+
+
+def to_path_syntax(route):
+    """Translates named regex groups of a route, such as ones in ``url_path``
+    of extra actions, to path converters."""
+
+    def replace(match):
+        regex = match.group("regex")
+        assert regex in PATH_CONVERTERS, "Cannot translate '{}' of route '{}' to path syntax".format(
+            match.group(0), route
+        )
+        return "<{}:{}>".format(PATH_CONVERTERS[regex], match.group("name"))
+
+    return NAMED_GROUP.sub(replace, route)
+
+
+def get_lookup_pattern(column):
+    """Returns lookup regex and path converter name for a primary key
+    column."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:  # pragma: nocover
+        return DEFAULT_LOOKUP_PATTERN
+    return LOOKUP_PATTERNS.get(python_type, DEFAULT_LOOKUP_PATTERN)
 
 
 class DefaultRouter(routers.DefaultRouter):
+    """Router which derives lookups from primary key columns of viewset
+    models so urls of integer and uuid primary keys only match valid values.
+
+    With ``use_regex_path=False`` routes are built with :func:`django.urls.path`
+    and lookups use ``int``, ``uuid`` or ``witchcraft_lookup`` path converters which
+    also convert url kwargs. Named groups in ``url_path`` of extra actions are
+    translated to matching path converters, for example ``(?P<field>[^/.]+)``
+    to ``<witchcraft_lookup:field>``, otherwise ``url_path`` needs to be in path
+    syntax as well.
+
+    Lookup of viewsets with single primary key can be overwritten with
+    ``lookup_value_regex`` or ``lookup_value_converter`` respectively.
+
+    Path converters need Django 2.0 or later.
+    """
+
+    def __init__(self, *args, use_regex_path=True, **kwargs):
+        assert use_regex_path or path is not None, "DefaultRouter with use_regex_path=False needs Django 2.0 or later"
+        self.use_regex_path = use_regex_path
+        super().__init__(*args, **kwargs)
+
     def get_default_base_name(self, viewset):
         model = getattr(viewset, "get_model", lambda: None)()
 
@@ -33,21 +123,64 @@ class DefaultRouter(routers.DefaultRouter):
         model = getattr(viewset, "get_model", lambda: None)()
         if model:
             info = meta.model_info(model)
-            base_regex = "(?P<{lookup_prefix}{lookup_url_kwarg}>{lookup_value})"
 
             lookup_keys = [getattr(viewset, "lookup_url_kwarg", None) or getattr(viewset, "lookup_field", None)]
             if not lookup_keys[0] or len(info.primary_keys) > 1:
                 lookup_keys = list(info.primary_keys)
 
-            regexes = [
-                base_regex.format(
-                    lookup_prefix=lookup_prefix,
-                    lookup_url_kwarg=key,
-                    lookup_value="[^/.]+",
-                )
-                for key in lookup_keys
-            ]
+            lookups = []
+            for key, column in zip(lookup_keys, info.primary_keys.values()):
+                regex, converter = get_lookup_pattern(column.column)
+                if len(lookup_keys) == 1:
+                    regex = getattr(viewset, "lookup_value_regex", regex)
+                    converter = getattr(viewset, "lookup_value_converter", converter)
+                lookups.append(self.format_lookup(lookup_prefix + key, regex, converter))
 
-            return "/".join(regexes)
+            return "/".join(lookups)
+
+        if not self.use_regex_path:
+            lookup_field = getattr(viewset, "lookup_field", "pk")
+            return self.format_lookup(
+                lookup_prefix + (getattr(viewset, "lookup_url_kwarg", None) or lookup_field),
+                None,
+                getattr(viewset, "lookup_value_converter", DEFAULT_LOOKUP_PATTERN[1]),
+            )
 
         return super().get_lookup_regex(viewset, lookup_prefix)
+
+    def format_lookup(self, url_kwarg, regex, converter):
+        if self.use_regex_path:
+            return "(?P<{}>{})".format(url_kwarg, regex)
+        return "<{}:{}>".format(converter, url_kwarg)
+
+    def get_urls(self):
+        if self.use_regex_path:
+            return super().get_urls()
+
+        urls = []
+
+        for prefix, viewset, basename in self.registry:
+            lookup = self.get_lookup_regex(viewset)
+
+            for route in self.get_routes(viewset):
+                # Only actions which actually exist on the viewset will be bound
+                mapping = self.get_method_map(viewset, route.mapping)
+                if not mapping:
+                    continue
+
+                route_path = route.url.format(prefix=prefix, lookup=lookup, trailing_slash=self.trailing_slash)
+                route_path = to_path_syntax(route_path.lstrip("^").rstrip("$"))
+                if not prefix:
+                    route_path = route_path.lstrip("/")
+
+                initkwargs = dict(route.initkwargs, basename=basename, detail=route.detail)
+                view = viewset.as_view(mapping, **initkwargs)
+                urls.append(path(route_path, view, name=route.name.format(basename=basename)))
+
+        if self.include_root_view:
+            urls.append(path("", self.get_api_root_view(api_urls=urls), name=self.root_view_name))
+
+        if self.include_format_suffixes:
+            urls = format_suffix_patterns(urls)
+
+        return urls
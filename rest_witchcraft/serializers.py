@@ -3,11 +3,16 @@ import re
 from collections import OrderedDict, namedtuple
 from itertools import groupby
 
-from sqlalchemy.orm.interfaces import ONETOMANY
+import sqlalchemy as sa
+from sqlalchemy import desc, func, orm, tuple_
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.attributes import instance_state
+from sqlalchemy.orm.interfaces import MANYTOONE, ONETOMANY
 
 from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
 from django.db.models.constants import LOOKUP_SEP
 from django.http import QueryDict
+from django.utils.functional import cached_property
 from django.utils.text import capfirst
 
 from django_sorcery.db import meta
@@ -16,15 +21,34 @@ from rest_framework import fields, serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.settings import api_settings
 
+from .cache import query_serializers, reference_tables
 from .field_mapping import get_field_type, get_url_kwargs
-from .fields import ImplicitExpandableListField, UriField
-from .utils import django_to_drf_validation_error
+from .fields import (
+    AggregateField,
+    ImplicitExpandableListField,
+    LargeBinaryField,
+    ManyPrimaryKeyRelatedField,
+    SkippableField,
+    UriField,
+)
+from .utils import (
+    clear_render_cache,
+    django_to_drf_validation_error,
+    get_foreign_key,
+    get_query_model,
+    get_render_cache,
+)
 
 
 ALL_FIELDS = "__all__"
 REGEX_TYPE = type(re.compile(""))
 
 
+class StrictLoadingError(InvalidRequestError):
+    """Raised when a relationship is lazy loaded while serializing with strict
+    loading enabled."""
+
+
 class BaseSerializer(serializers.Serializer):
     serializer_choice_field = fields.ChoiceField
 
@@ -237,6 +261,43 @@ class CompositeSerializer(BaseSerializer):
         return self.__class__(*args, **kwargs)
 
 
+class _ReferenceRepresentation(OrderedDict):
+    """Cached representation of a reference table row."""
+
+
+class ModelListSerializer(serializers.ListSerializer):
+    """List serializer used by ``ModelSerializer`` when ``many=True``.
+
+    Gives the child serializer a chance to batch load whatever it needs
+    for all instances with :py:meth:`ModelSerializer.prefetch` before
+    any of them are rendered, unless the parent serializer already did
+    that for the whole list it renders.
+    """
+
+    def get_attribute(self, instance):
+        """Returns the collection loaded by the parent serializer when the
+        child serializer has a ``limit``."""
+        limit = getattr(self.child, "limit", None)
+        if limit is None:
+            return super().get_attribute(instance)
+
+        key = (self.parent, self.field_name, instance_state(instance))
+        collections = get_render_cache(self, "limited_collections")
+        if key in collections:
+            return collections[key]
+
+        return list(super().get_attribute(instance) or [])[:limit]
+
+    def to_representation(self, data):
+        if self.parent is None:
+            clear_render_cache(self)
+
+        instances = list(data)
+        if not get_render_cache(self, "prefetched").get(self.child):
+            self.child.prefetch(instances)
+        return super().to_representation(instances)
+
+
 class ModelSerializer(BaseSerializer):
     """ModelSerializer is basically like a drf model serializer except that it
     works with sqlalchemy models:
@@ -263,11 +324,18 @@ class ModelSerializer(BaseSerializer):
 
         `allow_nested_updates` is for controlling nested related model
         updates.
+
+        `limit` and `order_by` are used when the serializer renders a nested
+        one to many relationship with `many=True` to only render the first
+        `limit` items of the collection for each parent ordered by `order_by`
+        field names, prefixed with `-` for descending order.
         """
         self._session = kwargs.pop("session", None) or getattr(getattr(self, "Meta", None), "session", None)
         self.allow_nested_updates = kwargs.pop("allow_nested_updates", False)
         self.allow_create = kwargs.pop("allow_create", False)
         self.partial_by_pk = kwargs.pop("partial_by_pk", False)
+        self.limit = kwargs.pop("limit", None)
+        self.order_by = kwargs.pop("order_by", ())
         overwrite_fields = kwargs.pop("fields", fields.empty)
         overwrite_exclude = kwargs.pop("exclude", fields.empty)
         extra_kwargs = kwargs.pop("extra_kwargs", {})
@@ -289,6 +357,55 @@ class ModelSerializer(BaseSerializer):
         }
         return self.__class__(*args, **kwargs)
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """Same as in DRF except ``ModelListSerializer`` is used unless
+        ``Meta.list_serializer_class`` is provided."""
+        list_serializer = super().many_init(*args, **kwargs)
+        if type(list_serializer) is serializers.ListSerializer:
+            # child is already bound to the list serializer and ModelListSerializer
+            # adds no state of its own so swapping the class is enough
+            list_serializer.__class__ = ModelListSerializer
+        return list_serializer
+
+    @classmethod
+    def has_static_fields(cls):
+        """Whether fields of the serializer and its declared nested
+        serializers only depend on their classes, i.e. neither overrides
+        ``__init__()`` or ``get_fields()``."""
+        if cls.__init__ is not ModelSerializer.__init__ or cls.get_fields is not ModelSerializer.get_fields:
+            return False
+
+        for field in cls._declared_fields.values():
+            if isinstance(field, serializers.ListSerializer):
+                field = field.child
+            if isinstance(field, serializers.BaseSerializer) and not getattr(field, "has_static_fields", bool)():
+                return False
+        return True
+
+    @classmethod
+    def prepare_queryset(cls, queryset):
+        """Hook to allow to add loader options to the view queryset for
+        whatever the serializer needs to render instances.
+
+        Large binary columns are deferred unless declared with a field
+        other than ``LargeBinaryField`` since they are not rendered.
+        """
+        model = getattr(getattr(cls, "Meta", None), "model", None)
+        if model is None:
+            return queryset
+
+        declared = cls._declared_fields
+        deferred = [
+            name
+            for name, column_info in meta.model_info(model).properties.items()
+            if isinstance(column_info.column.type, sa.LargeBinary)
+            and (name not in declared or isinstance(declared[name], LargeBinaryField))
+        ]
+        if deferred:
+            queryset = queryset.options(*[orm.defer(getattr(model, name)) for name in deferred])
+        return queryset
+
     @property
     def session(self):
         if not self._session:
@@ -314,6 +431,79 @@ class ModelSerializer(BaseSerializer):
     def queryset(self):
         return getattr(self.Meta, "queryset", None) or self.session.query(self.model)
 
+    @cached_property
+    def is_reference_table(self):
+        """Whether the model is a small, rarely changing reference table as
+        marked by ``reference_table`` in either serializer or model
+        ``Meta``."""
+        default = getattr(meta.model_info(self.model).opts, "reference_table", False)
+        return getattr(self.Meta, "reference_table", default)
+
+    @cached_property
+    def reference_relation(self):
+        """Returns the many to one relationship info this nested serializer
+        renders when its model is a reference table, computed once per
+        bound serializer.
+
+        Representations of such rows are cached for the whole process by
+        :py:data:`rest_witchcraft.cache.reference_tables` and are looked
+        up by the foreign key of the parent so rendering them does not
+        query the database at all, therefore they should not depend on
+        the request.
+        """
+        if not isinstance(self.parent, ModelSerializer) or not self.is_reference_table:
+            return None
+
+        relation_info = meta.model_info(self.parent.model).relationships.get(self.source)
+        if relation_info is None or relation_info.direction != MANYTOONE:
+            return None
+
+        return relation_info
+
+    def get_attribute(self, instance):
+        """Same as in DRF except rows of reference tables are rendered from
+        the process wide cache unless the relationship is already
+        loaded."""
+        relation_info = self.reference_relation
+        if relation_info is None or self.source in instance.__dict__:
+            return super().get_attribute(instance)
+
+        key = get_foreign_key(instance, relation_info)
+        if key is None:
+            return None
+
+        representations = reference_tables.get(
+            self.reference_cache_key, relation_info.related_table, self.load_reference_table
+        )
+        if key not in representations:
+            return super().get_attribute(instance)
+
+        return _ReferenceRepresentation(representations[key])
+
+    @cached_property
+    def reference_cache_key(self):
+        """Key of representations of the reference table rendered by this
+        serializer in the process wide cache.
+
+        Serializer classes rendering the same fields may still render them
+        differently therefore the class is a part of the key too."""
+        return (type(self), self.model, tuple((name, type(f).__name__, f.source) for name, f in self.fields.items()))
+
+    def load_reference_table(self):
+        """Renders all rows of the reference table keyed by their primary
+        keys after prefetching them all at once."""
+        info = meta.model_info(self.model)
+        instances = list(self.queryset)
+        self.prefetch(instances)
+
+        prefetched = get_render_cache(self, "prefetched")
+        marked = prefetched.get(self)
+        prefetched[self] = True
+        try:
+            return {info.get_key(instance): self.to_representation(instance) for instance in instances}
+        finally:
+            prefetched[self] = marked
+
     def get_fields(self):
         """Return the dict of field names -> field instances that should be
         used for `self.fields` when instantiating the serializer."""
@@ -617,12 +807,290 @@ class ModelSerializer(BaseSerializer):
 
         return data
 
+    def to_representation(self, instance):
+        """Same as in DRF but prefetches data for the instance unless it was
+        already done for the whole list by ``ModelListSerializer`` or by the
+        parent serializer, see :py:meth:`prefetch_nested`.
+
+        When the view enables strict loading, relationships lazy loaded
+        while rendering the instance are either counted in
+        ``lazy_loads`` context counter or reported with a
+        ``StrictLoadingError`` naming the field.
+        """
+        if isinstance(instance, _ReferenceRepresentation):
+            return OrderedDict(instance)
+
+        self.prefetch_unless_nested(instance)
+
+        lazy_loads = self.context.get("lazy_loads")
+        if lazy_loads is not None:
+            for field in self.get_lazy_fields(instance):
+                lazy_loads[self.get_field_path(field)] += 1
+
+        try:
+            return super().to_representation(instance)
+        except StrictLoadingError:
+            raise
+        except InvalidRequestError as e:
+            # relationships which raise instead of loading are left unloaded on the instance
+            state = sa.inspect(instance)
+            field = next((f for f in self.get_lazy_fields(instance) if self.raises_on_load(state, f.source)), None)
+            if field is None:
+                raise
+
+            raise StrictLoadingError(
+                "Serializer field '{}' lazy loaded '{}.{}' while strict loading is enabled, "
+                "it should be eagerloaded in the view queryset".format(
+                    self.get_field_path(field), instance.__class__.__name__, field.source
+                )
+            ) from e
+
+    def get_lazy_fields(self, instance):
+        """Returns readable fields which would lazy load a relationship of the
+        instance."""
+        state = sa.inspect(instance, raiseerr=False)
+        if state is None or not state.persistent:
+            return []
+
+        return [
+            field
+            for field in self._readable_fields
+            if field.source in state.mapper.relationships
+            and field.source in state.unloaded
+            and not isinstance(field, SkippableField)
+            # limited collections and reference tables are loaded by the serializer itself
+            and getattr(getattr(field, "child", None), "limit", None) is None
+            and getattr(field, "reference_relation", None) is None
+            # fields can tell whether they actually load the relationship
+            and getattr(field, "loads_relationship", lambda instance: True)(instance)
+        ]
+
+    def raises_on_load(self, state, key):
+        """Whether the relationship of the instance state is configured to
+        raise instead of being lazy loaded, either by the mapper or by
+        ``raiseload()`` option of the query which loaded the instance."""
+        loader = state.callables[key] if key in state.callables else None
+        strategy_key = getattr(loader, "strategy_key", None) or state.mapper.relationships[key].strategy_key
+        return dict(strategy_key).get("lazy") in {"raise", "raise_on_sql"}
+
+    def get_field_path(self, field):
+        """Returns the path of the field from the root serializer."""
+        components = [field.field_name]
+        f = self
+        while f.parent is not None:
+            if f.field_name:
+                components.insert(0, f.field_name)
+            f = f.parent
+
+        return LOOKUP_SEP.join(components)
+
+    def prefetch(self, instances):
+        """Hook to batch load data needed to render ``instances`` before they
+        are serialized."""
+        self.load_aggregates(instances)
+        self.load_limited_collections(instances)
+        self.load_related_keys(instances)
+        self.prefetch_nested(instances)
+
+    def prefetch_unless_nested(self, instance):
+        """Prefetches the instance being rendered on its own, which is not
+        needed when the list or the parent serializer rendering it already
+        prefetched all of its instances at once."""
+        if self.parent is None:
+            clear_render_cache(self)
+        elif isinstance(self.parent, (ModelListSerializer, PolymorphicModelSerializer)):
+            return
+        elif get_render_cache(self, "prefetched").get(self):
+            return
+
+        if instance is not None:
+            self.prefetch([instance])
+
+    def prefetch_nested(self, instances):
+        """Prefetches nested model serializers for all the instances at once.
+
+        That is only possible when the relationship is already loaded for
+        every instance, otherwise nested serializer prefetches what it
+        renders by itself once the relationship is lazy loaded.
+        """
+        info = meta.model_info(self.model)
+        collections = get_render_cache(self, "limited_collections")
+        prefetched = get_render_cache(self, "prefetched")
+
+        for field in self._readable_fields:
+            serializer = getattr(field, "child", field)
+            if not isinstance(serializer, ModelSerializer) or field.source not in info.relationships:
+                continue
+
+            limited = getattr(serializer, "limit", None) is not None
+            nested = {}
+            for instance in filter(None, instances):
+                if limited:
+                    value = collections.get((self, field.field_name, instance_state(instance)), fields.empty)
+                else:
+                    value = instance.__dict__.get(field.source, fields.empty)
+
+                if value is fields.empty:
+                    prefetched.pop(serializer, None)
+                    break
+                if isinstance(value, (list, tuple, set)):
+                    nested.update((id(i), i) for i in value)
+                elif value is not None:
+                    nested[id(value)] = value
+            else:
+                prefetched[serializer] = True
+                if nested:
+                    serializer.prefetch(list(nested.values()))
+
+    def load_aggregates(self, instances):
+        """Loads values of all ``AggregateField`` fields for the given
+        instances with a single query."""
+        aggregates = [field for field in self.fields.values() if isinstance(field, AggregateField)]
+        if not aggregates:
+            return
+
+        info = meta.model_info(self.model)
+        keys = {info.get_key(instance): instance for instance in instances if instance is not None}
+        keys.pop(None, None)
+        if not keys:
+            return
+
+        pks = [getattr(self.model, name) for name in info.primary_keys]
+        criterion = pks[0].in_([key[0] for key in keys]) if len(pks) == 1 else tuple_(*pks).in_(list(keys))
+        query = self.session.query(*pks + [field.get_expression(self.model) for field in aggregates])
+
+        split = len(pks)
+        values = get_render_cache(self, "aggregate_values")
+        for row in query.filter(criterion):
+            instance = keys[tuple(row[:split])]
+            for field, value in zip(aggregates, row[split:]):
+                values[(field, instance_state(instance))] = value
+
+    def load_limited_collections(self, instances):
+        """Loads nested one to many collections which have a ``limit`` for
+        the given instances."""
+        info = meta.model_info(self.model)
+
+        for field in self.fields.values():
+            if not isinstance(field, ModelListSerializer) or field.source not in info.relationships:
+                continue
+
+            if field.child.limit is not None:
+                self.load_limited_collection(instances, field, info.relationships[field.source])
+
+    def load_limited_collection(self, instances, field, relation_info):
+        """Loads at most ``limit`` + 1 items of the collection for each of the
+        instances with a single query by numbering related rows with
+        ``row_number() over (partition by <foreign key>)``.
+
+        The extra row is only used to tell whether the collection has
+        more items, see :py:class:`rest_witchcraft.fields.HasMoreField`.
+        """
+        assert (
+            relation_info.direction == ONETOMANY
+        ), "Relationship '{}' cannot be limited as it is not one to many".format(relation_info.name)
+
+        target = relation_info.related_model
+        target_info = meta.model_info(target)
+        limit = field.child.limit
+
+        pairs = relation_info.local_remote_pairs
+        local_keys = [relation_info.parent_mapper.get_property_by_column(local).key for local, _ in pairs]
+        remote_keys = [target_info.mapper.get_property_by_column(remote).key for _, remote in pairs]
+
+        parents = {}
+        for instance in filter(None, instances):
+            key = tuple(getattr(instance, k) for k in local_keys)
+            if None not in key:
+                parents.setdefault(key, []).append(instance)
+
+        if not parents:
+            return
+
+        remote_columns = [getattr(target, k) for k in remote_keys]
+        order_by = [
+            desc(getattr(target, name[1:])) if name.startswith("-") else getattr(target, name)
+            for name in field.child.order_by
+        ] + [getattr(target, name) for name in target_info.primary_keys]
+
+        if len(remote_columns) == 1:
+            criterion = remote_columns[0].in_([key[0] for key in parents])
+        else:
+            criterion = tuple_(*remote_columns).in_(list(parents))
+
+        row_number = func.row_number().over(partition_by=remote_columns, order_by=order_by).label("row_number")
+        subquery = self.session.query(target, row_number).filter(criterion).subquery()
+        query = (
+            self.session.query(orm.aliased(target, subquery))
+            .filter(subquery.c.row_number <= limit + 1)
+            .order_by(subquery.c.row_number)
+        )
+
+        children = {key: [] for key in parents}
+        for child in query:
+            children[tuple(getattr(child, k) for k in remote_keys)].append(child)
+
+        collections = get_render_cache(self, "limited_collections")
+        has_more = get_render_cache(self, "collection_has_more")
+        for key, items in children.items():
+            for instance in parents[key]:
+                collections[(self, field.field_name, instance_state(instance))] = items[:limit]
+                has_more[(self, field.field_name, instance_state(instance))] = len(items) > limit
+
+    def load_related_keys(self, instances):
+        """Loads related primary keys of ``ManyPrimaryKeyRelatedField`` fields
+        for the given instances with a single query per field, unless their
+        collections are already loaded."""
+        info = meta.model_info(self.model)
+
+        for field in self._readable_fields:
+            if isinstance(field, ManyPrimaryKeyRelatedField) and field.source in info.relationships:
+                self.load_related_key(instances, field, info.relationships[field.source])
+
+    def load_related_key(self, instances, field, relation_info):
+        """Loads related primary keys of the relationship by joining it from
+        the parent filtered by primary keys of the instances."""
+        info = meta.model_info(self.model)
+        parents = {}
+        for instance in filter(None, instances):
+            state = sa.inspect(instance)
+            if state.persistent and relation_info.name not in instance.__dict__:
+                parents.setdefault(info.get_key(instance), []).append(instance)
+
+        if not parents:
+            return
+
+        # parent is aliased so that self referential relationships join to the related model itself
+        parent = orm.aliased(self.model)
+        pks = [getattr(parent, name) for name in info.primary_keys]
+        related_pks = list(relation_info.related_mapper.primary_key)
+        criterion = pks[0].in_([key[0] for key in parents]) if len(pks) == 1 else tuple_(*pks).in_(list(parents))
+
+        query = (
+            self.session.query(*pks + related_pks)
+            .select_from(parent)
+            .join(getattr(parent, relation_info.name))
+            .filter(criterion)
+        )
+        if relation_info.relationship.order_by:
+            query = query.order_by(*relation_info.relationship.order_by)
+
+        split = len(pks)
+        keys = {key: [] for key in parents}
+        for row in query:
+            keys[tuple(row[:split])].append(tuple(row[split:]))
+
+        related_keys = get_render_cache(self, "related_keys")
+        for key, values in keys.items():
+            for instance in parents[key]:
+                related_keys[(field, instance_state(instance))] = values
+
     def get_primary_keys(self, validated_data):
         """Returns the primary key values from validated_data."""
         if not validated_data:
             return
 
-        info = meta.model_info(self.queryset._only_full_mapper_zero("get").class_)
+        info = meta.model_info(get_query_model(self.queryset))
         return info.primary_keys_from_dict(
             {getattr(self.fields.get(k), "source", None) or k: v for k, v in validated_data.items()}
         )
@@ -754,6 +1222,165 @@ class ModelSerializer(BaseSerializer):
         return instance
 
 
+class PolymorphicModelSerializer(ModelSerializer):
+    """Same as ``ModelSerializer`` but for models using joined table
+    inheritance where each instance is serialized by a serializer for its own
+    subclass picked by the mapper discriminator.
+
+    Subclass serializers are generated by subclassing the serializer itself
+    with ``Meta.model`` swapped to the subclass and ``Meta.fields``, when
+    explicit, extended with the fields subclass adds. They can also be
+    provided explicitly in ``Meta.polymorphic_serializers``.
+
+    The view queryset is automatically loaded with ``selectin_polymorphic``
+    so that a list of mixed subclasses costs one query per subclass instead
+    of one per instance, or with ``with_polymorphic`` when
+    ``Meta.polymorphic_loading`` is ``"joined"``. For example:
+
+    .. code::
+
+        class AnimalSerializer(PolymorphicModelSerializer):
+            class Meta:
+                model = Animal
+                session = session
+                fields = "__all__"
+                polymorphic_serializers = {Dog: DogSerializer}
+                polymorphic_loading = "selectin"
+    """
+
+    _polymorphic_serializer_classes = {}
+
+    @classmethod
+    def prepare_queryset(cls, queryset):
+        queryset = super().prepare_queryset(queryset)
+        mapper = sa.inspect(cls.Meta.model)
+        subclasses = [m.class_ for m in mapper.self_and_descendants if m is not mapper]
+        if not subclasses:
+            return queryset
+
+        if getattr(cls.Meta, "polymorphic_loading", "selectin") == "joined":
+            return queryset.with_polymorphic(subclasses)
+
+        return queryset.options(orm.selectin_polymorphic(cls.Meta.model, subclasses))
+
+    def get_polymorphic_serializer_class(self, model):
+        """Returns serializer class for the model subclass or ``None`` when
+        the model is the one serializer was declared for."""
+        if model is self.model:
+            return None
+
+        declared = getattr(self.Meta, "polymorphic_serializers", {})
+        for mapper in sa.inspect(model).iterate_to_root():
+            if mapper.class_ is self.model:
+                break
+            if mapper.class_ in declared:
+                return declared[mapper.class_]
+
+        key = (self.__class__, model)
+        if key not in self._polymorphic_serializer_classes:
+            self._polymorphic_serializer_classes[key] = self.build_polymorphic_serializer_class(model)
+
+        return self._polymorphic_serializer_classes[key]
+
+    def build_polymorphic_serializer_class(self, model):
+        """Generates serializer class for the model subclass."""
+        attrs = {"model": model, "polymorphic_serializers": {}}
+
+        _fields = getattr(self.Meta, "fields", None)
+        if _fields and _fields != ALL_FIELDS:
+            base_field_names = set(meta.model_info(self.model).field_names)
+            attrs["fields"] = list(_fields) + [
+                name for name in meta.model_info(model).field_names if name not in base_field_names
+            ]
+
+        return type(
+            str(model.__name__ + "Serializer"), (self.__class__,), {"Meta": type(str("Meta"), (self.Meta,), attrs)}
+        )
+
+    def get_polymorphic_serializer(self, model):
+        """Returns serializer bound to this serializer for the model
+        subclass."""
+        serializer_class = self.get_polymorphic_serializer_class(model)
+        if serializer_class is None:
+            return None
+
+        serializers_ = self.__dict__.setdefault("_polymorphic_serializers", {})
+        if serializer_class not in serializers_:
+            serializer = serializer_class(
+                session=self._session,
+                allow_nested_updates=self.allow_nested_updates,
+                allow_create=self.allow_create,
+                partial_by_pk=self.partial_by_pk,
+            )
+            serializer.bind(field_name="", parent=self)
+            serializers_[serializer_class] = serializer
+
+        return serializers_[serializer_class]
+
+    def get_polymorphic_model(self, data):
+        """Returns the model subclass for the data being validated either from
+        the instance being updated or the discriminator value in the data."""
+        if self.instance is not None and not isinstance(self.instance, (list, tuple)):
+            return self.instance.__class__
+
+        mapper = sa.inspect(self.model)
+        if mapper.polymorphic_on is not None and hasattr(data, "get"):
+            identity = data.get(mapper.get_property_by_column(mapper.polymorphic_on).key)
+            if identity in mapper.polymorphic_map:
+                return mapper.polymorphic_map[identity].class_
+
+        return self.model
+
+    def prefetch(self, instances):
+        """Prefetches instances of each subclass with their own
+        serializer."""
+        by_model = OrderedDict()
+        for instance in filter(None, instances):
+            by_model.setdefault(instance.__class__, []).append(instance)
+
+        for model, group in by_model.items():
+            serializer = self.get_polymorphic_serializer(model)
+            if serializer is None:
+                super().prefetch(group)
+            else:
+                serializer.prefetch(group)
+
+    def to_representation(self, instance):
+        serializer = self.get_polymorphic_serializer(instance.__class__)
+        if serializer is None:
+            return super().to_representation(instance)
+
+        self.prefetch_unless_nested(instance)
+        return serializer.to_representation(instance)
+
+    def to_internal_value(self, data):
+        model = self.get_polymorphic_model(data)
+        serializer = self.get_polymorphic_serializer(model)
+        validated_data = super().to_internal_value(data) if serializer is None else serializer.to_internal_value(data)
+
+        # discriminator is carried in validated data so that items of a list are each
+        # created with the serializer of their own subclass
+        mapper = sa.inspect(model)
+        if mapper.polymorphic_on is not None and mapper.polymorphic_identity is not None:
+            validated_data[mapper.get_property_by_column(mapper.polymorphic_on).key] = mapper.polymorphic_identity
+
+        return validated_data
+
+    def create(self, validated_data):
+        serializer = self.get_polymorphic_serializer(self.get_polymorphic_model(validated_data))
+        if serializer is None:
+            return super().create(validated_data)
+
+        return serializer.create(validated_data)
+
+    def update(self, instance, validated_data):
+        serializer = self.get_polymorphic_serializer(instance.__class__)
+        if serializer is None:
+            return super().update(instance, validated_data)
+
+        return serializer.update(instance, validated_data)
+
+
 class ExpandableModelSerializer(ModelSerializer):
     """Same as ``ModelSerializer`` but allows to conditionally recursively
     expand specific fields.
@@ -776,7 +1403,9 @@ class ExpandableModelSerializer(ModelSerializer):
     Collapsed fields are specified in ``Meta.expandable_fields`` where keys
     are field names and values are replacement field instances.
 
-    In addition expandable query key can be specified via ``Meta.expandable_query_key``.
+    In addition expandable query key can be specified via ``Meta.expandable_query_key``
+    and strategies used by views to eagerload expanded paths via ``Meta.expand_strategies``,
+    see :py:class:`rest_witchcraft.mixins.ExpandableQuerySerializerMixin`.
 
     For example:
 
@@ -832,6 +1461,18 @@ class ExpandableModelSerializer(ModelSerializer):
     def to_representation(self, instance):
         """Switch expandable fields to collapsed fields if not explicitly asked
         to be expanded or field was updated."""
+        self.collapse_fields()
+        return super().to_representation(instance)
+
+    def prefetch(self, instances):
+        """Collapse fields before prefetching so that nothing is loaded for
+        fields which will not be rendered."""
+        self.collapse_fields()
+        return super().prefetch(instances)
+
+    def collapse_fields(self):
+        """Replace expandable fields with their collapsed replacements unless
+        they are expanded."""
         expandable_query_key = getattr(self.Meta, "expandable_query_key", "expand")
 
         for i in self._expandable_fields:
@@ -855,8 +1496,6 @@ class ExpandableModelSerializer(ModelSerializer):
             # no reason to leave full field in representation
             self.fields[i.name] = i.replacement
 
-        return super().to_representation(instance)
-
     @property
     def _expandable_fields(self):
         """Get all defined expandable fields with their path within
@@ -896,9 +1535,60 @@ class ExpandableModelSerializer(ModelSerializer):
 
             yield from self._get_all_expandable_fields(parents=parents + [field_name], this=field, exclude=exclude)
 
+    def _get_prefetched_paths(self, parents, this):
+        """Recursively search for nested fields which serializers load by
+        themselves, like collections rendered with a ``limit`` or reference
+        tables, as those should not be eagerloaded by views."""
+        for field_name, field in this.fields.items():
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                field = field.child
+                if getattr(field, "limit", None) is not None:
+                    yield LOOKUP_SEP.join(parents + [field_name])
+                    continue
+            elif getattr(field, "reference_relation", None) is not None:
+                yield LOOKUP_SEP.join(parents + [field_name])
+                continue
+
+            yield from self._get_prefetched_paths(parents=parents + [field_name], this=field)
+
+    def _get_expand_strategies(self, parents, this):
+        """Recursively collect eagerloading strategies of expand paths from
+        ``Meta.expand_strategies`` of nested serializers."""
+        for name, strategy in getattr(getattr(this, "Meta", None), "expand_strategies", {}).items():
+            yield LOOKUP_SEP.join(parents + [name]), strategy
+
+        for field_name, field in this.fields.items():
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                field = field.child
+
+            yield from self._get_expand_strategies(parents=parents + [field_name], this=field)
+
     def get_query_serializer_class(self, exclude=(), disallow=(), implicit_expand=True):
         """Generate serializer to either validate request querystring or
-        generate documentation."""
+        generate documentation.
+
+        Generated classes are cached per serializer class, arguments and
+        expandable fields found on nested serializers since fields may
+        differ per instance, e.g. when ``get_fields()`` depends on the
+        context.
+        """
+        expandable = tuple(
+            (i.query_key, i.path) for i in self._get_all_expandable_fields(parents=[], this=self, exclude=exclude)
+        )
+        prefetched_paths = tuple(self._get_prefetched_paths(parents=[], this=self))
+        expand_strategies = tuple(self._get_expand_strategies(parents=[], this=self))
+        return query_serializers.get(
+            (type(self), expandable, prefetched_paths, expand_strategies, tuple(disallow), implicit_expand),
+            lambda: self._build_query_serializer_class(
+                expandable, prefetched_paths, expand_strategies, disallow, implicit_expand
+            ),
+        )
+
+    def _build_query_serializer_class(self, expandable, prefetched_paths, expand_strategies, disallow, implicit_expand):
         attrs = {
             k: (ImplicitExpandableListField if implicit_expand else fields.ListField)(
                 required=False,
@@ -907,11 +1597,12 @@ class ExpandableModelSerializer(ModelSerializer):
                     "Can be provided multiple times to expand multiple fields. "
                     "Field is automatically expanded whenever it is updated."
                 ),
-                child=fields.ChoiceField(required=False, choices=[i.path for i in v if i.path not in disallow]),
-            )
-            for k, v in groupby(
-                self._get_all_expandable_fields(parents=[], this=self, exclude=exclude), key=lambda i: i.query_key
+                child=fields.ChoiceField(required=False, choices=[path for _, path in v if path not in disallow]),
             )
+            for k, v in groupby(expandable, key=lambda i: i[0])
         }
         attrs["implicit_expand"] = implicit_expand
+        attrs["cache_validation"] = True
+        attrs["prefetched_paths"] = prefetched_paths
+        attrs["expand_strategies"] = dict(expand_strategies)
         return type("ExpandableQuerySerializer", (serializers.Serializer,), attrs)
@@ -1,3 +1,6 @@
+import sqlalchemy as sa
+from sqlalchemy.exc import InvalidRequestError
+
 from django.core.exceptions import NON_FIELD_ERRORS, ValidationError as DjangoValidationError
 
 from rest_framework.serializers import ValidationError
@@ -28,3 +31,48 @@ def django_to_drf_validation_error(e):
     return ValidationError(
         _django_to_drf(e) if hasattr(e, "error_dict") else {api_settings.NON_FIELD_ERRORS_KEY: e.messages}
     )
+
+
+def get_foreign_key(instance, relation_info):
+    """Returns the primary key of the related model of a many to one
+    relationship read from the local foreign key columns of the instance
+    without loading the relationship."""
+    mapper = sa.inspect(instance).mapper
+    key = tuple(
+        getattr(instance, mapper.get_property_by_column(local).key)
+        for local, _ in relation_info.local_remote_pairs_for_identity_key
+    )
+    if any(i is None for i in key):
+        return None
+    return key
+
+
+def get_render_cache(field, name):
+    """Returns the named cache of data batch loaded for the current render.
+
+    Caches live on the root serializer and are cleared whenever it starts
+    rendering. Entries are keyed by instance states rather than by ids of
+    instances since ids are reused once instances are garbage collected.
+    """
+    return field.root.__dict__.setdefault("_render_cache", {}).setdefault(name, {})
+
+
+def clear_render_cache(serializer):
+    """Clears all caches of the previous render of the root serializer."""
+    serializer.root.__dict__.pop("_render_cache", None)
+
+
+def get_query_model(query):
+    """Returns the model class of a query selecting a single mapped entity.
+
+    Relies on public ``column_descriptions`` only so it holds across
+    sqlalchemy versions.
+    """
+    descriptions = query.column_descriptions
+    if (
+        len(descriptions) != 1
+        or descriptions[0]["entity"] is None
+        or descriptions[0]["expr"] is not descriptions[0]["entity"]
+    ):
+        raise InvalidRequestError("Query does not select a single mapped entity")
+    return sa.inspect(descriptions[0]["entity"]).mapper.class_
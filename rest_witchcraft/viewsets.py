@@ -1,7 +1,7 @@
 from rest_framework import mixins, viewsets
 
 from .generics import GenericAPIView
-from .mixins import DestroyModelMixin, ExpandableQuerySerializerMixin
+from .mixins import CreateModelMixin, DestroyModelMixin, ExpandableQuerySerializerMixin, UpdateModelMixin
 
 
 class GenericViewSet(viewsets.ViewSetMixin, GenericAPIView):
@@ -15,9 +15,9 @@ class ReadOnlyViewModelViewSet(mixins.RetrieveModelMixin, mixins.ListModelMixin,
 
 
 class ModelViewSet(
-    mixins.CreateModelMixin,
+    CreateModelMixin,
     mixins.RetrieveModelMixin,
-    mixins.UpdateModelMixin,
+    UpdateModelMixin,
     DestroyModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
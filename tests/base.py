@@ -0,0 +1,18 @@
+from sqlalchemy import event
+
+from .models import session
+
+
+class QueryCountMixin:
+    """Collects statements executed by the engine in ``queries`` once
+    ``count_queries()`` is called, usually at the end of ``setUp()`` after
+    fixtures are flushed."""
+
+    def count_queries(self):
+        engine = session.get_bind()
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", self.count_query)
+        self.addCleanup(event.remove, engine, "before_cursor_execute", self.count_query)
+
+    def count_query(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries.append(statement)
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, ForeignKey, Sequence, orm, types
+from sqlalchemy import Column, ForeignKey, Sequence, Table, orm, types
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -108,6 +108,59 @@ class Option(Base):
     vehicle = orm.relationship(Vehicle, backref="options")
 
 
+garage_vehicles = Table(
+    "garage_vehicles",
+    Base.metadata,
+    Column("garage_id", types.Integer(), ForeignKey("garages.id"), primary_key=True),
+    Column("vehicle_id", types.Integer(), ForeignKey(Vehicle.id), primary_key=True),
+)
+
+
+class Garage(Base):
+    __tablename__ = "garages"
+
+    id = Column(types.Integer(), primary_key=True)
+    name = Column(types.String(length=50))
+
+    vehicles = orm.relationship(Vehicle, secondary=garage_vehicles, order_by=Vehicle.name)
+
+
+class Animal(Base):
+    __tablename__ = "animals"
+
+    id = Column(types.Integer(), primary_key=True)
+    name = Column(types.String(length=50))
+    kind = Column(types.String(length=20), nullable=False)
+
+    __mapper_args__ = {"polymorphic_on": kind, "polymorphic_identity": "animal"}
+
+
+class Dog(Animal):
+    __tablename__ = "dogs"
+
+    id = Column(types.Integer(), ForeignKey(Animal.id), primary_key=True)
+    breed = Column(types.String(length=50))
+
+    __mapper_args__ = {"polymorphic_identity": "dog"}
+
+
+class Cat(Animal):
+    __tablename__ = "cats"
+
+    id = Column(types.Integer(), ForeignKey(Animal.id), primary_key=True)
+    lives = Column(types.Integer())
+
+    __mapper_args__ = {"polymorphic_identity": "cat"}
+
+
+class Document(Base):
+    __tablename__ = "documents"
+
+    id = Column(types.Integer(), primary_key=True)
+    name = Column(types.String(length=50))
+    content = Column(types.LargeBinary())
+
+
 class ModelWithJson(Base):
     __tablename__ = "model_with_json"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, create_engine, orm, types
+from sqlalchemy import Column, ForeignKeyConstraint, create_engine, orm, types
 from sqlalchemy.ext.declarative import declarative_base
 
 from django.conf import settings
@@ -23,4 +23,25 @@ class RouterTestCompositeKeyModel(Base):
     text = Column(types.String(length=200))
 
 
+class CompositeKeyParent(Base):
+    __tablename__ = "compositekeyparent"
+    id = Column(types.Integer(), primary_key=True)
+    other_id = Column(types.Integer(), primary_key=True)
+    name = Column(types.String(length=200))
+
+
+class CompositeKeyChild(Base):
+    __tablename__ = "compositekeychild"
+    id = Column(types.Integer(), primary_key=True)
+    name = Column(types.String(length=200))
+    parent_id = Column(types.Integer())
+    parent_other_id = Column(types.Integer())
+
+    parent = orm.relationship(CompositeKeyParent, backref="children")
+
+    __table_args__ = (
+        ForeignKeyConstraint([parent_id, parent_other_id], [CompositeKeyParent.id, CompositeKeyParent.other_id]),
+    )
+
+
 Base.metadata.create_all(engine)
@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from rest_witchcraft.cache import LRUCache
+
+
+class TestLRUCache(SimpleTestCase):
+    def test_get(self):
+        cache = LRUCache(maxsize=2)
+        calls = []
+
+        def loader(value):
+            def load():
+                calls.append(value)
+                return value
+
+            return load
+
+        self.assertEqual(cache.get("a", loader(1)), 1)
+        self.assertEqual(cache.get("a", loader(2)), 1)
+        self.assertEqual(cache.get("b", loader(None)), None)
+        self.assertEqual(cache.get("b", loader(3)), None)
+        self.assertEqual(calls, [1, None])
+
+        # a was used most recently so b is evicted
+        cache.get("a", loader(4))
+        cache.get("c", loader(5))
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a", loader(6)), 1)
+        self.assertEqual(cache.get("b", loader(7)), 7)
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+
+    def test_get_timeout(self):
+        cache = LRUCache()
+
+        with mock.patch("rest_witchcraft.cache.time.monotonic", return_value=100):
+            self.assertEqual(cache.get("a", lambda: 1, timeout=10), 1)
+
+        with mock.patch("rest_witchcraft.cache.time.monotonic", return_value=109):
+            self.assertEqual(cache.get("a", lambda: 2, timeout=10), 1)
+
+        with mock.patch("rest_witchcraft.cache.time.monotonic", return_value=110):
+            self.assertEqual(cache.get("a", lambda: 3, timeout=10), 3)
+            self.assertEqual(cache.get("a", lambda: 4), 3)
@@ -8,7 +8,7 @@ from rest_framework import fields
 from rest_enumfield import EnumField
 
 from rest_witchcraft import field_mapping
-from rest_witchcraft.fields import CharMappingField
+from rest_witchcraft.fields import CharMappingField, LargeBinaryField
 
 from .models import Owner
 
@@ -34,6 +34,10 @@ class TestGetFieldType(SimpleTestCase):
 
         self.assertTrue(issubclass(field, fields.CharField))
 
+    def test_get_field_type_can_map_large_binary_column(self):
+        self.assertIs(field_mapping.get_field_type(sqa.Column(sqa.LargeBinary())), LargeBinaryField)
+        self.assertIs(field_mapping.get_field_type(sqa.Column(postgresql.BYTEA())), LargeBinaryField)
+
     def test_get_field_type_can_map_int_column(self):
         field = field_mapping.get_field_type(sqa.Column(sqa.BigInteger()))
 
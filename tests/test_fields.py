@@ -1,12 +1,35 @@
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
 from django.test import SimpleTestCase, override_settings
+from django.urls import NoReverseMatch
 
-from rest_framework.fields import ChoiceField, IntegerField
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import CharField, ChoiceField, IntegerField
+from rest_framework.request import Request
 from rest_framework.serializers import Serializer
+from rest_framework.test import APIRequestFactory
 
-from rest_witchcraft.fields import HyperlinkedIdentityField, ImplicitExpandableListField, SkippableField, UriField
+from rest_witchcraft.fields import (
+    HyperlinkedIdentityField,
+    HyperlinkedRelatedField,
+    ImplicitExpandableListField,
+    LargeBinaryField,
+    ManyPrimaryKeyRelatedField,
+    PrimaryKeyRelatedField,
+    SkippableField,
+    UriField,
+)
+from rest_witchcraft.serializers import ModelSerializer
 
-from .models import Owner
-from .models_composite import RouterTestCompositeKeyModel
+from .base import QueryCountMixin
+from .models import Document, Garage, Owner, Vehicle, VehicleType, session
+from .models_composite import (
+    CompositeKeyChild,
+    CompositeKeyParent,
+    RouterTestCompositeKeyModel,
+    session as composite_session,
+)
 
 
 @override_settings(ROOT_URLCONF="tests.urls.testhyperlinkedidentityfield")
@@ -35,6 +58,80 @@ class TestHyperlinkedIdentityFieldComposite(SimpleTestCase):
         self.assertEqual(url, "/example/1/2/")
 
 
+@override_settings(ROOT_URLCONF="tests.urls.testhyperlinkedrelatedfield")
+class TestUrlTemplateMixin(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.field = HyperlinkedIdentityField(view_name="owner-detail", lookup_field="id", lookup_url_kwarg="pk")
+        self.calls = []
+        reverse = self.field.reverse
+
+        def counting_reverse(*args, **kwargs):
+            self.calls.append(kwargs["kwargs"])
+            return reverse(*args, **kwargs)
+
+        self.field.reverse = counting_reverse
+
+    def test_get_url(self):
+        urls = [self.field.get_url(Owner(id=i), "owner-detail", None, None) for i in range(1, 4)]
+
+        self.assertEqual(urls, ["/owners/1/", "/owners/2/", "/owners/3/"])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_request(self):
+        request = Request(APIRequestFactory().get("/"))
+
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": 1}, request), "http://testserver/owners/1/")
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": 2}, request), "http://testserver/owners/2/")
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": 3}), "/owners/3/")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_format(self):
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": 1}, format="json"), "/owners/1.json")
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": 2}, format="json"), "/owners/2.json")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_strings(self):
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": "a-b"}), "/owners/a-b/")
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": "c_D"}), "/owners/c_D/")
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": "a b"}), "/owners/a%20b/")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_negative(self):
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": 1}), "/owners/1/")
+        self.assertEqual(self.field.reverse_url("owner-detail", {"pk": -1}), "/owners/-1/")
+        self.assertEqual(self.field.reverse_url("digits", {"pk": 1}), "/digits/1/")
+        with self.assertRaises(NoReverseMatch):
+            self.field.reverse_url("digits", {"pk": -1})
+
+    def test_composite(self):
+        view_name = "compositekeyparent-detail"
+
+        self.assertEqual(self.field.reverse_url(view_name, {"id": 1, "other_id": 12}), "/parents/1/12/")
+        self.assertEqual(self.field.reverse_url(view_name, {"id": 12, "other_id": 1}), "/parents/12/1/")
+        self.assertEqual(self.field.reverse_url(view_name, {"id": -1, "other_id": 2}), "/parents/-1/2/")
+        self.assertEqual(self.field.reverse_url(view_name, {"id": "a", "other_id": "a-b"}), "/parents/a/a-b/")
+        self.assertEqual(self.field.reverse_url(view_name, {"id": "a-b", "other_id": "a"}), "/parents/a-b/a/")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_sentinels(self):
+        sentinels = [template.format(i) for template in self.field.url_template_sentinels.values() for i in range(12)]
+
+        self.assertEqual([s for s in sentinels if any(s in other for other in sentinels if other != s)], [])
+        self.assertTrue(self.field.url_template_sentinels[int].format(0).isdigit())
+
+    def test_not_templated(self):
+        self.assertEqual(self.field.reverse_url("digits", {"pk": 1}), "/digits/1/")
+        self.assertEqual(self.field.reverse_url("digits", {"pk": "2"}), "/digits/2/")
+        self.assertEqual(self.field.reverse_url("digits", {"pk": "3"}), "/digits/3/")
+        with self.assertRaises(NoReverseMatch):
+            self.field.reverse_url("digits", {"pk": "a"})
+
+        self.field.reverse = lambda view_name, kwargs, request, format: "/{0}/{0}/".format(kwargs["pk"])
+
+        self.assertEqual(self.field.reverse_url("foo", {"pk": 1}), "/1/1/")
+
+
 @override_settings(ROOT_URLCONF="tests.urls.testhyperlinkedidentityfield")
 class TestUriField(SimpleTestCase):
     def test_url(self):
@@ -60,3 +157,467 @@ class TestSkippableField(SimpleTestCase):
             bar = IntegerField()
 
         self.assertEqual(TestSerializer(instance={"foo": "foo", "bar": 5}).data, {"bar": 5})
+
+
+class TestPrimaryKeyRelatedField(QueryCountMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Owner(id=1, first_name="Jon", last_name="Snow"),
+                Owner(id=2, first_name="Joe", last_name="Smith"),
+                Vehicle(id=1, name="Car", type=VehicleType.car, _owner_id=1),
+                Vehicle(id=2, name="Bus", type=VehicleType.bus, _owner_id=1),
+                Vehicle(id=3, name="Bike", type=VehicleType.car),
+            ]
+        )
+        session.flush()
+        session.expunge_all()
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        session.expunge_all()
+        super().tearDown()
+
+    def get_serializers(self, **kwargs):
+        class VehicleSerializer(ModelSerializer):
+            owner = PrimaryKeyRelatedField(allow_null=True, **kwargs)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner"]
+
+        class OwnerSerializer(ModelSerializer):
+            vehicles = PrimaryKeyRelatedField(many=True, required=False)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles"]
+
+        return VehicleSerializer, OwnerSerializer
+
+    def test_many_to_one_to_representation(self):
+        vehicle_serializer, _ = self.get_serializers()
+        vehicles = session.query(Vehicle).order_by(Vehicle.id).all()
+        self.queries = []
+
+        self.assertEqual(
+            vehicle_serializer(instance=vehicles, many=True).data,
+            [{"id": 1, "owner": 1}, {"id": 2, "owner": 1}, {"id": 3, "owner": None}],
+        )
+        self.assertEqual(self.queries, [])
+        self.assertNotIn("owner", vehicles[0].__dict__)
+
+    def test_many_to_one_loaded(self):
+        vehicle_serializer, _ = self.get_serializers()
+        vehicle = session.query(Vehicle).get(3)
+        vehicle.owner = Owner(id=3)
+
+        self.assertEqual(vehicle_serializer(instance=vehicle).data, {"id": 3, "owner": 3})
+
+    def test_many_to_one_to_internal_value(self):
+        vehicle_serializer, _ = self.get_serializers()
+        vehicle = session.query(Vehicle).get(3)
+        self.queries = []
+
+        serializer = vehicle_serializer(instance=vehicle, data={"owner": "2"}, partial=True)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(self.queries), 1)
+        self.assertIs(serializer.validated_data["owner"], session.query(Owner).get(2))
+
+        serializer.save()
+
+        self.assertEqual(vehicle._owner_id, 2)
+
+    def test_many_to_one_errors(self):
+        vehicle_serializer, _ = self.get_serializers()
+
+        serializer = vehicle_serializer(data={"owner": 5}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"owner": ['Invalid pk "5" - object does not exist.']})
+
+        serializer = vehicle_serializer(data={"owner": "a"}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"owner": ["Incorrect type. Expected pk value, received str."]})
+
+        serializer = vehicle_serializer(data={"owner": [1]}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"owner": ["Incorrect type. Expected pk value, received list."]})
+
+        for value in (1.9, True):
+            serializer = vehicle_serializer(data={"owner": value}, partial=True)
+            self.assertFalse(serializer.is_valid(), value)
+            self.assertEqual(
+                serializer.errors,
+                {"owner": ["Incorrect type. Expected pk value, received {}.".format(type(value).__name__)]},
+            )
+
+    def test_pk_field(self):
+        vehicle_serializer, _ = self.get_serializers(pk_field=CharField())
+        vehicle = session.query(Vehicle).get(1)
+
+        self.assertEqual(vehicle_serializer(instance=vehicle).data, {"id": 1, "owner": "1"})
+
+        serializer = vehicle_serializer(instance=vehicle, data={"owner": 2}, partial=True)
+        self.assertFalse(serializer.is_valid())
+
+    def test_queryset(self):
+        vehicle_serializer, _ = self.get_serializers(queryset=session.query(Owner).filter(Owner.id == 1))
+
+        self.assertTrue(vehicle_serializer(data={"owner": 1}, partial=True).is_valid())
+        self.assertFalse(vehicle_serializer(data={"owner": 2}, partial=True).is_valid())
+
+    def test_choices(self):
+        vehicle_serializer, _ = self.get_serializers()
+
+        self.assertEqual(list(vehicle_serializer().fields["owner"].get_choices()), [1, 2])
+
+    def test_many_to_representation(self):
+        _, owner_serializer = self.get_serializers()
+        owners = session.query(Owner).order_by(Owner.id).all()
+        self.queries = []
+
+        serializer = owner_serializer(instance=owners, many=True)
+
+        self.assertIsInstance(serializer.child.fields["vehicles"], ManyPrimaryKeyRelatedField)
+        self.assertEqual(serializer.data, [{"id": 1, "vehicles": [1, 2]}, {"id": 2, "vehicles": []}])
+        # keys of the whole list are loaded with one query
+        self.assertEqual(len(self.queries), 1)
+        self.assertIn("IN", self.queries[0])
+        self.assertNotIn("vehicles", owners[0].__dict__)
+
+        self.queries = []
+        self.assertEqual(owner_serializer(instance=owners[0]).data, {"id": 1, "vehicles": [1, 2]})
+        self.assertEqual(len(self.queries), 1)
+
+    def test_many_loaded(self):
+        _, owner_serializer = self.get_serializers()
+        owner = session.query(Owner).get(1)
+        owner.vehicles
+        self.queries = []
+
+        self.assertEqual(owner_serializer(instance=owner).data, {"id": 1, "vehicles": [1, 2]})
+        self.assertEqual(self.queries, [])
+
+    def test_many_unsaved(self):
+        _, owner_serializer = self.get_serializers()
+
+        self.assertEqual(owner_serializer(instance=Owner()).data, {"id": None, "vehicles": []})
+
+    def test_many_to_many(self):
+        class GarageSerializer(ModelSerializer):
+            vehicles = PrimaryKeyRelatedField(many=True)
+
+            class Meta:
+                model = Garage
+                session = session
+                fields = ["id", "vehicles"]
+
+        session.add(Garage(id=1, vehicles=session.query(Vehicle).filter(Vehicle.id > 1).all()))
+        session.add(Garage(id=2, vehicles=session.query(Vehicle).filter(Vehicle.id == 1).all()))
+        session.add(Garage(id=3))
+        session.flush()
+        session.expunge_all()
+
+        self.assertEqual(GarageSerializer(instance=session.query(Garage).get(1)).data, {"id": 1, "vehicles": [3, 2]})
+
+        garages = session.query(Garage).order_by(Garage.id).all()
+        self.queries = []
+        self.assertEqual(
+            GarageSerializer(instance=garages, many=True).data,
+            [{"id": 1, "vehicles": [3, 2]}, {"id": 2, "vehicles": [1]}, {"id": 3, "vehicles": []}],
+        )
+        self.assertEqual(len(self.queries), 1)
+
+        # keys are still queried per instance outside of prefetch
+        session.expunge_all()
+        field = GarageSerializer().fields["vehicles"].child_relation
+        self.assertEqual(field.get_related_keys(session.query(Garage).get(1)), [(3,), (2,)])
+
+    def test_many_to_internal_value(self):
+        _, owner_serializer = self.get_serializers()
+        owner = session.query(Owner).get(2)
+        self.queries = []
+
+        serializer = owner_serializer(instance=owner, data={"vehicles": [3, 2, 3]}, partial=True)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual([v.id for v in serializer.validated_data["vehicles"]], [3, 2, 3])
+
+        serializer = owner_serializer(instance=owner, data={"vehicles": []}, partial=True)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["vehicles"], [])
+
+    def test_many_errors(self):
+        _, owner_serializer = self.get_serializers()
+
+        serializer = owner_serializer(data={"vehicles": [1, 4]}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"vehicles": ['Invalid pk "4" - object does not exist.']})
+
+        serializer = owner_serializer(data={"vehicles": 1}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"vehicles": ['Expected a list of items but got type "int".']})
+
+        with self.assertRaises(ValidationError):
+            PrimaryKeyRelatedField(many=True, allow_empty=False).to_internal_value([])
+
+
+class TestPrimaryKeyRelatedFieldCompositeKey(SimpleTestCase):
+    def tearDown(self):
+        composite_session.rollback()
+        composite_session.expunge_all()
+        super().tearDown()
+
+    def test_composite_key(self):
+        class CompositeKeyChildSerializer(ModelSerializer):
+            parent = PrimaryKeyRelatedField()
+
+            class Meta:
+                model = CompositeKeyChild
+                session = composite_session
+                fields = ["id", "parent"]
+
+        class CompositeKeyParentSerializer(ModelSerializer):
+            children = PrimaryKeyRelatedField(many=True)
+
+            class Meta:
+                model = CompositeKeyParent
+                session = composite_session
+                fields = ["id", "other_id", "children"]
+
+        composite_session.add_all(
+            [
+                CompositeKeyParent(id=1, other_id=1, children=[CompositeKeyChild(id=1)]),
+                CompositeKeyParent(id=1, other_id=2),
+            ]
+        )
+        composite_session.flush()
+        composite_session.expunge_all()
+
+        child = composite_session.query(CompositeKeyChild).get(1)
+        self.assertEqual(CompositeKeyChildSerializer(instance=child).data, {"id": 1, "parent": (1, 1)})
+
+        serializer = CompositeKeyChildSerializer(instance=child, data={"parent": [1, 2]}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["parent"].other_id, 2)
+
+        serializer = CompositeKeyParentSerializer(data={"children": [1]}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        serializer = CompositeKeyChildSerializer(instance=child, data={"parent": 1}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"parent": ["Incorrect type. Expected pk value, received int."]})
+
+
+@override_settings(ROOT_URLCONF="tests.urls.testhyperlinkedrelatedfield")
+class TestHyperlinkedRelatedField(QueryCountMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Owner(id=1, first_name="Jon", last_name="Snow"),
+                Owner(id=2, first_name="Joe", last_name="Smith"),
+                Vehicle(id=1, name="Car", type=VehicleType.car, _owner_id=1),
+                Vehicle(id=2, name="Bus", type=VehicleType.bus, _owner_id=1),
+                Vehicle(id=3, name="Bike", type=VehicleType.car),
+            ]
+        )
+        session.flush()
+        session.expunge_all()
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        session.expunge_all()
+        super().tearDown()
+
+    def get_serializers(self, **kwargs):
+        class VehicleSerializer(ModelSerializer):
+            owner = HyperlinkedRelatedField(allow_null=True, **kwargs)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner"]
+
+        class OwnerSerializer(ModelSerializer):
+            vehicles = HyperlinkedRelatedField(many=True, required=False)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles"]
+
+        return VehicleSerializer, OwnerSerializer
+
+    def test_to_representation(self):
+        vehicle_serializer, _ = self.get_serializers()
+        vehicles = session.query(Vehicle).order_by(Vehicle.id).all()
+        request = Request(APIRequestFactory().get("/"))
+        self.queries = []
+
+        data = vehicle_serializer(instance=vehicles, many=True, context={"request": request}).data
+
+        self.assertEqual(
+            data,
+            [
+                {"id": 1, "owner": "http://testserver/owners/1/"},
+                {"id": 2, "owner": "http://testserver/owners/1/"},
+                {"id": 3, "owner": None},
+            ],
+        )
+        self.assertEqual(data[0]["owner"].obj, (1,))
+        self.assertEqual(self.queries, [])
+
+    def test_to_representation_many(self):
+        _, owner_serializer = self.get_serializers()
+
+        data = owner_serializer(instance=session.query(Owner).get(1)).data
+
+        self.assertEqual(data, {"id": 1, "vehicles": ["/vehicles/1/", "/vehicles/2/"]})
+
+    def test_format(self):
+        vehicle_serializer, _ = self.get_serializers(format="json", view_name="owner-detail")
+        vehicle = session.query(Vehicle).get(1)
+
+        self.assertEqual(
+            vehicle_serializer(instance=vehicle, context={"format": "api"}).data["owner"], "/owners/1.json"
+        )
+
+    def test_no_reverse_match(self):
+        vehicle_serializer, _ = self.get_serializers(view_name="foo")
+
+        with self.assertRaises(ImproperlyConfigured):
+            vehicle_serializer(instance=session.query(Vehicle).get(1)).data
+
+    def test_to_internal_value(self):
+        vehicle_serializer, _ = self.get_serializers()
+        vehicle = session.query(Vehicle).get(3)
+
+        serializer = vehicle_serializer(instance=vehicle, data={"owner": "http://testserver/owners/2/"}, partial=True)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertIs(serializer.validated_data["owner"], session.query(Owner).get(2))
+
+    def test_to_internal_value_many(self):
+        _, owner_serializer = self.get_serializers()
+        self.queries = []
+
+        serializer = owner_serializer(data={"vehicles": ["/vehicles/1/", "/vehicles/3/"]}, partial=True)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual([v.id for v in serializer.validated_data["vehicles"]], [1, 3])
+        self.assertEqual(len(self.queries), 1)
+
+    def test_errors(self):
+        vehicle_serializer, _ = self.get_serializers()
+
+        for data, error in [
+            (1, "Incorrect type. Expected URL string, received int."),
+            ("/foo/", "Invalid hyperlink - No URL match."),
+            ("/vehicles/1/", "Invalid hyperlink - Incorrect URL match."),
+            ("/owners/5/", "Invalid hyperlink - Object does not exist."),
+            ("/owners/a/", "Incorrect type. Expected URL string, received str."),
+        ]:
+            serializer = vehicle_serializer(data={"owner": data}, partial=True)
+            self.assertFalse(serializer.is_valid())
+            self.assertEqual(serializer.errors, {"owner": [error]})
+
+    def test_choices(self):
+        vehicle_serializer, _ = self.get_serializers()
+
+        self.assertEqual(list(vehicle_serializer().fields["owner"].get_choices()), ["/owners/1/", "/owners/2/"])
+
+
+@override_settings(ROOT_URLCONF="tests.urls.testhyperlinkedrelatedfield")
+class TestHyperlinkedRelatedFieldCompositeKey(SimpleTestCase):
+    def test_composite_key(self):
+        class CompositeKeyChildSerializer(ModelSerializer):
+            parent = HyperlinkedRelatedField()
+
+            class Meta:
+                model = CompositeKeyChild
+                session = composite_session
+                fields = ["id", "parent"]
+
+        composite_session.add_all([CompositeKeyParent(id=1, other_id=1, children=[CompositeKeyChild(id=1)])])
+        composite_session.flush()
+        composite_session.expunge_all()
+
+        try:
+            child = composite_session.query(CompositeKeyChild).get(1)
+            self.assertEqual(CompositeKeyChildSerializer(instance=child).data, {"id": 1, "parent": "/parents/1/1/"})
+
+            serializer = CompositeKeyChildSerializer(instance=child, data={"parent": "/parents/1/1/"}, partial=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            self.assertEqual(serializer.validated_data["parent"].other_id, 1)
+        finally:
+            composite_session.rollback()
+            composite_session.expunge_all()
+
+
+@override_settings(ROOT_URLCONF="tests.urls.testlargebinary")
+class TestLargeBinaryField(SimpleTestCase):
+    def get_serializer_class(self, **kwargs):
+        class DocumentSerializer(ModelSerializer):
+            content = LargeBinaryField(required=True, **kwargs)
+
+            class Meta:
+                model = Document
+                session = session
+                fields = ["id", "content"]
+
+        return DocumentSerializer
+
+    def test_to_representation(self):
+        serializer_class = self.get_serializer_class()
+
+        self.assertEqual(
+            serializer_class(instance=Document(id=1, content=b"1")).data,
+            {"id": 1, "content": "/documents/1/binary/content/"},
+        )
+        self.assertEqual(serializer_class(instance=Document()).data, {"id": None, "content": None})
+        self.assertTrue(serializer_class().fields["content"].read_only)
+
+    def test_view_name(self):
+        serializer = self.get_serializer_class(view_name="document-detail")(instance=Document(id=1))
+        field = serializer.fields["content"]
+        field.reverse = mock.Mock(return_value="/documents/1/")
+
+        self.assertEqual(serializer.data, {"id": 1, "content": "/documents/1/"})
+        field.reverse.assert_called_with(
+            "document-detail", kwargs={"pk": 1, "binary_field": "content"}, request=None, format=None
+        )
+
+    def test_no_route(self):
+        serializer_class = self.get_serializer_class(view_name="document-content")
+
+        self.assertEqual(
+            serializer_class(instance=Document(id=1, content=b"\x00binary\xff")).data,
+            {"id": 1, "content": "AGJpbmFyef8="},
+        )
+        self.assertEqual(serializer_class(instance=Document(id=1)).data, {"id": 1, "content": None})
+
+    def test_composite_key(self):
+        class CompositeKeyParentSerializer(ModelSerializer):
+            content = LargeBinaryField(source="*", view_name="compositekeyparent-binary")
+
+            class Meta:
+                model = CompositeKeyParent
+                session = composite_session
+                fields = ["content"]
+
+        field = CompositeKeyParentSerializer().fields["content"]
+        field.reverse = lambda view_name, kwargs, request, format: sorted(kwargs.items())
+
+        self.assertEqual(
+            field.to_representation(CompositeKeyParent(id=1, other_id=2)),
+            [("binary_field", "content"), ("id", 1), ("other_id", 2)],
+        )
@@ -1,15 +1,32 @@
+import datetime
+import decimal
+from unittest import mock, skipUnless
+
 import coreschema
+from sqlalchemy import Column, text, types
+from sqlalchemy.dialects import postgresql, sqlite
 
 from django.test import RequestFactory
 
+from django_sorcery.db import meta
+
+from rest_framework import fields
+from rest_framework.exceptions import ValidationError
+from rest_framework.schemas.openapi import AutoSchema
 from rest_framework.settings import api_settings
 from rest_framework.test import APISimpleTestCase
 
-from rest_witchcraft.filters import SearchFilter
+from rest_witchcraft.cache import filter_plans, filter_serializers, ordering_plans, search_plans
+from rest_witchcraft.fields import AggregateField
+from rest_witchcraft.filters import FieldLookupFilter, FullTextSearchFilter, OrderingFilter, SearchFilter
 from rest_witchcraft.serializers import ModelSerializer
 from rest_witchcraft.viewsets import ModelViewSet
 
-from .models import Owner, session
+from .models import Option, Owner, Vehicle, VehicleType, session
+from .models_composite import RouterTestCompositeKeyModel
+
+
+DIALECT = session.get_bind().dialect.name
 
 
 class OwnerSerializer(ModelSerializer):
@@ -141,3 +158,656 @@ class TestSearchFilters(APISimpleTestCase):
         request = viewset.initialize_request(self.factory.get("/", {api_settings.SEARCH_PARAM: "Snow"}))
         query = self.filter.filter_queryset(request, viewset.get_queryset(), viewset)
         self.assertEqual(set(query.all()), {self.owner2})
+
+
+class VehicleSerializer(ModelSerializer):
+    class Meta:
+        model = Vehicle
+        session = session
+        fields = "id", "name"
+
+
+class VehicleViewSet(ModelViewSet):
+    serializer_class = VehicleSerializer
+    queryset = Vehicle.query
+    ordering_fields = ["name", "owner__first_name", "owner__last_name"]
+
+
+class OwnerAggregateSerializer(ModelSerializer):
+    vehicle_count = AggregateField("vehicles")
+
+    class Meta:
+        model = Owner
+        session = session
+        fields = "id", "vehicle_count"
+
+
+class OwnerAggregateViewSet(ModelViewSet):
+    serializer_class = OwnerAggregateSerializer
+    queryset = Owner.query
+    ordering_fields = ["first_name", "vehicle_count"]
+
+
+class TestOrderingFilter(APISimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        super().setUp()
+        self.filter = OrderingFilter()
+
+        self.smith = Owner(id=1, first_name="Joe", last_name="Smith")
+        self.snow = Owner(id=2, first_name="Jon", last_name="Snow")
+        self.vehicles = [
+            Vehicle(id=1, name="b", type=VehicleType.car, owner=self.snow),
+            Vehicle(id=2, name="a", type=VehicleType.car, owner=self.smith),
+            Vehicle(id=3, name="b", type=VehicleType.car, owner=self.smith),
+            Vehicle(id=4, name="a", type=VehicleType.car),
+        ]
+        session.add_all(self.vehicles)
+        session.flush()
+
+    def tearDown(self):
+        session.rollback()
+        ordering_plans.clear()
+        super().tearDown()
+
+    def filter_queryset(self, viewset_class=VehicleViewSet, **params):
+        viewset = viewset_class()
+        viewset.action_map = {"get": "list"}
+        viewset.format_kwarg = None
+        viewset.request = viewset.initialize_request(self.factory.get("/", params))
+        return self.filter.filter_queryset(viewset.request, viewset.get_queryset(), viewset)
+
+    def test_ordering(self):
+        query = self.filter_queryset(ordering="name")
+        self.assertEqual([v.id for v in query], [2, 4, 1, 3])
+
+        query = self.filter_queryset(ordering="-name")
+        self.assertEqual([v.id for v in query], [3, 1, 4, 2])
+
+    def test_default_ordering(self):
+        self.assertEqual([v.id for v in self.filter_queryset()], [1, 2, 3, 4])
+
+        with mock.patch.object(VehicleViewSet, "ordering", "-name", create=True):
+            self.assertEqual([v.id for v in self.filter_queryset()], [3, 1, 4, 2])
+            self.assertEqual([v.id for v in self.filter_queryset(ordering="haha")], [3, 1, 4, 2])
+
+        with mock.patch.object(VehicleViewSet, "ordering", ["name", "-id"], create=True):
+            self.assertEqual([v.id for v in self.filter_queryset()], [4, 2, 3, 1])
+
+    def test_invalid_fields_ignored(self):
+        query = self.filter_queryset(ordering="haha,-name,id,owner__vehicles")
+        self.assertEqual([v.id for v in query], [3, 1, 4, 2])
+
+    def test_relationship_joined_once(self):
+        query = self.filter_queryset(ordering="-owner__last_name,owner__first_name,name")
+
+        self.assertEqual([v.id for v in query], [1, 2, 3, 4])
+        self.assertEqual(str(query.statement).count("JOIN"), 1)
+        self.assertIn("LEFT OUTER JOIN owners AS owners_1 ON owners_1.id = vehicles.owner_id", str(query.statement))
+
+    def test_aggregate(self):
+        query = self.filter_queryset(OwnerAggregateViewSet, ordering="-vehicle_count")
+        self.assertEqual([o.id for o in query], [1, 2])
+
+        query = self.filter_queryset(OwnerAggregateViewSet, ordering="vehicle_count")
+        self.assertEqual([o.id for o in query], [2, 1])
+
+    def test_plan_cached(self):
+        self.filter_queryset(ordering="name")
+        self.filter_queryset(ordering="name")
+        self.filter_queryset(ordering="-name")
+
+        self.assertEqual(len(ordering_plans), 2)
+
+    def test_invalid_ordering_fields(self):
+        with mock.patch.object(VehicleViewSet, "ordering_fields", ["owner__vehicles__name"]):
+            with self.assertRaises(AssertionError):
+                self.filter_queryset(ordering="owner__vehicles__name")
+
+        with mock.patch.object(VehicleViewSet, "ordering_fields", ["engine"]):
+            with self.assertRaises(AssertionError):
+                self.filter_queryset(ordering="engine")
+
+    def test_warn_unindexed(self):
+        self.filter.warn_unindexed = True
+
+        with self.assertLogs("rest_witchcraft.filters") as logs:
+            self.filter_queryset(ordering="-owner__last_name")
+            self.filter_queryset(ordering="name")
+            self.filter_queryset(ordering="name")
+
+        self.assertEqual(
+            logs.output,
+            [
+                "WARNING:rest_witchcraft.filters:Ordering Vehicle by 'owner__last_name' "
+                "is not supported by any index of table owners",
+                "WARNING:rest_witchcraft.filters:Ordering Vehicle by 'name' is not supported by any index of table vehicles",
+            ],
+        )
+
+        # primary keys are indexed and aggregates are not checked
+        with mock.patch.object(VehicleViewSet, "ordering_fields", ["id"]), self.assertLogs(
+            "rest_witchcraft.filters"
+        ) as logs:
+            self.filter_queryset(ordering="-id")
+            self.filter_queryset(OwnerAggregateViewSet, ordering="vehicle_count")
+            self.filter_queryset(OwnerAggregateViewSet, ordering="first_name")
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Ordering Owner by 'first_name'", logs.output[0])
+
+    def test_schema(self):
+        viewset = VehicleViewSet()
+
+        self.assertEqual(
+            self.filter.get_schema_operation_parameters(viewset),
+            [
+                {
+                    "name": "ordering",
+                    "required": False,
+                    "in": "query",
+                    "description": "Which field to use when ordering the results.",
+                    "schema": {
+                        "type": "array",
+                        "items": {
+                            "type": "string",
+                            "enum": [
+                                "name",
+                                "-name",
+                                "owner__first_name",
+                                "-owner__first_name",
+                                "owner__last_name",
+                                "-owner__last_name",
+                            ],
+                        },
+                    },
+                    "style": "form",
+                    "explode": False,
+                }
+            ],
+        )
+
+        field = self.filter.get_schema_fields(viewset)[0]
+        self.assertEqual((field.name, field.location, field.required), ("ordering", "query", False))
+        self.assertIsInstance(field.schema, coreschema.String)
+
+        with mock.patch.object(VehicleViewSet, "ordering_fields", "__all__"):
+            self.assertEqual(self.filter.get_valid_fields(viewset)[0], "id")
+            self.assertIn("created_at", self.filter.get_valid_fields(viewset))
+
+    def test_to_html(self):
+        viewset = VehicleViewSet()
+        viewset.action_map = {"get": "list"}
+        request = viewset.initialize_request(self.factory.get("/", {"ordering": "-name"}))
+
+        html = self.filter.to_html(request, viewset.get_queryset(), viewset)
+
+        self.assertInHTML("<h2>Ordering</h2>", html)
+        self.assertIn("owner first name - descending", html)
+
+
+class LookupVehicleSerializer(ModelSerializer):
+    class Meta:
+        model = Vehicle
+        session = session
+        fields = "id", "name"
+
+
+class LookupVehicleViewSet(ModelViewSet):
+    serializer_class = LookupVehicleSerializer
+    queryset = Vehicle.query
+    filterset_fields = {
+        "id": ["exact", "in"],
+        "name": ["iexact", "contains", "icontains", "startswith", "endswith", "iendswith", "isnull"],
+        "type": ["exact"],
+        "paint": ["in"],
+        "created_at": ["gte", "lt"],
+        "owner__last_name": ["istartswith"],
+        "owner__first_name": ["exact"],
+        "options__name": ["exact"],
+    }
+
+
+class LookupOwnerViewSet(ModelViewSet):
+    serializer_class = OwnerSerializer
+    queryset = Owner.query
+    filterset_fields = ["first_name", "vehicles__owner__last_name"]
+
+
+class TestFieldLookupFilter(APISimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        super().setUp()
+        self.filter = FieldLookupFilter()
+
+        smith = Owner(id=1, first_name="Joe", last_name="Smith")
+        snow = Owner(id=2, first_name="Jon", last_name="Snow")
+        session.add_all(
+            [
+                Vehicle(
+                    id=1,
+                    name="Car_1",
+                    type=VehicleType.car,
+                    paint="red",
+                    owner=smith,
+                    created_at=datetime.datetime(2020, 1, 1),
+                    options=[Option(name="a"), Option(name="b")],
+                ),
+                Vehicle(
+                    id=2,
+                    name="Bus 100%",
+                    type=VehicleType.bus,
+                    paint="blue",
+                    owner=snow,
+                    created_at=datetime.datetime(2021, 1, 1),
+                    options=[Option(name="a")],
+                ),
+                Vehicle(id=3, type=VehicleType.car, owner=smith),
+            ]
+        )
+        session.flush()
+
+    def tearDown(self):
+        session.rollback()
+        filter_plans.clear()
+        filter_serializers.clear()
+        super().tearDown()
+
+    def filter_queryset(self, viewset_class=LookupVehicleViewSet, **params):
+        viewset = viewset_class()
+        viewset.action_map = {"get": "list"}
+        request = viewset.initialize_request(self.factory.get("/", params))
+        return self.filter.filter_queryset(request, viewset.get_queryset(), viewset)
+
+    def assertFiltered(self, ids, **params):
+        self.assertEqual(sorted(v.id for v in self.filter_queryset(**params)), ids, params)
+
+    def test_lookups(self):
+        self.assertFiltered([1, 2, 3])
+        self.assertFiltered([2], id="2")
+        self.assertFiltered([1, 3], id__in="1,3")
+        self.assertFiltered([1, 2], name__isnull="false")
+        self.assertFiltered([3], name__isnull="true")
+        self.assertFiltered([1], name__iexact="car_1")
+        self.assertFiltered([2], name__contains="0%")
+        self.assertFiltered([], name__contains="a_")
+        self.assertFiltered([1], name__icontains="R_")
+        self.assertFiltered([2], name__startswith="Bus")
+        self.assertFiltered([1], name__endswith="_1")
+        self.assertFiltered([2], name__iendswith="00%")
+        self.assertFiltered([2], type="Bus")
+        self.assertFiltered([1, 2], paint__in="red,blue")
+        self.assertFiltered([2], created_at__gte="2020-06-01")
+        self.assertFiltered([1], created_at__lt="2020-06-01", created_at__gte="2019-01-01")
+        self.assertFiltered([1, 2, 3], haha="1")
+
+    def test_relationships(self):
+        self.assertFiltered([1, 3], owner__last_name__istartswith="sm")
+        self.assertFiltered([1, 3], owner__last_name__istartswith="sm", owner__first_name="Joe")
+        self.assertFiltered([1, 2], options__name="a")
+        self.assertFiltered([1], options__name="b", owner__first_name="Joe")
+
+        # terms of one relationship path share one EXISTS
+        query = self.filter_queryset(owner__last_name__istartswith="sm", owner__first_name="Joe")
+        self.assertEqual(str(query.statement).count("EXISTS"), 1)
+        self.assertNotIn("JOIN", str(query.statement))
+
+        query = self.filter_queryset(LookupOwnerViewSet, vehicles__owner__last_name="Snow")
+        self.assertEqual([o.id for o in query], [2])
+        self.assertEqual(str(query.statement).count("EXISTS"), 2)
+
+        self.assertEqual([o.id for o in self.filter_queryset(LookupOwnerViewSet, first_name="Joe")], [1])
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValidationError) as e:
+            self.filter_queryset(id="haha", id__in="1,haha", type="Boat", created_at__gte="haha")
+
+        self.assertEqual(set(e.exception.detail), {"id", "id__in", "type", "created_at__gte"})
+
+    def test_plan_cached(self):
+        self.filter_queryset(id="1")
+        self.filter_queryset(id="2")
+        self.filter_queryset(id="2", haha="1")
+        self.filter_queryset(id__in="2")
+
+        self.assertEqual(len(filter_plans), 2)
+        self.assertEqual(len(filter_serializers), 1)
+
+    def test_no_filterset_fields(self):
+        with mock.patch.object(LookupVehicleViewSet, "filterset_fields", None):
+            self.assertFiltered([1, 2, 3], id="1")
+
+    def test_invalid_filterset_fields(self):
+        for filterset_fields in [{"haha": ["exact"]}, {"name": ["haha"]}, {"engine__name": ["exact"]}, {"engine": []}]:
+            with mock.patch.object(LookupVehicleViewSet, "filterset_fields", filterset_fields):
+                with self.assertRaises(AssertionError):
+                    self.filter_queryset(id="1")
+
+    def test_build_field(self):
+        column_info = meta.column_info(Column("amount", types.Numeric()))
+
+        field = self.filter.build_field(column_info, "gt")
+        self.assertIsInstance(field, fields.DecimalField)
+        self.assertEqual(field.to_internal_value("1.50"), decimal.Decimal("1.50"))
+
+        column_info = meta.column_info(Column("amount", types.Numeric(precision=4, scale=1)))
+        field = self.filter.build_field(column_info, "in")
+        self.assertEqual(field.child.max_digits, 4)
+        self.assertEqual(field.to_internal_value("1.5,2"), [decimal.Decimal("1.5"), decimal.Decimal("2")])
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(["1.55"])
+
+        with self.assertRaises(AssertionError):
+            self.filter.build_field(meta.column_info(Column("data", types.JSON())), "exact")
+
+    def test_schema(self):
+        viewset = LookupOwnerViewSet()
+
+        self.assertEqual(
+            self.filter.get_schema_operation_parameters(viewset),
+            [
+                {"name": "first_name", "required": False, "in": "query", "schema": {"type": "string"}},
+                {
+                    "name": "vehicles__owner__last_name",
+                    "required": False,
+                    "in": "query",
+                    "schema": {"type": "string"},
+                },
+            ],
+        )
+
+        parameters = self.filter.get_schema_operation_parameters(LookupVehicleViewSet())
+        self.assertEqual(
+            parameters[1],
+            {
+                "name": "id__in",
+                "required": False,
+                "in": "query",
+                "schema": {"type": "array", "items": {"type": "integer"}},
+                "style": "form",
+                "explode": False,
+            },
+        )
+
+        # map_field is private before DRF 3.12
+        with mock.patch.object(AutoSchema, "map_field", None), mock.patch.object(
+            AutoSchema, "_map_field", return_value={"type": "string"}, create=True
+        ) as map_field:
+            self.assertEqual(self.filter.get_schema_operation_parameters(viewset)[0]["schema"], {"type": "string"})
+        self.assertEqual(map_field.call_count, 2)
+
+        fields = self.filter.get_schema_fields(viewset)
+        self.assertEqual([f.name for f in fields], ["first_name", "vehicles__owner__last_name"])
+
+
+class SearchOwnerViewSet(ModelViewSet):
+    serializer_class = OwnerSerializer
+    queryset = Owner.query
+    search_fields = {"first_name": "A", "last_name": "B"}
+
+
+class TestFullTextSearchFilter(APISimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        super().setUp()
+        self.filter = FullTextSearchFilter()
+
+        session.add_all(
+            [
+                Owner(id=1, first_name="Joe", last_name="Smith"),
+                Owner(id=2, first_name="Smith", last_name="Snow"),
+                Owner(id=3, first_name="Jon", last_name="Snow"),
+                Owner(id=4, first_name="Joe", last_name="Snow"),
+            ]
+        )
+        session.flush()
+        if DIALECT == "sqlite":
+            session.execute(
+                text(
+                    "CREATE VIRTUAL TABLE owners_fts USING fts5("
+                    "first_name, last_name, content='owners', content_rowid='id')"
+                )
+            )
+            session.execute(text("INSERT INTO owners_fts(owners_fts) VALUES('rebuild')"))
+
+    def tearDown(self):
+        session.rollback()
+        super().tearDown()
+
+    def filter_queryset(self, viewset_class=SearchOwnerViewSet, **params):
+        viewset = viewset_class()
+        viewset.action_map = {"get": "list"}
+        request = viewset.initialize_request(self.factory.get("/", params))
+        return self.filter.filter_queryset(request, viewset.get_queryset(), viewset)
+
+    @skipUnless(DIALECT == "sqlite", "FTS5 needs sqlite")
+    def test_sqlite(self):
+        # first name is weighted higher than last name
+        self.assertEqual([o.id for o in self.filter_queryset(search="smith")], [2, 1])
+        self.assertEqual([o.id for o in self.filter_queryset(search="joe snow")], [4])
+        self.assertEqual([o.id for o in self.filter_queryset(search='"joe')], [1, 4])
+        self.assertEqual([o.id for o in self.filter_queryset()], [1, 2, 3, 4])
+
+        with mock.patch.object(SearchOwnerViewSet, "search_fields", ["first_name", "last_name"], create=True):
+            self.assertEqual(sorted(o.id for o in self.filter_queryset(search="smith")), [1, 2])
+
+    def test_sqlite_statement(self):
+        engine = session.get_bind()
+        with mock.patch.object(engine.dialect, "name", "sqlite"):
+            query = self.filter_queryset(search="snow", page_size=2).limit(2)
+
+        statement = str(query.statement.compile(dialect=sqlite.dialect()))
+        self.assertIn("JOIN owners_fts ON owners_fts.rowid = owners.id", statement)
+        self.assertIn("ORDER BY bm25(owners_fts, ?, ?), owners.id\n LIMIT", statement)
+
+    @skipUnless(DIALECT == "postgresql", "tsvector needs postgresql")
+    def test_postgresql(self):
+        # first name is weighted higher than last name
+        self.assertEqual([o.id for o in self.filter_queryset(search="smith")], [2, 1])
+        self.assertEqual([o.id for o in self.filter_queryset(search="joe snow")], [4])
+        self.assertEqual([o.id for o in self.filter_queryset(search="joe -snow")], [1])
+        self.assertEqual([o.id for o in self.filter_queryset(search="snow")], [2, 3, 4])
+        self.assertEqual([o.id for o in self.filter_queryset()], [1, 2, 3, 4])
+
+        with mock.patch.object(SearchOwnerViewSet, "search_config", "simple", create=True):
+            self.assertEqual([o.id for o in self.filter_queryset(search="smiths")], [])
+
+    def test_postgresql_statement(self):
+        engine = session.get_bind()
+        with mock.patch.object(engine.dialect, "name", "postgresql"):
+            query = self.filter_queryset(search="joe -snow")
+
+        self.assertEqual(
+            str(query.statement.compile(dialect=postgresql.dialect())).replace("\n", ""),
+            "SELECT owners.id, owners.first_name, owners.last_name "
+            "FROM owners "
+            "WHERE (setweight(to_tsvector('english', coalesce(owners.first_name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(owners.last_name, '')), 'B')) "
+            "@@ websearch_to_tsquery('english', %(websearch_to_tsquery_1)s) "
+            "ORDER BY ts_rank('{0.1,0.2,0.4,1.0}', "
+            "setweight(to_tsvector('english', coalesce(owners.first_name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(owners.last_name, '')), 'B'), "
+            "websearch_to_tsquery('english', %(websearch_to_tsquery_1)s)) DESC, owners.id",
+        )
+
+        with mock.patch.object(engine.dialect, "name", "postgresql"), mock.patch.object(
+            SearchOwnerViewSet, "search_vector", "last_name", create=True
+        ), mock.patch.object(SearchOwnerViewSet, "search_config", "simple", create=True):
+            query = self.filter_queryset(search="snow")
+
+        self.assertIn(
+            "WHERE owners.last_name @@ websearch_to_tsquery('simple', %(websearch_to_tsquery_1)s)",
+            str(query.statement.compile(dialect=postgresql.dialect())),
+        )
+
+    def test_fallback(self):
+        engine = session.get_bind()
+        with mock.patch.object(engine.dialect, "name", "mysql"):
+            self.assertEqual(sorted(o.id for o in self.filter_queryset(search="smi")), [1, 2])
+
+    def test_invalid_configuration(self):
+        with mock.patch.object(SearchOwnerViewSet, "search_fields", {"first_name": "E"}):
+            with self.assertRaises(AssertionError):
+                self.filter_queryset(search="joe")
+
+        engine = session.get_bind()
+        with mock.patch.object(engine.dialect, "name", "postgresql"), mock.patch.object(
+            SearchOwnerViewSet, "search_config", "english'; --", create=True
+        ):
+            with self.assertRaises(AssertionError):
+                self.filter_queryset(search="joe")
+
+        with mock.patch.object(engine.dialect, "name", "sqlite"), mock.patch.object(
+            SearchOwnerViewSet, "get_model", return_value=RouterTestCompositeKeyModel
+        ):
+            with self.assertRaises(AssertionError):
+                self.filter_queryset(search="joe")
+
+        with mock.patch.object(engine.dialect, "name", "postgresql"), mock.patch.object(
+            SearchOwnerViewSet, "search_fields", ["first_name", "vehicles__name"]
+        ):
+            with self.assertRaises(AssertionError) as e:
+                self.filter_queryset(search="joe")
+            self.assertIn("'vehicles__name'", str(e.exception))
+
+
+class SearchVehicleViewSet(ModelViewSet):
+    serializer_class = VehicleSerializer
+    queryset = Vehicle.query
+    search_fields = ["id", "type", "paint", "name"]
+
+
+class TestTypedSearchFilter(APISimpleTestCase):
+    factory = RequestFactory()
+
+    def setUp(self):
+        super().setUp()
+        self.filter = SearchFilter()
+        session.add_all(
+            [
+                Vehicle(id=1, name="Car 2", type=VehicleType.car, paint="red"),
+                Vehicle(id=2, name="Bus 100%", type=VehicleType.bus, paint="blue"),
+                Vehicle(id=3, name="Bus_3", type=VehicleType.bus),
+            ]
+        )
+        session.flush()
+
+    def tearDown(self):
+        session.rollback()
+        search_plans.clear()
+        super().tearDown()
+
+    def filter_queryset(self, **params):
+        viewset = SearchVehicleViewSet()
+        viewset.action_map = {"get": "list"}
+        request = viewset.initialize_request(self.factory.get("/", params))
+        return self.filter.filter_queryset(request, viewset.get_queryset(), viewset)
+
+    def assertSearch(self, search, ids):
+        self.assertEqual(sorted(v.id for v in self.filter_queryset(search=search)), ids, search)
+
+    def test_typed_fields(self):
+        self.assertSearch("2", [1, 2])
+        self.assertSearch("Bus", [2, 3])
+        self.assertSearch("bus", [2, 3])
+        self.assertSearch("blue", [2])
+        self.assertSearch("3", [3])
+
+        statement = str(self.filter_queryset(search="car").statement)
+        self.assertNotIn("CAST", statement)
+        self.assertNotIn("vehicles.id", statement.split("WHERE")[1])
+        self.assertIn("vehicles.type = :type_1", statement)
+
+    def test_terms_match_all(self):
+        self.assertSearch("bus 2", [2])
+        self.assertSearch("bus blue", [2])
+        self.assertSearch("car blue", [])
+
+        with mock.patch.object(SearchVehicleViewSet, "search_fields", ["id"]):
+            self.assertSearch("car", [])
+
+    def test_prefixes(self):
+        self.assertSearch("%", [2])
+        self.assertSearch("_", [3])
+
+        with mock.patch.object(SearchVehicleViewSet, "search_fields", ["^name", "=paint"]):
+            self.assertSearch("bus_", [3])
+            self.assertSearch("CAR", [1])
+            # enum columns match only valid choices
+            self.assertSearch("RED", [])
+            self.assertSearch("red", [1])
+
+            statement = str(self.filter_queryset(search="bus").statement)
+            self.assertIn("lower(vehicles.name) LIKE :lower_1 ESCAPE '/'", statement)
+            self.assertNotIn("paint", statement.split("WHERE")[1])
+
+        with mock.patch.object(SearchVehicleViewSet, "search_fields", ["=name"]):
+            self.assertSearch("BUS_3", [3])
+            self.assertSearch("BUS", [])
+            self.assertIn("WHERE lower(vehicles.name) = :lower_1", str(self.filter_queryset(search="bus").statement))
+
+    def test_plan_cached(self):
+        self.filter_queryset(search="bus")
+        self.filter_queryset(search="car 2")
+
+        self.assertEqual(len(search_plans), 1)
+
+    def test_get_expression(self):
+        self.assertIsNone(self.filter.get_expression(Vehicle, "id", "haha"))
+        self.assertEqual(str(self.filter.get_expression(Vehicle, "id", "1")), "vehicles.id = :id_1")
+
+    def test_get_expression_override(self):
+        class NameSearchFilter(SearchFilter):
+            def get_expression(self, model, field, term):
+                if field == "name":
+                    return super().get_expression(model, field, term.replace("-", " "))
+
+        self.filter = NameSearchFilter()
+
+        self.assertSearch("car-2", [1])
+        self.assertSearch("2", [1])
+        self.assertSearch("red", [])
+        self.assertEqual(len(search_plans), 0)
+
+    def test_relationships(self):
+        smith = Owner(id=1, first_name="Joe", last_name="Smith")
+        snow = Owner(
+            id=2, first_name="Jon", last_name="Snow", vehicles=[Vehicle(id=4, name="Sled", type=VehicleType.car)]
+        )
+        session.add_all([smith, snow])
+        session.query(Vehicle).get(1).owner = smith
+        session.query(Vehicle).get(2).owner = smith
+        session.flush()
+
+        with mock.patch.object(
+            SearchVehicleViewSet, "search_fields", ["name", "owner__first_name", "^owner__last_name"]
+        ):
+            self.assertSearch("jo", [1, 2, 4])
+            self.assertSearch("smi", [1, 2])
+            self.assertSearch("jo bus", [2])
+
+            statement = str(self.filter_queryset(search="jo").statement)
+            self.assertEqual(statement.count("EXISTS"), 1)
+            self.assertNotIn("JOIN", statement)
+
+        viewset = OwnerViewSet()
+        viewset.action_map = {"get": "list"}
+        for search_fields, search, ids in [
+            (["vehicles__name"], "bus", [1]),
+            (["vehicles__type", "first_name"], "car", [1, 2]),
+            (["vehicles__owner__last_name"], "snow", [2]),
+        ]:
+            with mock.patch.object(OwnerViewSet, "search_fields", search_fields, create=True):
+                request = viewset.initialize_request(self.factory.get("/", {"search": search}))
+                query = self.filter.filter_queryset(request, viewset.get_queryset(), viewset)
+                self.assertEqual([o.id for o in query], ids, search_fields)
+
+        self.assertIn("EXISTS", str(self.filter.get_expression(Owner, "vehicles__name", "bus")))
+        self.assertIsNone(self.filter.get_expression(Owner, "vehicles__id", "bus"))
+
+        with mock.patch.object(SearchVehicleViewSet, "search_fields", ["owner__haha__name"]):
+            with self.assertRaises(AssertionError):
+                self.filter_queryset(search="bus")
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from sqlalchemy import Column, create_engine, orm, types
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -70,3 +72,76 @@ class TestModelRoutes(SimpleTestCase):
 
         with self.assertRaises(Http404):
             viewset.get_object()
+
+    @mock.patch.object(RouterTestModelSerializer, "prepare_queryset", side_effect=lambda queryset: queryset.params())
+    def test_get_queryset_memoized(self, prepare_queryset):
+        class RouterTestViewSet(viewsets.ModelViewSet):
+            queryset = RouterTestModel.query
+            serializer_class = RouterTestModelSerializer
+
+        viewset = RouterTestViewSet()
+        self.assertIsNot(viewset.get_queryset(), viewset.get_queryset())
+
+        viewset.request = factory.get("/")
+        queryset = viewset.get_queryset()
+        self.assertIs(viewset.get_queryset(), queryset)
+        self.assertIs(viewset.get_session(), queryset.session)
+        self.assertEqual(prepare_queryset.call_count, 3)
+
+        viewset.request = factory.get("/")
+        self.assertIsNot(viewset.get_queryset(), queryset)
+
+    @mock.patch.object(RouterTestModelSerializer, "prepare_queryset", side_effect=lambda queryset: queryset.params())
+    def test_memo_dropped_on_mutation(self, prepare_queryset):
+        class RouterTestViewSet(viewsets.ModelViewSet):
+            queryset = RouterTestModel.query
+            serializer_class = RouterTestModelSerializer
+
+        viewset = RouterTestViewSet(request=factory.post("/"))
+        self.addCleanup(session.rollback)
+
+        for perform in (viewset.perform_create, viewset.perform_update):
+            queryset = viewset.get_queryset()
+            serializer = mock.Mock()
+            perform(serializer)
+            serializer.save.assert_called_once_with()
+            self.assertIsNot(viewset.get_queryset(), queryset)
+
+        instance = RouterTestModel(id=1)
+        session.add(instance)
+        session.flush()
+
+        queryset = viewset.get_queryset()
+        viewset.perform_destroy(instance)
+        self.assertIsNot(viewset.get_queryset(), queryset)
+        self.assertIn(instance, session.deleted)
+
+    def test_get_object_coerces_lookup(self):
+        class RouterTestViewSet(viewsets.ModelViewSet):
+            queryset = RouterTestModel.query
+            serializer_class = RouterTestModelSerializer
+            lookup_field = "id"
+            lookup_url_kwarg = "pk"
+
+        instance = RouterTestModel(id=5)
+        session.add(instance)
+        session.flush()
+        self.addCleanup(session.rollback)
+
+        viewset = RouterTestViewSet(kwargs={"pk": "5"})
+        self.assertIs(viewset.get_object(), instance)
+
+        plan = viewset.get_lookup_plan()
+        self.assertIs(RouterTestViewSet().get_lookup_plan(), plan)
+        self.assertIs(plan.model, RouterTestModel)
+        self.assertEqual([i.url_kwarg for i in plan.lookups], ["pk"])
+
+        # lookup field not being a primary key falls back to column names
+        self.assertEqual([i.url_kwarg for i in RouterTestViewSet(lookup_field="pk").get_lookup_plan().lookups], ["id"])
+
+        with mock.patch.object(orm.Query, "get") as get:
+            for kwargs in ({"pk": "haha"}, {"pk": None}, {}):
+                with self.assertRaises(Http404):
+                    RouterTestViewSet(kwargs=kwargs).get_object()
+
+        get.assert_not_called()
@@ -1,19 +1,34 @@
-from sqlalchemy.orm import joinedload
+from collections import Counter
+from unittest import mock, skipUnless
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+try:
+    from sqlalchemy.engine.default import CACHE_HIT
+except ImportError:  # pragma: no cover
+    CACHE_HIT = None
 
 from django.http import QueryDict
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 
+from rest_framework.exceptions import ValidationError
 from rest_framework.fields import CharField, IntegerField
+from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.serializers import Serializer
+from rest_framework.serializers import Serializer, SerializerMethodField
 from rest_framework.test import APIRequestFactory
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
-from rest_witchcraft.fields import SkippableField
-from rest_witchcraft.mixins import ExpandableQuerySerializerMixin
-from rest_witchcraft.serializers import ExpandableModelSerializer, ModelSerializer
+from rest_witchcraft.cache import expand_plans
+from rest_witchcraft.fields import PrimaryKeyRelatedField, SkippableField
+from rest_witchcraft.mixins import ExpandableQuerySerializerMixin, LargeBinaryMixin
+from rest_witchcraft.serializers import ExpandableModelSerializer, ModelSerializer, StrictLoadingError
+from rest_witchcraft.viewsets import ExpandableModelViewSet, ModelViewSet as WitchcraftModelViewSet
 
-from .models import Engine, Option, Owner, Vehicle, VehicleType, session
+from .models import Document, Engine, Option, Owner, Vehicle, VehicleType, session
 from .test_routers import UnAuthMixin
 
 
@@ -63,6 +78,9 @@ class TestDummyViewSet(SimpleTestCase):
     def test_no_queryset(self):
         self.assertIsNone(DummyViewSet().get_query_serializer())
 
+    def test_query_serializer_class(self):
+        self.assertIs(DummyViewSet(query_serializer_class=Serializer).get_query_serializer_class(), Serializer)
+
 
 class TestQuerySerializerMixin(SimpleTestCase):
     def setUp(self):
@@ -92,6 +110,71 @@ class TestQuerySerializerMixin(SimpleTestCase):
         self.assertEqual(view(self.rf.get("/", {"expand": "name"})).status_code, 200)
         self.assertEqual(view(self.rf.get("/", {"expand": "haha"})).status_code, 400)
 
+    def test_query_serializer_class_cached(self):
+        view = ExpandableViewSet.as_view(actions={"get": "list"})
+        self.assertEqual(view(self.rf.get("/", {"expand": "owner"})).status_code, 200)
+
+        query_serializer_class = VehicleSerializer().get_query_serializer_class()
+
+        with mock.patch.object(VehicleSerializer, "__init__", side_effect=AssertionError):
+            self.assertIs(ExpandableViewSet().get_query_serializer_class(), query_serializer_class)
+            self.assertEqual(view(self.rf.get("/", {"expand": "haha"})).status_code, 400)
+
+    def test_query_serializer_class_context_fields(self):
+        class OwnerSerializer(ExpandableModelSerializer):
+            vehicles = VehicleSerializer(many=True)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = "__all__"
+
+            def get_fields(self):
+                fields = super().get_fields()
+                if "HTTP_X_SHORT" in self.context["request"].META:
+                    fields.pop("vehicles")
+                return fields
+
+        view = ExpandableViewSet(serializer_class=OwnerSerializer, format_kwarg=None)
+        view.request = Request(self.rf.get("/"))
+        self.assertEqual(
+            set(view.get_query_serializer_class()().fields["expand"].child.choices),
+            {"vehicles__owner", "vehicles__options", "vehicles__name"},
+        )
+
+        view.request = Request(self.rf.get("/", HTTP_X_SHORT="1"))
+        self.assertEqual(list(view.get_query_serializer_class()().fields), [])
+
+    def test_query_validation_cached(self):
+        view = ExpandableViewSet.as_view(actions={"get": "list"})
+        query_serializer_class = ExpandableViewSet().get_query_serializer_class()
+
+        self.assertEqual(view(self.rf.get("/", {"expand": ["owner", "options"], "page": 1})).status_code, 200)
+        self.assertEqual(view(self.rf.get("/", {"expand": "haha"})).status_code, 400)
+
+        with mock.patch.object(query_serializer_class, "run_validation", side_effect=AssertionError):
+            r = view(self.rf.get("/", {"page": 2, "expand": ["options", "owner"]}))
+            self.assertEqual(r.status_code, 200)
+            self.assertIn("owners_1.id", r.data["query"])
+
+            r = view(self.rf.get("/", {"expand": "haha"}))
+            self.assertEqual(r.status_code, 400)
+            self.assertEqual(r.data, {"expand": {0: ['"haha" is not a valid choice.']}})
+
+    def test_query_validation_cached_copy(self):
+        viewset = ExpandableViewSet(
+            request=Request(self.rf.get("/", {"expand": "owner"})), kwargs={}, format_kwarg=None
+        )
+        serializer = viewset.get_query_serializer()
+        serializer.validated_data["expand"].append("options")
+
+        viewset = ExpandableViewSet(
+            request=Request(self.rf.get("/", {"expand": "owner"})), kwargs={}, format_kwarg=None
+        )
+        serializer = viewset.get_query_serializer()
+        self.assertEqual(serializer.validated_data, {"expand": ["owner"]})
+        self.assertEqual(serializer.errors, {})
+
     def test_no_query_serializer(self):
         view = ExpandableViewSet.as_view(actions={"get": "list"}, serializer_class=DummySerializer)
 
@@ -114,6 +197,193 @@ class TestQuerySerializerMixin(SimpleTestCase):
         self.assertEqual(r.data["query"].count("LEFT OUTER JOIN"), 1)
         self.assertIn("options", r.data["results"][0])
 
+    def test_expand_plan_cached(self):
+        expand_plans.clear()
+        mixin = ExpandableQuerySerializerMixin()
+
+        options = mixin.get_expand_options(Vehicle, ["owner", "options", "owner__haha", "haha"])
+        self.assertEqual(len(options), 2)
+
+        with mock.patch.object(mixin, "get_expand_options", wraps=mixin.get_expand_options) as get_expand_options:
+            for values in (["owner", "haha"], ["haha", "owner"], ["haha"], ["haha"]):
+                mixin.expand_queryset(session.query(Vehicle), values)
+
+        self.assertEqual(get_expand_options.call_count, 2)
+        self.assertEqual(len(expand_plans), 2)
+
+        class NoExpandMixin(ExpandableQuerySerializerMixin):
+            def get_expand_options(self, *args, **kwargs):
+                return ()
+
+        queryset = session.query(Vehicle)
+        self.assertIs(NoExpandMixin().expand_queryset(queryset, ["owner", "haha"]), queryset)
+        self.assertEqual(len(expand_plans), 3)
+
+    def test_expand_strategies(self):
+        view = ExpandableViewSet.as_view(actions={"get": "list"}, expand_strategies={"owner": "selectin"})
+
+        r = view(self.rf.get("/", {"expand": "owner"}))
+        self.assertNotIn("JOIN", r.data["query"])
+        self.assertEqual(r.data["results"][0]["owner"]["id"], 1)
+
+        with self.assertRaises(AssertionError):
+            ExpandableViewSet.as_view(actions={"get": "list"}, expand_strategies={"owner": "foo"})(
+                self.rf.get("/", {"expand": "owner"})
+            )
+
+    def test_expand_strategies_meta(self):
+        class StrategySerializer(VehicleSerializer):
+            class Meta(VehicleSerializer.Meta):
+                expand_strategies = {"options": "joined"}
+
+        self.assertEqual(StrategySerializer().get_query_serializer_class().expand_strategies, {"options": "joined"})
+
+        view = ExpandableViewSet.as_view(actions={"get": "list"}, serializer_class=StrategySerializer)
+
+        r = view(self.rf.get("/", {"expand": "options"}))
+        self.assertEqual(r.data["query"].count("LEFT OUTER JOIN"), 1)
+        self.assertEqual(len(r.data["results"][0]["options"]), 2)
+
+        # viewset strategies take precedence
+        view = ExpandableViewSet.as_view(
+            actions={"get": "list"}, serializer_class=StrategySerializer, expand_strategies={"options": "selectin"}
+        )
+
+        self.assertNotIn("JOIN", view(self.rf.get("/", {"expand": "options"})).data["query"])
+
+    def test_expand_strategy_contains_eager(self):
+        view = ExpandableViewSet.as_view(
+            actions={"get": "list"},
+            queryset=Vehicle.objects.outerjoin(Vehicle.owner).filter(Owner.first_name == "Test"),
+            expand_strategies={"owner": "contains_eager"},
+        )
+
+        r = view(self.rf.get("/", {"expand": "owner"}))
+        self.assertEqual(r.data["query"].count("JOIN"), 1)
+        self.assertIn("owners.first_name AS owners_first_name", r.data["query"])
+        self.assertEqual(r.data["results"][0]["owner"]["id"], 1)
+
+    def test_expand_limits(self):
+        view = ExpandableViewSet.as_view(actions={"get": "list"}, expand_max_depth=0)
+        r = view(self.rf.get("/", {"expand": "owner"}))
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.data, {"expand": ["Expand path 'owner' is deeper than 0 levels allowed."]})
+
+        view = ExpandableViewSet.as_view(actions={"get": "list"}, expand_max_depth=1, expand_max_collections=0)
+        self.assertEqual(view(self.rf.get("/", {"expand": "owner"})).status_code, 200)
+        r = view(self.rf.get("/", {"expand": "options"}))
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.data, {"expand": ["Cannot expand more than 0 collections."]})
+
+        view = ExpandableViewSet.as_view(actions={"get": "list"}, expand_max_cost=10)
+        self.assertEqual(view(self.rf.get("/", {"expand": ["owner", "name"]})).status_code, 200)
+        r = view(self.rf.get("/", {"expand": ["owner", "options"]}))
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(
+            r.data, {"expand": ["Expansion is too expensive, estimated 11 rows per item exceed budget of 10."]}
+        )
+
+        view = ExpandableViewSet.as_view(
+            actions={"get": "list"}, expand_max_cost=10, expand_row_estimates={"options": 2}
+        )
+        self.assertEqual(view(self.rf.get("/", {"expand": ["owner", "options"]})).status_code, 200)
+
+    def test_expand_limits_cost(self):
+        viewset = ExpandableViewSet(expand_max_cost=0, expand_row_estimates={Option: 3, "options__vehicle__options": 4})
+
+        with self.assertRaises(ValidationError) as e:
+            viewset.check_expand_limits("expand", ["options", "options__vehicle", "options__vehicle__options"])
+
+        self.assertEqual(
+            e.exception.detail,
+            {"expand": ["Expansion is too expensive, estimated 18 rows per item exceed budget of 0."]},
+        )
+
+        # shared prefixes are only counted once
+        viewset.expand_max_cost = 6
+        viewset.check_expand_limits("expand", ["options__vehicle"])
+        viewset.check_expand_limits("expand", ["options", "options__vehicle", "options"])
+        viewset.check_expand_limits("expand", ["options__vehicle", "options__unknown__vehicle", "options"])
+        with self.assertRaises(ValidationError):
+            viewset.check_expand_limits("expand", ["options__vehicle__options"])
+
+    def test_expand_limits_collections(self):
+        viewset = ExpandableViewSet(expand_max_collections=1)
+        viewset.check_expand_limits("expand", ["owner", "options", "options__vehicle"])
+
+        # intermediate collections count too even when not expanded on their own
+        for values in (["options__vehicle__options"], ["options", "options__vehicle__options"]):
+            with self.assertRaises(ValidationError) as e:
+                viewset.check_expand_limits("expand", values)
+
+            self.assertEqual(e.exception.detail, {"expand": ["Cannot expand more than 1 collections."]})
+
+        viewset.expand_max_collections = 2
+        viewset.check_expand_limits("expand", ["options", "options__vehicle", "options__vehicle__options"])
+
+    def test_expanded_queryset_memoized(self):
+        class MemoizedViewSet(ExpandableModelViewSet):
+            serializer_class = VehicleSerializer
+            queryset = Vehicle.objects
+
+        viewset = MemoizedViewSet(request=self.rf.get("/", {"expand": "owner"}), kwargs={}, format_kwarg=None)
+        viewset.check_query()
+
+        with mock.patch.object(MemoizedViewSet, "expand_queryset", wraps=viewset.expand_queryset) as expand_queryset:
+            queryset = viewset.get_queryset()
+            self.assertIs(viewset.get_queryset(), queryset)
+            self.assertIs(viewset.get_session(), queryset.session)
+
+            viewset.clear_memoized()
+            self.assertIsNot(viewset.get_queryset(), queryset)
+
+        self.assertEqual(expand_queryset.call_count, 2)
+
+    @skipUnless(hasattr(sa, "lambda_stmt"), "compiled statement cache needs sqlalchemy 1.4")
+    def test_compiled_statement_cache(self):
+        class CachedViewSet(UnAuthMixin, ExpandableModelViewSet):
+            serializer_class = VehicleSerializer
+            queryset = Vehicle.objects
+            lookup_field = "id"
+            lookup_url_kwarg = "pk"
+
+        engine = session.get_bind()
+        cache_hits = []
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            cache_hits.append(context.cache_hit)
+
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        self.addCleanup(event.remove, engine, "after_cursor_execute", after_cursor_execute)
+
+        for pk in (1000, 1001):
+            cache_hits.clear()
+            CachedViewSet.as_view(actions={"get": "list"})(self.rf.get("/", {"expand": ["owner", "options"]}))
+            r = CachedViewSet.as_view(actions={"get": "retrieve"})(self.rf.get("/", {"expand": "options"}), pk=pk)
+            self.assertEqual(r.status_code, 404)
+
+        self.assertEqual(len(cache_hits), 3)
+        self.assertEqual(set(cache_hits), {CACHE_HIT})
+
+    def test_expand_adaptive(self):
+        view = ExpandableViewSet.as_view(actions={"get": "list"}, expand_adaptive=True, expand_adaptive_threshold=0)
+        self.addCleanup(ExpandableViewSet._expand_observed_rows.pop, ExpandableViewSet, None)
+
+        self.assertEqual(ExpandableViewSet().get_expand_collection_strategy(), "selectin")
+
+        r = view(self.rf.get("/", {"expand": "options"}))
+        self.assertEqual(len(r.data["results"][0]["options"]), 2)
+
+        self.assertEqual(ExpandableViewSet._expand_observed_rows[ExpandableViewSet], 1)
+        self.assertEqual(
+            ExpandableViewSet(expand_adaptive=True, expand_adaptive_threshold=0).get_expand_collection_strategy(),
+            "subquery",
+        )
+        self.assertEqual(ExpandableViewSet().get_expand_collection_strategy(), "selectin")
+
+        r = view(self.rf.get("/", {"expand": "options"}))
+        self.assertEqual(len(r.data["results"][0]["options"]), 2)
+
     def test_already_eagerload(self):
         view = ExpandableViewSet.as_view(
             actions={"get": "list"}, queryset=Vehicle.objects.options(joinedload(Vehicle.owner))
@@ -124,3 +394,266 @@ class TestQuerySerializerMixin(SimpleTestCase):
         # even if we add more joinedloads sqlalchemy should normalize them
         # as that exact path is already joined in base queryset
         self.assertEqual(r.data["query"].count("LEFT OUTER JOIN"), 1)
+
+
+class StrictLoadingViewSet(UnAuthMixin, ExpandableModelViewSet):
+    serializer_class = VehicleSerializer
+    queryset = Vehicle.objects
+
+
+class TestStrictLoading(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rf = APIRequestFactory()
+        session.add(
+            Vehicle(
+                name="Test vehicle",
+                type=VehicleType.car,
+                owner=Owner(id=1, first_name="Test", last_name="Owner"),
+                options=[Option(name="Navigation")],
+            )
+        )
+        session.flush()
+        session.expunge_all()
+
+    def tearDown(self):
+        super().tearDown()
+        session.rollback()
+        session.expunge_all()
+
+    def test_raise(self):
+        view = StrictLoadingViewSet.as_view(actions={"get": "list"}, strict_loading="raise")
+
+        with self.assertRaises(StrictLoadingError) as e:
+            view(self.rf.get("/", {"expand": "owner"}))
+
+        self.assertIn("'other'", str(e.exception))
+        self.assertIn("'Vehicle.other'", str(e.exception))
+
+    @override_settings(REST_WITCHCRAFT_STRICT_LOADING="raise")
+    def test_raise_global_setting(self):
+        view = StrictLoadingViewSet.as_view(
+            actions={"get": "list"}, queryset=Vehicle.objects.options(joinedload(Vehicle.other))
+        )
+
+        self.assertEqual(view(self.rf.get("/", {"expand": "owner"})).status_code, 200)
+
+        with self.assertRaises(StrictLoadingError):
+            StrictLoadingViewSet.as_view(actions={"get": "list"})(self.rf.get("/", {"expand": "owner"}))
+
+    def test_warn(self):
+        view = StrictLoadingViewSet.as_view(actions={"get": "list"}, strict_loading="warn")
+
+        with self.assertLogs("rest_witchcraft.generics", "WARNING") as logs:
+            r = view(self.rf.get("/", {"expand": "owner"}))
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("GET /: other (1)", logs.output[0])
+
+    def test_raise_nested_field_path(self):
+        class OwnerSerializer(ModelSerializer):
+            vehicles = DummySerializer(many=True)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles"]
+
+        owner = session.query(Owner).options(selectinload(Owner.vehicles), raiseload("*", sql_only=True)).get(1)
+
+        with self.assertRaises(StrictLoadingError) as e:
+            OwnerSerializer(instance=owner).data
+
+        self.assertIn("'vehicles__other'", str(e.exception))
+
+    def test_unrelated_invalid_request_error(self):
+        class Serializer(ModelSerializer):
+            boom = SerializerMethodField()
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "boom"]
+
+            def get_boom(self, instance):
+                raise InvalidRequestError("boom")
+
+        with self.assertRaises(InvalidRequestError) as e:
+            Serializer(instance=session.query(Vehicle).first()).data
+
+        self.assertNotIsInstance(e.exception, StrictLoadingError)
+
+        # unloaded relationships which would lazy load are not to blame either
+        Serializer.Meta.fields = ["id", "boom", "owner"]
+        with self.assertRaises(InvalidRequestError) as e:
+            Serializer(instance=session.query(Vehicle).first()).data
+
+        self.assertNotIsInstance(e.exception, StrictLoadingError)
+
+    def test_raise_mapper_configured(self):
+        class Serializer(ModelSerializer):
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner"]
+
+        vehicle = session.query(Vehicle).first()
+        with mock.patch.object(Vehicle.owner.property, "strategy_key", (("lazy", "raise"),)):
+            with mock.patch.object(
+                type(Vehicle.owner.impl), "get", side_effect=InvalidRequestError("'Vehicle.owner' is not available")
+            ):
+                with self.assertRaises(StrictLoadingError) as e:
+                    Serializer(instance=vehicle).data
+
+        self.assertIn("'Vehicle.owner'", str(e.exception))
+
+    def test_lazy_loads_primary_key_related_fields(self):
+        class Serializer(ModelSerializer):
+            owner = PrimaryKeyRelatedField(read_only=True)
+            options = PrimaryKeyRelatedField(many=True, read_only=True)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner", "options"]
+
+        lazy_loads = Counter()
+        vehicle = session.query(Vehicle).options(raiseload("*", sql_only=True)).first()
+        data = Serializer(instance=vehicle, context={"lazy_loads": lazy_loads}).data
+
+        self.assertEqual((data["owner"], len(data["options"])), (1, 1))
+        self.assertEqual(lazy_loads, Counter())
+
+    def test_lazy_loads_transient_instance(self):
+        lazy_loads = Counter()
+
+        DummySerializer(instance=Vehicle(name="Test", type=VehicleType.bus), context={"lazy_loads": lazy_loads}).data
+
+        self.assertEqual(lazy_loads, Counter())
+
+
+class DocumentSerializer(ModelSerializer):
+    class Meta:
+        model = Document
+        session = session
+        fields = "__all__"
+
+
+class DocumentViewSet(UnAuthMixin, LargeBinaryMixin, WitchcraftModelViewSet):
+    serializer_class = DocumentSerializer
+    queryset = Document.objects
+    lookup_field = "id"
+    lookup_url_kwarg = "pk"
+    binary_chunk_size = 4
+
+
+@override_settings(ROOT_URLCONF="tests.urls.testlargebinary")
+class TestLargeBinaryMixin(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rf = APIRequestFactory()
+        # committed since binary content is streamed on a separate connection
+        session.add_all([Document(id=1, name="a", content=b"\x00binary\xffcontent"), Document(id=2, name="b")])
+        session.commit()
+        session.expunge_all()
+        self.view = DocumentViewSet.as_view(actions={"get": "binary", "put": "binary"})
+
+    def tearDown(self):
+        super().tearDown()
+        session.rollback()
+        session.query(Document).delete()
+        session.commit()
+        session.expunge_all()
+
+    def test_retrieve(self):
+        r = DocumentViewSet.as_view(actions={"get": "retrieve"})(self.rf.get("/documents/1/"), pk="1")
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data, {"id": 1, "name": "a", "content": "http://testserver/documents/1/binary/content/"})
+        self.assertNotIn("content", session.query(Document).get(1).__dict__)
+
+    def test_read(self):
+        engine = session.get_bind()
+        statements = []
+
+        def execute(conn, cursor, statement, *args):
+            statements.append((conn.connection, statement))
+
+        event.listen(engine, "before_cursor_execute", execute)
+        self.addCleanup(event.remove, engine, "before_cursor_execute", execute)
+        r = self.view(self.rf.get("/documents/1/binary/content/"), pk="1", binary_field="content")
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r["Content-Type"], "application/octet-stream")
+        self.assertEqual(r["Content-Length"], "15")
+        # middleware commits and removes the session before content is streamed
+        session.remove()
+        checkins = []
+
+        def checkin(dbapi_connection, connection_record):
+            checkins.append(dbapi_connection)
+
+        event.listen(engine.pool, "checkin", checkin)
+        self.addCleanup(event.remove, engine.pool, "checkin", checkin)
+
+        chunks = list(r.streaming_content)
+
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(b"".join(chunks), b"\x00binary\xffcontent")
+        self.assertEqual(len(checkins), 1)
+        # length and all chunks are read within a single transaction
+        connections = [conn for conn, statement in statements if "length(" in statement or "substr(" in statement]
+        self.assertEqual(len(connections), 5)
+        self.assertEqual(len(set(map(id, connections))), 1)
+
+    def test_read_isolation_level(self):
+        view = DocumentViewSet()
+        column = Document.__table__.c.content
+
+        self.assertIs(view.get_binary_bind(session, column), session.get_bind())
+        with mock.patch.object(session.get_bind().dialect, "name", "postgresql"):
+            engine = view.get_binary_bind(session, column)
+        self.assertEqual(engine.get_execution_options(), {"isolation_level": "REPEATABLE READ"})
+
+    @skipUnless(session.get_bind().dialect.name == "postgresql", "needs snapshot reads")
+    def test_read_concurrent_write(self):
+        r = self.view(self.rf.get("/documents/1/binary/content/"), pk="1", binary_field="content")
+        chunks = iter(r.streaming_content)
+        first = next(chunks)
+
+        session.query(Document).filter_by(id=1).update({"content": b"\x01updated content that is longer"})
+        session.commit()
+
+        self.assertEqual(first + b"".join(chunks), b"\x00binary\xffcontent")
+
+    def test_read_empty(self):
+        r = self.view(self.rf.get("/documents/2/binary/content/"), pk="2", binary_field="content")
+
+        self.assertEqual(r.status_code, 404)
+
+    def test_not_binary_field(self):
+        r = self.view(self.rf.get("/documents/1/binary/name/"), pk="1", binary_field="name")
+
+        self.assertEqual(r.status_code, 404)
+
+    def test_write(self):
+        data = b"\x01new\x00binary\xfe"
+        r = self.view(
+            self.rf.put("/documents/2/binary/content/", data, content_type="application/octet-stream"),
+            pk="2",
+            binary_field="content",
+        )
+
+        self.assertEqual(r.status_code, 204)
+        self.assertEqual(session.query(Document).get(2).content, data)
+
+    def test_write_empty(self):
+        r = self.view(
+            self.rf.put("/documents/1/binary/content/", b"", content_type="application/octet-stream"),
+            pk="1",
+            binary_field="content",
+        )
+
+        self.assertEqual(r.status_code, 204)
+        self.assertEqual(session.query(Document).get(1).content, b"")
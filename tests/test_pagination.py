@@ -0,0 +1,416 @@
+import json
+from unittest import mock
+
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
+
+from django.test import SimpleTestCase
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from rest_witchcraft import filters, pagination, serializers, viewsets
+from rest_witchcraft.cache import counts
+
+from .base import QueryCountMixin
+from .models import Option, Owner, Vehicle, VehicleType, session
+from .models_composite import RouterTestCompositeKeyModel, session as composite_session
+from .test_mixins import VehicleSerializer
+from .test_routers import UnAuthMixin
+
+
+class Pagination(pagination.CursorPagination):
+    page_size = 2
+    page_size_query_param = "page_size"
+
+
+class OwnerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Owner
+        session = session
+        fields = ["id", "first_name", "last_name"]
+
+
+class OwnerViewSet(UnAuthMixin, viewsets.ModelViewSet):
+    queryset = Owner.query
+    serializer_class = OwnerSerializer
+    pagination_class = Pagination
+    ordering = None
+    count_strategy = None
+
+
+class VehicleViewSet(UnAuthMixin, viewsets.ExpandableModelViewSet):
+    queryset = Vehicle.query
+    serializer_class = VehicleSerializer
+    pagination_class = Pagination
+    ordering = None
+
+
+class CompositeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RouterTestCompositeKeyModel
+        session = composite_session
+        fields = "__all__"
+
+
+class CompositeViewSet(UnAuthMixin, viewsets.ModelViewSet):
+    queryset = RouterTestCompositeKeyModel.query
+    serializer_class = CompositeSerializer
+    pagination_class = Pagination
+    ordering = "-text"
+
+
+class PaginationTestMixin(QueryCountMixin):
+    def setUp(self):
+        super().setUp()
+        self.rf = APIRequestFactory()
+
+    def walk(self, viewset, url="/", link="next", **initkwargs):
+        view = viewset.as_view(actions={"get": "list"}, **initkwargs)
+        pages = []
+        while url:
+            r = view(self.rf.get(url))
+            self.assertEqual(r.status_code, 200)
+            pages.append(r.data["results"])
+            url = r.data[link]
+        return pages
+
+
+class TestCursorPagination(PaginationTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Owner(id=1, first_name="Alice", last_name="Smith"),
+                Owner(id=2, first_name="Bob", last_name="Jones"),
+                Owner(id=3, first_name="Carol", last_name="Smith"),
+                Owner(id=4, first_name="Dave", last_name="Jones"),
+                Owner(id=5, first_name="Eve", last_name="Smith"),
+            ]
+        )
+        session.flush()
+
+    def tearDown(self):
+        session.rollback()
+        super().tearDown()
+
+    def test_pages(self):
+        pages = self.walk(OwnerViewSet)
+        self.assertEqual([[i["id"] for i in page] for page in pages], [[1, 2], [3, 4], [5]])
+
+        r = OwnerViewSet.as_view(actions={"get": "list"})(self.rf.get("/", {"page_size": 3}))
+        self.assertEqual([i["id"] for i in r.data["results"]], [1, 2, 3])
+        self.assertIsNone(r.data["previous"])
+
+        # walking back from the last page
+        last = self.walk(OwnerViewSet)[-1]
+        url = OwnerViewSet.as_view(actions={"get": "list"})(self.rf.get("/", {"page_size": 4})).data["next"]
+        self.assertEqual(OwnerViewSet.as_view(actions={"get": "list"})(self.rf.get(url)).data["results"], last)
+
+    def test_pages_backwards(self):
+        view = OwnerViewSet.as_view(actions={"get": "list"})
+        url = view(self.rf.get("/")).data["next"]
+        url = view(self.rf.get(url)).data["next"]
+
+        pages = self.walk(OwnerViewSet, url=url, link="previous")
+        self.assertEqual([[i["id"] for i in page] for page in pages], [[5], [3, 4], [1, 2]])
+
+    def test_mixed_ordering(self):
+        pages = self.walk(OwnerViewSet, ordering=["last_name", "-first_name"])
+        self.assertEqual([[i["id"] for i in page] for page in pages], [[4, 2], [5, 3], [1]])
+
+        view = OwnerViewSet.as_view(actions={"get": "list"}, ordering=["last_name", "-first_name"])
+        r = view(self.rf.get(view(self.rf.get("/")).data["next"]))
+        self.assertEqual([i["id"] for i in view(self.rf.get(r.data["previous"])).data["results"]], [4, 2])
+
+    def test_seek_query(self):
+        self.count_queries()
+
+        pages = self.walk(OwnerViewSet, ordering="-last_name")
+
+        self.assertEqual([[i["id"] for i in page] for page in pages], [[5, 3], [1, 4], [2]])
+        self.assertEqual(len(self.queries), 3)
+        self.assertIn("(owners.last_name, owners.id) < (?, ?)", self.queries[-1])
+
+    def test_empty_pages(self):
+        view = OwnerViewSet.as_view(actions={"get": "list"})
+
+        first = view(self.rf.get("/")).data
+        r = view(self.rf.get(first["next"])).data
+        previous, following = r["previous"], r["next"]
+
+        r = view(self.rf.get(previous)).data
+        self.assertEqual(r["results"], first["results"])
+        self.assertIsNone(r["previous"])
+
+        session.query(Owner).filter(Owner.id.in_([1, 2, 5])).delete(synchronize_session=False)
+
+        r = view(self.rf.get(previous)).data
+        self.assertEqual(r, {"next": "http://testserver/", "previous": None, "results": []})
+
+        r = view(self.rf.get(following)).data
+        self.assertEqual(r, {"next": None, "previous": "http://testserver/", "results": []})
+
+    def test_ordering_filter(self):
+        pages = self.walk(OwnerViewSet, url="/?ordering=-first_name", filter_backends=[filters.OrderingFilter])
+        self.assertEqual([[i["id"] for i in page] for page in pages], [[5, 4], [3, 2], [1]])
+
+        pages = self.walk(OwnerViewSet, filter_backends=[filters.SearchFilter, filters.OrderingFilter], ordering="-id")
+        self.assertEqual([[i["id"] for i in page] for page in pages], [[5, 4], [3, 2], [1]])
+
+    def test_ordering_filter_relationship(self):
+        class OrderedVehicleViewSet(VehicleViewSet):
+            filter_backends = [filters.OrderingFilter]
+            ordering_fields = ["name", "owner__last_name"]
+
+        session.add_all(
+            [
+                Vehicle(name=name, type=VehicleType.car, owner=owner)
+                for name, owner in (("b", Owner.query.get(1)), ("a", None))
+            ]
+        )
+        session.flush()
+        view = OrderedVehicleViewSet.as_view(actions={"get": "list"})
+
+        r = view(self.rf.get("/", {"ordering": "owner__last_name"}))
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(
+            r.data, {"ordering": ["Cannot order Vehicle by 'owner__last_name', only column attributes are supported"]}
+        )
+
+        pages = self.walk(OrderedVehicleViewSet, url="/?ordering=-name")
+        self.assertEqual([[i["name"] for i in page] for page in pages], [["b", "a"]])
+
+    def test_invalid_cursor(self):
+        view = OwnerViewSet.as_view(actions={"get": "list"})
+
+        for cursor in ("haha", "W10", "WzBd", "WzAsImhhaGEiXQ", "WzAsbnVsbF0", "e30", "w6k"):
+            self.assertEqual(view(self.rf.get("/", {"cursor": cursor})).status_code, 404, cursor)
+
+    def test_invalid_ordering(self):
+        with self.assertRaises(AssertionError):
+            OwnerViewSet.as_view(actions={"get": "list"}, ordering="haha")(self.rf.get("/"))
+
+    def test_no_page_size(self):
+        view = OwnerViewSet.as_view(actions={"get": "list"}, pagination_class=pagination.CursorPagination)
+        self.assertEqual([i["id"] for i in view(self.rf.get("/")).data], [1, 2, 3, 4, 5])
+
+
+class TestCursorPaginationExpand(PaginationTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Vehicle(name="Vehicle {}".format(i), type=VehicleType.car, options=[Option(name="Option {}".format(i))])
+                for i in range(3)
+            ]
+        )
+        session.flush()
+
+    def tearDown(self):
+        session.rollback()
+        super().tearDown()
+
+    def test_expand(self):
+        pages = self.walk(VehicleViewSet, url="/?expand=options", ordering="-name")
+
+        self.assertEqual(
+            [[(i["name"], [o["name"] for o in i["options"]]) for i in page] for page in pages],
+            [[("Vehicle 2", ["Option 2"]), ("Vehicle 1", ["Option 1"])], [("Vehicle 0", ["Option 0"])]],
+        )
+
+
+class TestCursorPaginationCompositeKey(PaginationTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        composite_session.add_all(
+            [
+                RouterTestCompositeKeyModel(id=1, other_id=2, text="a"),
+                RouterTestCompositeKeyModel(id=1, other_id=1, text="a"),
+                RouterTestCompositeKeyModel(id=2, other_id=1, text="a"),
+                RouterTestCompositeKeyModel(id=1, other_id=3, text="b"),
+            ]
+        )
+        composite_session.flush()
+
+    def tearDown(self):
+        # flushed rows reloaded by views outlive the rollback in the identity map
+        composite_session.rollback()
+        composite_session.expunge_all()
+        super().tearDown()
+
+    def test_pages(self):
+        pages = self.walk(CompositeViewSet)
+
+        self.assertEqual(
+            [[(i["id"], i["other_id"]) for i in page] for page in pages], [[(1, 3), (2, 1)], [(1, 2), (1, 1)]]
+        )
+
+
+class LimitOffsetPagination(pagination.LimitOffsetPagination):
+    default_limit = 2
+
+
+class TestLimitOffsetPagination(PaginationTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all([Owner(id=i, first_name="Owner {}".format(i), last_name="Smith") for i in range(1, 6)])
+        session.flush()
+
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        counts.clear()
+        super().tearDown()
+
+    def get(self, count_strategy, **params):
+        view = OwnerViewSet.as_view(
+            actions={"get": "list"}, pagination_class=LimitOffsetPagination, count_strategy=count_strategy
+        )
+        del self.queries[:]
+        r = view(self.rf.get("/", params))
+        self.assertEqual(r.status_code, 200)
+        return r.data
+
+    def test_exact(self):
+        data = self.get("exact", offset=2)
+
+        self.assertEqual(data["count"], 5)
+        self.assertEqual([i["id"] for i in data["results"]], [3, 4])
+        self.assertEqual(data["next"], "http://testserver/?limit=2&offset=4")
+        self.assertEqual(len(self.queries), 2)
+        self.assertIn(
+            "SELECT count(*) AS count_1 \nFROM (SELECT owners.id AS id \nFROM owners) AS anon_1", self.queries[0]
+        )
+
+        data = self.get("exact", offset=6)
+        self.assertEqual((data["count"], data["results"]), (5, []))
+        self.assertEqual(len(self.queries), 1)
+
+    def test_window(self):
+        data = self.get("window", offset=4)
+
+        self.assertEqual(data["count"], 5)
+        self.assertEqual([i["id"] for i in data["results"]], [5])
+        self.assertIsNone(data["next"])
+        self.assertEqual(len(self.queries), 1)
+        self.assertIn("count(*) OVER ()", self.queries[0])
+
+        # pages past the end still know the count
+        data = self.get("window", offset=6)
+        self.assertEqual((data["count"], data["results"]), (5, []))
+        self.assertEqual(len(self.queries), 2)
+
+        session.query(Owner).delete(synchronize_session=False)
+        data = self.get("window")
+        self.assertEqual((data["count"], data["results"]), (0, []))
+        self.assertEqual(len(self.queries), 1)
+
+    def test_has_next(self):
+        data = self.get("has_next", offset=2)
+
+        self.assertEqual(
+            data,
+            {
+                "next": "http://testserver/?limit=2&offset=4",
+                "previous": "http://testserver/?limit=2",
+                "results": [
+                    {"id": 3, "first_name": "Owner 3", "last_name": "Smith"},
+                    {"id": 4, "first_name": "Owner 4", "last_name": "Smith"},
+                ],
+            },
+        )
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(self.get("has_next", offset=3)["next"], None)
+
+    def test_estimate(self):
+        data = self.get("estimate")
+        self.assertEqual(data["count"], 5)
+        self.assertEqual(len(self.queries), 2)
+
+        engine = session.get_bind()
+        execute = orm.Session.execute
+        plan = [{"Plan": {"Plan Rows": 20000}}]
+
+        def explain(self, statement, *args, **kwargs):
+            if isinstance(statement, pagination.Explain):
+                return mock.Mock(scalar=mock.Mock(return_value=json.dumps(plan)))
+            return execute(self, statement, *args, **kwargs)
+
+        with mock.patch.object(engine.dialect, "name", "postgresql"), mock.patch.object(
+            orm.Session, "execute", explain
+        ):
+            self.assertEqual(self.get("estimate")["count"], 20000)
+
+            plan = [{"Plan": {"Plan Rows": 10}}]
+            self.assertEqual(self.get("estimate")["count"], 5)
+
+    def test_explain(self):
+        statement = pagination.Explain(session.query(Owner.id).filter(Owner.id == 1).statement)
+        self.assertEqual(
+            str(statement.compile(dialect=postgresql.dialect())),
+            "EXPLAIN (FORMAT JSON) SELECT owners.id \nFROM owners \nWHERE owners.id = %(id_1)s",
+        )
+
+    def test_cached(self):
+        self.assertEqual(self.get("cached")["count"], 5)
+        self.assertEqual(len(self.queries), 2)
+
+        session.add(Owner(id=6, first_name="Owner 6", last_name="Smith"))
+        session.flush()
+
+        self.assertEqual(self.get("cached")["count"], 5)
+        self.assertEqual(len(self.queries), 1)
+
+        with mock.patch.object(LimitOffsetPagination, "count_cache_timeout", 0):
+            self.assertEqual(self.get("cached")["count"], 6)
+
+    def test_cached_filter_signature(self):
+        paginator = LimitOffsetPagination()
+        paginator.count_strategy = "cached"
+        request = Request(self.rf.get("/"))
+
+        for first_name, count in [("Owner 1", 1), ("Owner 2", 1), ("Owner 1", 1), ("Owner", 0)]:
+            query = Owner.query.filter(Owner.first_name == first_name)
+            paginator.paginate_queryset(query, request, view=None)
+            self.assertEqual(paginator.count, count)
+
+        self.assertEqual(len(counts), 3)
+
+    def test_invalid_strategy(self):
+        with self.assertRaises(AssertionError):
+            self.get("haha")
+
+    def test_paginated_response_schema(self):
+        paginator = LimitOffsetPagination()
+        schema = {"type": "array"}
+
+        self.assertEqual(
+            list(paginator.get_paginated_response_schema(schema)["properties"]),
+            ["count", "next", "previous", "results"],
+        )
+
+        paginator.count_strategy = "has_next"
+        self.assertEqual(
+            list(paginator.get_paginated_response_schema(schema)["properties"]), ["next", "previous", "results"]
+        )
+
+        # newer DRF versions list required properties too
+        with mock.patch(
+            "rest_framework.pagination.LimitOffsetPagination.get_paginated_response_schema",
+            return_value={"properties": {"count": {}, "results": schema}, "required": ["count", "results"]},
+        ):
+            self.assertEqual(
+                paginator.get_paginated_response_schema(schema),
+                {"properties": {"results": schema}, "required": ["results"]},
+            )
+
+        paginator.count_strategy = "estimate"
+        self.assertIn(
+            "Approximate", paginator.get_paginated_response_schema(schema)["properties"]["count"]["description"]
+        )
+
+    def test_no_limit(self):
+        view = OwnerViewSet.as_view(actions={"get": "list"}, pagination_class=pagination.LimitOffsetPagination)
+        self.assertEqual(len(view(self.rf.get("/")).data), 5)
@@ -1,6 +1,11 @@
+from unittest import mock
+
 import simplejson as json
+from sqlalchemy import Column, types
+from sqlalchemy.dialects import postgresql
 
 from django.test import SimpleTestCase, override_settings
+from django.urls import Resolver404, resolve, reverse
 
 from rest_witchcraft import routers, serializers, viewsets
 
@@ -81,6 +86,107 @@ class TestDummyDummy(SimpleTestCase):
         lookup_regex = dummy_router.get_lookup_regex(DummyViewSet)
         self.assertEqual(lookup_regex, "(?P<pk>[^/.]+)")
 
+        dummy_router = routers.DefaultRouter(use_regex_path=False)
+        self.assertEqual(dummy_router.get_lookup_regex(DummyViewSet), "<witchcraft_lookup:pk>")
+
+
+class TestLookupPatterns(SimpleTestCase):
+    def test_get_lookup_pattern(self):
+        self.assertEqual(routers.get_lookup_pattern(Column(types.Integer())), ("[0-9]+", "int"))
+        self.assertEqual(routers.get_lookup_pattern(Column(postgresql.UUID(as_uuid=True)))[1], "uuid")
+        self.assertEqual(routers.get_lookup_pattern(Column(types.String())), ("[^/.]+", "witchcraft_lookup"))
+
+    def test_get_lookup_regex(self):
+        router = routers.DefaultRouter()
+
+        self.assertEqual(router.get_lookup_regex(RouterTestViewSet), "(?P<pk>[0-9]+)")
+        self.assertEqual(router.get_lookup_regex(RouterTestCompositeViewSet), "(?P<id>[0-9]+)/(?P<other_id>[0-9]+)")
+
+        class SlugViewSet(RouterTestViewSet):
+            lookup_value_regex = "[-a-zA-Z0-9_]+"
+            lookup_value_converter = "slug"
+
+        self.assertEqual(router.get_lookup_regex(SlugViewSet), "(?P<pk>[-a-zA-Z0-9_]+)")
+
+        router = routers.DefaultRouter(use_regex_path=False)
+        self.assertEqual(router.get_lookup_regex(SlugViewSet), "<slug:pk>")
+        self.assertEqual(
+            router.get_lookup_regex(RouterTestCompositeViewSet, "parent_"), "<int:parent_id>/<int:parent_other_id>"
+        )
+
+    def test_path_not_supported(self):
+        with mock.patch.object(routers, "path", None):
+            self.assertTrue(routers.DefaultRouter().use_regex_path)
+            with self.assertRaises(AssertionError):
+                routers.DefaultRouter(use_regex_path=False)
+
+    def test_get_urls_without_prefix(self):
+        router = routers.DefaultRouter(use_regex_path=False)
+        router.include_root_view = router.include_format_suffixes = False
+        router.register(r"", RouterTestViewSet)
+
+        class ListViewSet(UnAuthMixin, viewsets.GenericViewSet):
+            queryset = RouterTestModel.query
+
+            def list(self, request):
+                pass  # pragma: no cover
+
+        router.register(r"list", ListViewSet)
+
+        self.assertEqual([str(i.pattern) for i in router.urls], ["", "<int:pk>/", "list/"])
+
+    def test_to_path_syntax(self):
+        self.assertEqual(
+            routers.to_path_syntax("<int:pk>/binary/(?P<binary_field>[^/.]+)/"),
+            "<int:pk>/binary/<witchcraft_lookup:binary_field>/",
+        )
+        self.assertEqual(routers.to_path_syntax("(?P<a>[0-9]+)/(?P<b>.+)"), "<int:a>/<path:b>")
+        self.assertEqual(routers.to_path_syntax("<slug:a>/"), "<slug:a>/")
+
+        with self.assertRaises(AssertionError):
+            routers.to_path_syntax("(?P<a>[a-z]+)/")
+
+    def test_lookup_converter(self):
+        converter = routers.LookupConverter()
+
+        self.assertEqual(converter.to_python("haha"), "haha")
+        self.assertEqual(converter.to_url(1), "1")
+
+
+@override_settings(ROOT_URLCONF="tests.urls.testpathrouter")
+class TestPathRoutes(SimpleTestCase):
+    def setUp(self):
+        session.add_all(
+            [
+                RouterTestModel(id=1, text="router test model 1"),
+                RouterTestCompositeKeyModel(id=1, other_id=2, text="router composite model 2"),
+            ]
+        )
+
+    def tearDown(self):
+        session.rollback()
+
+    def test_resolve(self):
+        self.assertEqual(resolve("/test/1/").kwargs, {"pk": 1})
+        self.assertEqual(resolve("/testcomposite/1/2/").kwargs, {"id": 1, "other_id": 2})
+        self.assertEqual(resolve("/test/1.json").kwargs, {"pk": 1, "format": "json"})
+        self.assertEqual(reverse("routertestmodel-detail", kwargs={"pk": 1}), "/test/1/")
+        self.assertEqual(resolve("/").url_name, "api-root")
+        self.assertEqual(resolve("/documents/1/binary/content/").kwargs, {"pk": 1, "binary_field": "content"})
+        self.assertEqual(
+            reverse("document-binary", kwargs={"pk": 1, "binary_field": "content"}), "/documents/1/binary/content/"
+        )
+
+        with self.assertRaises(Resolver404):
+            resolve("/test/haha/")
+
+    def test_retrieve(self):
+        self.assertEqual(self.client.get("/test/1/").data, {"id": 1, "text": "router test model 1"})
+        self.assertEqual(
+            self.client.get("/testcomposite/1/2/").data, {"id": 1, "other_id": 2, "text": "router composite model 2"}
+        )
+        self.assertEqual(self.client.get("/test/haha/").status_code, 404)
+
 
 @override_settings(ROOT_URLCONF="tests.test_routers")
 class TestModelRoutes(SimpleTestCase):
@@ -1,6 +1,10 @@
 import copy
 from collections import OrderedDict
+from datetime import datetime
 from decimal import Decimal
+from unittest import mock
+
+from sqlalchemy import func, orm
 
 from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
 from django.test import SimpleTestCase
@@ -13,10 +17,35 @@ from rest_framework.serializers import ListSerializer, Serializer
 from rest_framework.settings import api_settings
 from rest_framework.test import APIRequestFactory
 
-from rest_witchcraft.fields import HyperlinkedIdentityField
-from rest_witchcraft.serializers import BaseSerializer, CompositeSerializer, ExpandableModelSerializer, ModelSerializer
-
-from .models import COLORS, Engine, ModelWithJson, Option, Owner, Vehicle, VehicleOther, VehicleType, session
+from rest_witchcraft.cache import reference_tables
+from rest_witchcraft.fields import AggregateField, HasMoreField, HyperlinkedIdentityField
+from rest_witchcraft.serializers import (
+    BaseSerializer,
+    CompositeSerializer,
+    ExpandableModelSerializer,
+    ModelListSerializer,
+    ModelSerializer,
+    PolymorphicModelSerializer,
+)
+
+from .base import QueryCountMixin
+from .models import (
+    COLORS,
+    Animal,
+    Cat,
+    Document,
+    Dog,
+    Engine,
+    Garage,
+    ModelWithJson,
+    Option,
+    Owner,
+    Vehicle,
+    VehicleOther,
+    VehicleType,
+    session,
+)
+from .models_composite import CompositeKeyChild, CompositeKeyParent, session as composite_session
 
 
 class VehicleOwnerStubSerializer(Serializer):
@@ -1500,6 +1529,30 @@ class TestModelSerializer(SimpleTestCase):
         serializer = OwnerSerializer(data={"id": 111, "name": "foo"})
         self.assertFalse(serializer.is_valid(), serializer.errors)
 
+    def test_prepare_queryset_defers_large_binary_columns(self):
+        class DocumentSerializer(ModelSerializer):
+            class Meta:
+                model = Document
+                session = session
+                fields = "__all__"
+
+        class DocumentContentSerializer(DocumentSerializer):
+            content = fields.CharField()
+
+        session.add(Document(id=1, content=b"content"))
+        session.flush()
+        session.expunge_all()
+
+        document = DocumentSerializer.prepare_queryset(session.query(Document)).get(1)
+        self.assertNotIn("content", document.__dict__)
+        session.expunge_all()
+
+        document = DocumentContentSerializer.prepare_queryset(session.query(Document)).get(1)
+        self.assertIn("content", document.__dict__)
+
+        queryset = session.query(Document)
+        self.assertIs(ModelSerializer.prepare_queryset(queryset), queryset)
+
 
 class TestExpandableModelSerializer(SimpleTestCase):
     def setUp(self):
@@ -1605,6 +1658,15 @@ class TestExpandableModelSerializer(SimpleTestCase):
         self.assertIsInstance(s.fields["expand"].child, fields.ChoiceField)
         self.assertEqual(list(s.fields["expand"].child.choices), ["owner"])
 
+    def test_query_serializer_cached(self):
+        self.assertIs(
+            VehicleSerializer().get_query_serializer_class(), VehicleSerializer().get_query_serializer_class()
+        )
+        self.assertIsNot(
+            VehicleSerializer().get_query_serializer_class(),
+            VehicleSerializer().get_query_serializer_class(implicit_expand=False),
+        )
+
     def test_query_serializer_exclude(self):
         s = VehicleSerializer().get_query_serializer_class(exclude=["owner"])()
 
@@ -1633,3 +1695,702 @@ class TestExpandableModelSerializer(SimpleTestCase):
         self.assertIsInstance(s.fields["expand"], fields.ListField)
         self.assertIsInstance(s.fields["expand"].child, fields.ChoiceField)
         self.assertEqual(set(s.fields["expand"].child.choices), {"vehicles__owner"})
+
+    def test_query_serializer_context_fields(self):
+        class Serializer(ExpandableModelSerializer):
+            vehicles = VehicleSerializer(many=True)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = "__all__"
+
+            def get_fields(self):
+                fields = super().get_fields()
+                if self.context.get("short"):
+                    fields.pop("vehicles")
+                return fields
+
+        class DynamicVehicleSerializer(VehicleSerializer):
+            def get_fields(self):
+                return super().get_fields()
+
+        class ParentSerializer(ExpandableModelSerializer):
+            vehicles = DynamicVehicleSerializer(many=True)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles"]
+
+        self.assertEqual(list(Serializer().get_query_serializer_class()().fields), ["expand"])
+        self.assertEqual(list(Serializer(context={"short": True}).get_query_serializer_class()().fields), [])
+        self.assertTrue(VehicleSerializer.has_static_fields())
+        self.assertFalse(Serializer.has_static_fields())
+        self.assertFalse(ParentSerializer.has_static_fields())
+
+
+class TestAggregateField(QueryCountMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Owner(
+                    id=1,
+                    first_name="Jon",
+                    last_name="Snow",
+                    vehicles=[
+                        Vehicle(name="Car", type=VehicleType.car, created_at=datetime(2020, 1, 1)),
+                        Vehicle(name="Bus", type=VehicleType.bus, created_at=datetime(2021, 1, 1)),
+                    ],
+                ),
+                Owner(id=2, first_name="Joe", last_name="Smith"),
+            ]
+        )
+        session.flush()
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        super().tearDown()
+
+    def get_serializer_class(self):
+        class OwnerSerializer(ModelSerializer):
+            vehicle_count = AggregateField("vehicles", func.count)
+            last_purchase = AggregateField("vehicles", func.max, column="created_at")
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicle_count", "last_purchase"]
+
+        return OwnerSerializer
+
+    def test_to_representation(self):
+        serializer = self.get_serializer_class()(instance=session.query(Owner).get(1))
+
+        self.assertEqual(serializer.data, {"id": 1, "vehicle_count": 2, "last_purchase": datetime(2021, 1, 1)})
+        self.assertEqual(len(self.queries), 1)
+
+    def test_to_representation_list(self):
+        owners = session.query(Owner).order_by(Owner.id).all()
+        self.queries = []
+
+        serializer = self.get_serializer_class()(instance=owners, many=True)
+
+        self.assertIsInstance(serializer, ModelListSerializer)
+        self.assertEqual(
+            serializer.data,
+            [
+                {"id": 1, "vehicle_count": 2, "last_purchase": datetime(2021, 1, 1)},
+                {"id": 2, "vehicle_count": 0, "last_purchase": None},
+            ],
+        )
+        self.assertEqual(len(self.queries), 1)
+        self.assertNotIn("vehicles.id AS vehicles_id", self.queries[0])
+
+    def test_nested(self):
+        owner_serializer = self.get_serializer_class()
+
+        class VehicleSerializer(ModelSerializer):
+            owner = owner_serializer()
+            option_count = AggregateField("options")
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["name", "owner", "option_count"]
+
+        class OwnerVehiclesSerializer(ModelSerializer):
+            vehicles = VehicleSerializer(many=True)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles"]
+
+        vehicles = session.query(Vehicle).options(orm.joinedload(Vehicle.owner)).order_by(Vehicle.id).all()
+        self.queries = []
+
+        data = VehicleSerializer(instance=vehicles, many=True).data
+
+        self.assertEqual([(v["owner"]["vehicle_count"], v["option_count"]) for v in data], [(2, 0), (2, 0)])
+        # aggregates of vehicles and of their owners for the whole list
+        self.assertEqual(len(self.queries), 2)
+
+        owners = session.query(Owner).options(orm.selectinload(Owner.vehicles)).order_by(Owner.id).all()
+        self.queries = []
+
+        data = OwnerVehiclesSerializer(instance=owners, many=True).data
+
+        self.assertEqual([len(o["vehicles"]) for o in data], [2, 0])
+        self.assertEqual(len(self.queries), 2)
+
+        # nested collections lazy loaded while rendering are prefetched one parent at a time
+        session.expire_all()
+        data = OwnerVehiclesSerializer(instance=session.query(Owner).order_by(Owner.id).all(), many=True).data
+
+        self.assertEqual([[v["owner"]["vehicle_count"] for v in o["vehicles"]] for o in data], [[2, 2], []])
+
+    def test_nested_prefetched_once(self):
+        prefetched = []
+
+        class VehicleSerializer(ModelSerializer):
+            option_count = AggregateField("options")
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["name", "option_count"]
+
+            def prefetch(self, instances):
+                prefetched.append(len(instances))
+                super().prefetch(instances)
+
+        class OwnerVehiclesSerializer(ModelSerializer):
+            vehicles = VehicleSerializer(many=True)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles"]
+
+        session.add(Owner(id=3, vehicles=[Vehicle(name="Van", type=VehicleType.car)]))
+        session.flush()
+        owners = session.query(Owner).options(orm.selectinload(Owner.vehicles)).order_by(Owner.id).all()
+        self.queries = []
+
+        data = OwnerVehiclesSerializer(instance=owners, many=True).data
+
+        self.assertEqual([[v["option_count"] for v in o["vehicles"]] for o in data], [[0, 0], [], [0]])
+        # vehicles of all owners are prefetched at once rather than per owner
+        self.assertEqual(prefetched, [3])
+        self.assertEqual(len(self.queries), 1)
+
+    def test_reused_serializer(self):
+        serializer = self.get_serializer_class()()
+
+        self.assertEqual(serializer.to_representation(session.query(Owner).get(1))["vehicle_count"], 2)
+        self.assertEqual(serializer.to_representation(session.query(Owner).get(2))["vehicle_count"], 0)
+
+        session.query(Owner).get(2).vehicles.append(Vehicle(name="Van", type=VehicleType.car))
+        session.flush()
+
+        # values are not kept from the previous render
+        self.assertEqual(serializer.to_representation(session.query(Owner).get(2))["vehicle_count"], 1)
+
+        serializer = self.get_serializer_class()(many=True)
+        owners = session.query(Owner).order_by(Owner.id).all()
+
+        self.assertEqual([o["vehicle_count"] for o in serializer.to_representation(owners[:1])], [2])
+        self.assertEqual([o["vehicle_count"] for o in serializer.to_representation(owners[1:])], [1])
+
+    def test_unsaved_instance(self):
+        serializer = self.get_serializer_class()(instance=Owner())
+
+        self.assertEqual(serializer.data, {"id": None, "vehicle_count": None, "last_purchase": None})
+        self.assertEqual(self.queries, [])
+
+    def test_order_by_expression(self):
+        field = self.get_serializer_class()._declared_fields["vehicle_count"]
+
+        owners = session.query(Owner).order_by(field.get_expression(Owner).desc()).all()
+
+        self.assertEqual([o.id for o in owners], [1, 2])
+
+    def test_many_to_many(self):
+        class GarageSerializer(ModelSerializer):
+            vehicle_count = AggregateField("vehicles")
+
+            class Meta:
+                model = Garage
+                session = session
+                fields = ["id", "vehicle_count"]
+
+        garage = Garage(id=1, vehicles=session.query(Vehicle).all())
+        session.add(garage)
+        session.flush()
+
+        self.assertEqual(GarageSerializer(instance=garage).data, {"id": 1, "vehicle_count": 2})
+
+
+class TestLimitedCollection(QueryCountMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Owner(
+                    id=1,
+                    first_name="Jon",
+                    last_name="Snow",
+                    vehicles=[
+                        Vehicle(id=1, name="Car", type=VehicleType.car, created_at=datetime(2020, 1, 1)),
+                        Vehicle(id=2, name="Bus", type=VehicleType.bus, created_at=datetime(2021, 1, 1)),
+                        Vehicle(id=3, name="Van", type=VehicleType.bus, created_at=datetime(2019, 1, 1)),
+                    ],
+                ),
+                Owner(
+                    id=2,
+                    first_name="Joe",
+                    last_name="Smith",
+                    vehicles=[Vehicle(id=4, name="Truck", type=VehicleType.bus, created_at=datetime(2018, 1, 1))],
+                ),
+                Owner(id=3, first_name="Jane", last_name="Doe"),
+            ]
+        )
+        session.flush()
+        session.expire_all()
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        super().tearDown()
+
+    def get_serializer_class(self, limit=2):
+        class VehicleNameSerializer(ModelSerializer):
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "name"]
+
+        class OwnerSerializer(ModelSerializer):
+            vehicles = VehicleNameSerializer(many=True, limit=limit, order_by=["-created_at"])
+            has_more_vehicles = HasMoreField("vehicles")
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "vehicles", "has_more_vehicles"]
+
+        return OwnerSerializer
+
+    def test_to_representation_list(self):
+        owners = session.query(Owner).order_by(Owner.id).all()
+        self.queries = []
+
+        serializer = self.get_serializer_class()(instance=owners, many=True)
+
+        self.assertEqual(
+            serializer.data,
+            [
+                {
+                    "id": 1,
+                    "vehicles": [{"id": 2, "name": "Bus"}, {"id": 1, "name": "Car"}],
+                    "has_more_vehicles": True,
+                },
+                {"id": 2, "vehicles": [{"id": 4, "name": "Truck"}], "has_more_vehicles": False},
+                {"id": 3, "vehicles": [], "has_more_vehicles": False},
+            ],
+        )
+        self.assertEqual(len(self.queries), 1)
+        self.assertIn("row_number() OVER (PARTITION BY", self.queries[0])
+
+    def test_to_representation(self):
+        owner = session.query(Owner).get(1)
+        self.queries = []
+
+        serializer = self.get_serializer_class(limit=3)(instance=owner)
+
+        self.assertEqual(
+            serializer.data,
+            {
+                "id": 1,
+                "vehicles": [{"id": 2, "name": "Bus"}, {"id": 1, "name": "Car"}, {"id": 3, "name": "Van"}],
+                "has_more_vehicles": False,
+            },
+        )
+        self.assertEqual(len(self.queries), 1)
+
+    def test_to_representation_unsaved(self):
+        owner = Owner(vehicles=[Vehicle(name="Car"), Vehicle(name="Bus"), Vehicle(name="Van")])
+
+        serializer = self.get_serializer_class()(instance=owner)
+
+        self.assertEqual(
+            serializer.data,
+            {
+                "id": None,
+                "vehicles": [{"id": None, "name": "Car"}, {"id": None, "name": "Bus"}],
+                "has_more_vehicles": False,
+            },
+        )
+        self.assertEqual(self.queries, [])
+
+    def test_query_serializer_prefetched_paths(self):
+        class OwnerSerializer(ExpandableModelSerializer):
+            vehicles = VehicleSerializer(many=True, limit=5)
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = "__all__"
+
+        self.assertEqual(OwnerSerializer().get_query_serializer_class().prefetched_paths, ("vehicles",))
+
+
+class TestPolymorphicModelSerializer(QueryCountMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        session.add_all(
+            [
+                Dog(id=1, name="Rex", breed="Collie"),
+                Cat(id=2, name="Tom", lives=9),
+                Dog(id=3, name="Fido", breed="Pug"),
+                Animal(id=4, name="Nemo"),
+            ]
+        )
+        session.flush()
+        session.expunge_all()
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        session.expunge_all()
+        super().tearDown()
+
+    def get_serializer_class(self, **meta):
+        class AnimalSerializer(PolymorphicModelSerializer):
+            class Meta:
+                model = Animal
+                session = session
+                fields = ["id", "name", "kind"]
+
+        for k, v in meta.items():
+            setattr(AnimalSerializer.Meta, k, v)
+
+        return AnimalSerializer
+
+    def test_to_representation_list(self):
+        serializer_class = self.get_serializer_class()
+        animals = serializer_class.prepare_queryset(session.query(Animal)).order_by(Animal.id).all()
+
+        self.assertEqual(
+            serializer_class(instance=animals, many=True).data,
+            [
+                {"id": 1, "name": "Rex", "kind": "dog", "breed": "Collie"},
+                {"id": 2, "name": "Tom", "kind": "cat", "lives": 9},
+                {"id": 3, "name": "Fido", "kind": "dog", "breed": "Pug"},
+                {"id": 4, "name": "Nemo", "kind": "animal"},
+            ],
+        )
+        # base query + one selectin query per subclass
+        self.assertEqual(len(self.queries), 3)
+
+    def test_prepare_queryset_joined(self):
+        serializer_class = self.get_serializer_class(polymorphic_loading="joined")
+        animals = serializer_class.prepare_queryset(session.query(Animal)).order_by(Animal.id).all()
+
+        self.assertEqual(len(serializer_class(instance=animals, many=True).data), 4)
+        self.assertEqual(len(self.queries), 1)
+
+    def test_declared_polymorphic_serializer(self):
+        class DogSerializer(ModelSerializer):
+            class Meta:
+                model = Dog
+                session = session
+                fields = ["breed"]
+
+        serializer_class = self.get_serializer_class(polymorphic_serializers={Dog: DogSerializer})
+
+        self.assertEqual(serializer_class(instance=session.query(Animal).get(1)).data, {"breed": "Collie"})
+        self.assertEqual(
+            serializer_class(instance=session.query(Animal).get(2)).data,
+            {"id": 2, "name": "Tom", "kind": "cat", "lives": 9},
+        )
+
+    def test_create_by_discriminator(self):
+        serializer = self.get_serializer_class()(data={"id": 5, "name": "Lassie", "kind": "dog", "breed": "Collie"})
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        instance = serializer.save()
+
+        self.assertIsInstance(instance, Dog)
+        self.assertEqual(instance.breed, "Collie")
+
+    def test_create_mixed_list(self):
+        serializer = self.get_serializer_class()(
+            data=[
+                {"id": 5, "name": "Lassie", "kind": "dog", "breed": "Collie"},
+                {"id": 6, "name": "Felix", "kind": "cat", "lives": 7},
+                {"id": 7, "name": "Nemo", "kind": "animal"},
+            ],
+            many=True,
+        )
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        instances = serializer.save()
+
+        self.assertEqual([type(i).__name__ for i in instances], ["Dog", "Cat", "Animal"])
+        self.assertEqual(instances[0].breed, "Collie")
+        self.assertEqual(instances[1].lives, 7)
+        self.assertEqual([i["kind"] for i in serializer.data], ["dog", "cat", "animal"])
+
+    def test_update_subclass_instance(self):
+        instance = session.query(Animal).get(2)
+        serializer = self.get_serializer_class()(instance=instance, data={"lives": 8}, partial=True)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertEqual(instance.lives, 8)
+        self.assertEqual(serializer.data, {"id": 2, "name": "Tom", "kind": "cat", "lives": 8})
+
+    def test_prepare_queryset_without_subclasses(self):
+        class DogSerializer(PolymorphicModelSerializer):
+            class Meta:
+                model = Dog
+                session = session
+                fields = "__all__"
+
+        queryset = session.query(Dog)
+
+        self.assertIs(DogSerializer.prepare_queryset(queryset), queryset)
+        self.assertEqual(
+            DogSerializer(instance=queryset.get(1)).data, {"id": 1, "name": "Rex", "kind": "dog", "breed": "Collie"}
+        )
+
+
+class TestReferenceTable(QueryCountMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        reference_tables.clear()
+        session.add_all(
+            [
+                Owner(id=1, first_name="Jon", last_name="Snow"),
+                Owner(id=2, first_name="Joe", last_name="Smith"),
+                Vehicle(id=1, name="Car", type=VehicleType.car, _owner_id=1),
+                Vehicle(id=2, name="Bus", type=VehicleType.bus, _owner_id=2),
+                Vehicle(id=3, name="Bike", type=VehicleType.car),
+            ]
+        )
+        session.flush()
+        session.expunge_all()
+        self.count_queries()
+
+    def tearDown(self):
+        session.rollback()
+        session.expunge_all()
+        reference_tables.clear()
+        super().tearDown()
+
+    def get_serializer_class(self, reference_table=True):
+        class OwnerSerializer(ModelSerializer):
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "first_name"]
+
+        OwnerSerializer.Meta.reference_table = reference_table
+
+        class VehicleSerializer(ModelSerializer):
+            owner = OwnerSerializer(read_only=True)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner"]
+
+        return VehicleSerializer
+
+    def test_to_representation(self):
+        vehicles = session.query(Vehicle).order_by(Vehicle.id).all()
+        serializer_class = self.get_serializer_class()
+        self.queries = []
+
+        data = serializer_class(instance=vehicles, many=True).data
+
+        self.assertEqual(
+            data,
+            [
+                {"id": 1, "owner": {"id": 1, "first_name": "Jon"}},
+                {"id": 2, "owner": {"id": 2, "first_name": "Joe"}},
+                {"id": 3, "owner": None},
+            ],
+        )
+        self.assertEqual(len(self.queries), 1)
+
+        self.queries = []
+        data = serializer_class(instance=vehicles, many=True).data
+
+        self.assertEqual(data[0], {"id": 1, "owner": {"id": 1, "first_name": "Jon"}})
+        self.assertEqual(self.queries, [])
+
+    def test_serializer_class_in_key(self):
+        class OwnerSerializer(ModelSerializer):
+            name = fields.SerializerMethodField()
+
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id", "name"]
+                reference_table = True
+
+            def get_name(self, instance):
+                return instance.first_name
+
+        class UpperOwnerSerializer(OwnerSerializer):
+            def get_name(self, instance):
+                return instance.first_name.upper()
+
+        class VehicleSerializer(ModelSerializer):
+            owner = OwnerSerializer(read_only=True)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner"]
+
+        class UpperVehicleSerializer(VehicleSerializer):
+            owner = UpperOwnerSerializer(read_only=True)
+
+        vehicle = session.query(Vehicle).get(1)
+
+        self.assertEqual(VehicleSerializer(instance=vehicle).data["owner"], {"id": 1, "name": "Jon"})
+        self.assertEqual(UpperVehicleSerializer(instance=vehicle).data["owner"], {"id": 1, "name": "JON"})
+
+    def test_relation_info_per_serializer(self):
+        vehicles = session.query(Vehicle).order_by(Vehicle.id).all()
+        serializer_class = self.get_serializer_class()
+        serializer_class(instance=vehicles, many=True).data
+
+        calls = []
+        for instances in (vehicles[:1], vehicles):
+            with mock.patch("rest_witchcraft.serializers.meta.model_info", wraps=model_info) as info:
+                serializer_class(instance=instances, many=True).data
+            calls.append(info.call_count)
+
+        # relationship info is not looked up again for every rendered row
+        self.assertEqual(calls[0], calls[1])
+
+    def test_not_reference_table(self):
+        vehicles = session.query(Vehicle).order_by(Vehicle.id).all()
+        self.queries = []
+
+        data = self.get_serializer_class(reference_table=False)(instance=vehicles, many=True).data
+
+        self.assertEqual(data[1], {"id": 2, "owner": {"id": 2, "first_name": "Joe"}})
+        self.assertEqual(len(self.queries), 2)
+
+    def test_model_meta(self):
+        info = model_info(Owner)
+        info.opts = type("Meta", (), {"reference_table": True})
+        try:
+            serializer = self.get_serializer_class(reference_table=False)()
+            del serializer.fields["owner"].Meta.reference_table
+
+            self.assertIsNotNone(serializer.fields["owner"].reference_relation)
+        finally:
+            info.opts = None
+
+    def test_loaded_relationship(self):
+        vehicle = session.query(Vehicle).get(1)
+        vehicle.owner.first_name = "John"
+        self.queries = []
+
+        data = self.get_serializer_class()(instance=vehicle).data
+
+        self.assertEqual(data, {"id": 1, "owner": {"id": 1, "first_name": "John"}})
+        self.assertEqual(self.queries, [])
+
+    def test_invalidated_on_flush(self):
+        serializer_class = self.get_serializer_class()
+        vehicle = session.query(Vehicle).get(1)
+        self.assertEqual(serializer_class(instance=vehicle).data["owner"], {"id": 1, "first_name": "Jon"})
+
+        session.query(Owner).get(1).first_name = "John"
+        session.flush()
+        session.expunge_all()
+
+        vehicle = session.query(Vehicle).get(1)
+        self.assertEqual(serializer_class(instance=vehicle).data["owner"], {"id": 1, "first_name": "John"})
+
+    def test_missing_row(self):
+        serializer_class = self.get_serializer_class()
+        serializer_class(instance=session.query(Vehicle).get(1)).data
+
+        # bypasses the unit of work so cache is not invalidated
+        session.execute(Owner.__table__.insert().values(id=3, first_name="Arya"))
+        session.execute(Vehicle.__table__.update().where(Vehicle.id == 3).values(owner_id=3))
+        session.expunge_all()
+
+        vehicle = session.query(Vehicle).get(3)
+        self.assertEqual(serializer_class(instance=vehicle).data["owner"], {"id": 3, "first_name": "Arya"})
+
+    def test_not_nested(self):
+        self.assertIsNone(self.get_serializer_class()().reference_relation)
+
+    def test_not_many_to_one(self):
+        class VehicleOtherSerializer(ModelSerializer):
+            class Meta:
+                model = VehicleOther
+                session = session
+                fields = ["id"]
+                reference_table = True
+
+        class VehicleSerializer(ModelSerializer):
+            other = VehicleOtherSerializer(read_only=True)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "other"]
+
+        self.assertIsNone(VehicleSerializer().fields["other"].reference_relation)
+
+    def test_query_serializer_prefetched_paths(self):
+        class OwnerSerializer(ModelSerializer):
+            class Meta:
+                model = Owner
+                session = session
+                fields = ["id"]
+                reference_table = True
+
+        class ExpandableVehicleSerializer(ExpandableModelSerializer):
+            owner = OwnerSerializer(read_only=True)
+
+            class Meta:
+                model = Vehicle
+                session = session
+                fields = ["id", "owner"]
+
+        self.assertEqual(ExpandableVehicleSerializer().get_query_serializer_class().prefetched_paths, ("owner",))
+
+
+class TestLimitedCollectionCompositeKey(SimpleTestCase):
+    def test_to_representation(self):
+        class CompositeKeyChildSerializer(ModelSerializer):
+            class Meta:
+                model = CompositeKeyChild
+                session = composite_session
+                fields = ["id", "name"]
+
+        class CompositeKeyParentSerializer(ModelSerializer):
+            children = CompositeKeyChildSerializer(many=True, limit=1, order_by=["-id"])
+
+            class Meta:
+                model = CompositeKeyParent
+                session = composite_session
+                fields = ["id", "other_id", "children"]
+
+        composite_session.add_all(
+            [
+                CompositeKeyParent(
+                    id=1, other_id=1, children=[CompositeKeyChild(id=1, name="a"), CompositeKeyChild(id=2, name="b")]
+                ),
+                CompositeKeyParent(id=1, other_id=2, children=[CompositeKeyChild(id=3, name="c")]),
+            ]
+        )
+        composite_session.flush()
+
+        try:
+            parents = composite_session.query(CompositeKeyParent).order_by(CompositeKeyParent.other_id).all()
+
+            self.assertEqual(
+                CompositeKeyParentSerializer(instance=parents, many=True).data,
+                [
+                    {"id": 1, "other_id": 1, "children": [{"id": 2, "name": "b"}]},
+                    {"id": 1, "other_id": 2, "children": [{"id": 3, "name": "c"}]},
+                ],
+            )
+        finally:
+            composite_session.rollback()
@@ -1,8 +1,13 @@
 import unittest
 
+from sqlalchemy import orm
+from sqlalchemy.exc import InvalidRequestError
+
 from django.core.exceptions import ValidationError
 
-from rest_witchcraft.utils import _django_to_drf
+from rest_witchcraft.utils import _django_to_drf, get_query_model
+
+from .models import Owner, Vehicle, session
 
 
 class TestUtils(unittest.TestCase):
@@ -12,3 +17,12 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(_django_to_drf({"hello": "world"}), {"hello": "world"})
         self.assertEqual(_django_to_drf(ValidationError("hello")), ["hello"])
         self.assertEqual(_django_to_drf(ValidationError({"hello": "world"})), {"hello": ["world"]})
+
+    def test_get_query_model(self):
+        self.assertIs(get_query_model(Vehicle.objects), Vehicle)
+        self.assertIs(get_query_model(Vehicle.objects.join(Vehicle.owner).options(orm.joinedload("*"))), Vehicle)
+        self.assertIs(get_query_model(session.query(orm.aliased(Vehicle))), Vehicle)
+
+        for query in (session.query(Vehicle.id), session.query(Vehicle, Owner), session.query(Vehicle.id + 1)):
+            with self.assertRaises(InvalidRequestError):
+                get_query_model(query)
@@ -0,0 +1,13 @@
+try:
+    from django.conf.urls import url as re_path
+except ImportError:  # pragma: no cover
+    from django.urls import re_path
+
+
+urlpatterns = [
+    re_path(r"^owners/(?P<pk>[^/]+)/$", lambda: None, name="owner-detail"),
+    re_path(r"^owners/(?P<pk>[^/]+)\.(?P<format>[a-z]+)$", lambda: None, name="owner-detail"),
+    re_path(r"^digits/(?P<pk>\d+)/$", lambda: None, name="digits"),
+    re_path(r"^vehicles/(?P<pk>[^/]+)/$", lambda: None, name="vehicle-detail"),
+    re_path(r"^parents/(?P<id>[^/]+)/(?P<other_id>[^/]+)/$", lambda: None, name="compositekeyparent-detail"),
+]
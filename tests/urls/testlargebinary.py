@@ -0,0 +1,9 @@
+from rest_witchcraft.routers import DefaultRouter
+
+from ..test_mixins import DocumentViewSet
+
+
+router = DefaultRouter()
+router.register(r"documents", DocumentViewSet)
+
+urlpatterns = router.urls
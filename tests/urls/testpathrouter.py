@@ -0,0 +1,12 @@
+from rest_witchcraft.routers import DefaultRouter
+
+from ..test_mixins import DocumentViewSet
+from ..test_routers import RouterTestCompositeViewSet, RouterTestViewSet
+
+
+router = DefaultRouter(use_regex_path=False)
+router.register(r"test", RouterTestViewSet)
+router.register(r"testcomposite", RouterTestCompositeViewSet)
+router.register(r"documents", DocumentViewSet)
+
+urlpatterns = router.urls